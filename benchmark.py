@@ -0,0 +1,291 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import asyncio
+from collections import namedtuple
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+import timeit
+
+# Additional pip modules
+from luma.oled.device import sh1106
+from PIL import Image, ImageDraw, ImageFont
+
+# Additional project modules
+from modules.display import Display
+from modules.glyphs import GlyphAtlas
+from modules.transport import FaultySerial, Transport
+from modules import sensors
+
+
+REAL_PATH = os.path.dirname(os.path.realpath(__file__))
+
+FRAMES = 300
+FONT_PATH = REAL_PATH + '/modules/font/PixelOperator.ttf'
+FONT = ImageFont.truetype(FONT_PATH, 16)
+
+
+class CountingSerial:
+    """Mock serial interface which only counts transmitted bytes"""
+
+    def __init__(self):
+        self.bytes = 0
+        self.transactions = 0
+
+    def command(self, *cmd):
+        """Count command bytes"""
+        self.bytes += len(cmd)
+        self.transactions += 1
+
+    def data(self, data):
+        """Count data bytes"""
+        self.bytes += len(data)
+        self.transactions += 1
+
+    def cleanup(self):
+        """Nothing to clean up"""
+
+
+def cpumem_frames(count):
+    """Frames like the cpumem page, mostly only CPU % and MHz change"""
+    random.seed(0)
+    load = '12% 9.5% 8.1%'
+    for i in range(count):
+        image = Image.new('1', (128, 64))
+        draw = ImageDraw.Draw(image)
+        draw.text((-1, 0), f'CPU {random.randint(1, 40)}%', font=FONT, fill=255)
+        draw.text((127, 0), f'{random.choice([600, 1200, 1500])} MHz',
+                  font=FONT, fill=255, anchor='ra')
+        draw.text((-1, 16), 'LOAD', font=FONT, fill=255)
+        if i % 5 == 0:
+            load = f'{random.randint(10, 30)}% 9.5% 8.1%'
+        draw.text((127, 16), load, font=FONT, fill=255, anchor='ra')
+        draw.text((-1, 32), 'TEMP', font=FONT, fill=255)
+        draw.text((127, 32), f'{random.choice([47.2, 47.8, 48.3])} °C',
+                  font=FONT, fill=255, anchor='ra')
+        draw.text((-1, 48), 'MEM', font=FONT, fill=255)
+        draw.text((127, 48), '412 MB / 1 GB', font=FONT, fill=255, anchor='ra')
+        yield image
+
+
+def bench_bytes(frames, **kwargs):
+    """Bytes on the bus for a frame sequence"""
+    serial = CountingSerial()
+    display = Display(sh1106(serial), **kwargs)
+    serial.bytes = 0
+    serial.transactions = 0
+    for image in frames:
+        display.display(image)
+    return {
+        'frames_rendered': display.get_frames_rendered(),
+        'frames_sent': display.get_frames_sent(),
+        'bytes': serial.bytes,
+        'transactions': serial.transactions
+    }
+
+
+def bench_faults(frames, fail_rate=0.05):
+    """Transport counters for a frame sequence on a bus which fails transactions"""
+    serial = FaultySerial(fail_rate)
+    transport = Transport(serial, backoff=0)
+    display = Display(sh1106(transport), partial=True, full_refresh=60)
+    failed = 0
+    for image in frames:
+        try:
+            display.display(image)
+        except OSError:
+            failed += 1
+    return dict(transport.stats(), fail_rate=fail_rate, frames_failed=failed)
+
+
+TEXT_LINES = [
+    ('CPU 12%', 'la'), ('1500 MHz', 'ra'), ('LOAD', 'la'), ('12% 9.5% 8.1%', 'ra'),
+    ('TEMP', 'la'), ('47.2 °C', 'ra'), ('MEM', 'la'), ('412 MB / 1 GB', 'ra')
+]
+
+
+def bench_text(number=1000):
+    """Seconds per cpumem text frame with ImageDraw.text and the glyph atlas"""
+    atlas = GlyphAtlas(FONT_PATH, 16)
+    atlas.preload()
+    image = Image.new('1', (128, 64))
+    draw = ImageDraw.Draw(image)
+
+    def draw_pil():
+        for text, anchor in TEXT_LINES:
+            draw.text((127 if anchor == 'ra' else -1, 0), text,
+                      font=FONT, fill=255, anchor=anchor)
+
+    def draw_atlas():
+        for text, anchor in TEXT_LINES:
+            atlas.text(draw, (127 if anchor == 'ra' else -1, 0), text,
+                       fill=255, anchor=anchor)
+
+    return {
+        'imagedraw': timeit.timeit(draw_pil, number=number) / number,
+        'atlas': timeit.timeit(draw_atlas, number=number) / number
+    }
+
+
+STARTUP_SCRIPT = '''
+from luma.core.device import dummy
+import main
+from modules.pages import Pages
+from modules.runtime import Runtime
+async def ready():
+    # Started after the render task, which shows the first frame at once
+    print('ready', flush=True)
+    Runtime.stop()
+main.load_config()
+Pages.init_device(dummy(width=128, height=64, mode='1'))
+Runtime.add(ready)
+Runtime.run()
+'''
+
+
+def bench_startup(runs=5):
+    """Seconds from process start to the first frame, with config/config.yml"""
+    results = []
+    for i in range(runs):
+        start = perf_counter()
+        with subprocess.Popen([sys.executable, '-c', STARTUP_SCRIPT], cwd=REAL_PATH,
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                              text=True) as process:
+            for line in process.stdout:
+                if line.strip() == 'ready':
+                    results.append(perf_counter() - start)
+                    break
+            process.kill()
+    return min(results) if results else None
+
+
+DiskUsage = namedtuple('DiskUsage', ['total', 'used', 'free', 'percent'])
+VirtualMemory = namedtuple('VirtualMemory', ['total', 'used'])
+
+BENCH_PAGES = [
+    {'type': 'cpumem', 'args': None},
+    {'type': 'storage', 'args': {'icon': 'sd', 'value': '/'}},
+    {'type': 'network', 'args': {'icon': 'lan', 'value': 'eth0'}},
+    {'type': 'docker', 'args': None},
+    {'type': 'cpugraph', 'args': None},
+    {'type': 'tempgraph', 'args': None},
+    {'type': 'netgraph', 'args': {'icon': 'lan', 'value': 'eth0'}}
+]
+
+
+def add_stub_metrics(rng, sensor_dir):
+    """Register metrics with fake data before the pages register the real ones"""
+    from modules.probe import Probes
+    from modules.sampler import Sampler
+    # Fake thermal zone, so the temperature sensor is found on every machine
+    os.makedirs(sensor_dir + '/thermal_zone0')
+    with open(sensor_dir + '/thermal_zone0/type', 'w', encoding='utf-8') as file:
+        file.write('cpu-thermal\n')
+    with open(sensor_dir + '/thermal_zone0/temp', 'w', encoding='utf-8') as file:
+        file.write('47200\n')
+    sensors.THERMAL_PATH = sensor_dir
+    sensors.HWMON_PATH = sensor_dir + '/none'
+    Sampler.add('cpu_percent', lambda: rng.uniform(1, 40), 1)
+    Sampler.add('cpu_freq', lambda: rng.choice([600.0, 1200.0, 1500.0]), 1)
+    Sampler.add('cpu_load', lambda: [rng.uniform(5, 30), 9.5, 8.1], 1)
+    Sampler.add('cpu_temperature:cpu_thermal', lambda: rng.uniform(45, 50), 1)
+    Sampler.add('virtual_memory', lambda: VirtualMemory(
+        1024 ** 3, rng.randint(300, 500) * 1024 ** 2), 1)
+    Sampler.add('ismount:/', lambda: True, 1)
+    Sampler.add_probe('disk_usage:/', Probes.add('disk_usage:/', lambda: DiskUsage(
+        32 * 1024 ** 3, rng.randint(4, 8) * 1024 ** 3, 24 * 1024 ** 3, 20.0)), 1)
+    Sampler.add('net_usage:eth0', lambda: (rng.uniform(0, 1e5), rng.uniform(0, 1e6)), 1)
+    Sampler.add_probe('ipv4:eth0', Probes.add('ipv4:eth0', lambda: '192.168.1.23'), 1)
+    Sampler.add_probe('hostname', Probes.add('hostname', lambda: 'raspberrypi'), 1)
+    Sampler.add_probe('docker', Probes.add('docker', lambda: {
+        'active': True, 'running': rng.randint(3, 5), 'total': 5,
+        'cpu': rng.uniform(0, 5), 'mem': rng.randint(200, 300) * 1024 ** 2,
+        'mem_total': 1024 ** 3, 'pids': rng.randint(80, 120)}), 1)
+
+
+def bench_pages(frames=FRAMES, partial=False):
+    """Cost of the text frames of every page type with fake data
+
+    Pages draw on a SH1106 with a counting serial interface instead of
+    the bus. Per frame: render is the whole page call, display the
+    conversion to device bytes and transmission, draw the rest (copy of
+    the static layer and PIL drawing).
+    """
+    from modules import pages
+    from modules.pages import Pages
+    from modules.sampler import Sampler
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as sensor_dir:
+        add_stub_metrics(rng, sensor_dir)
+        serial = CountingSerial()
+        for page in BENCH_PAGES:
+            Pages.add({
+                'type': page['type'],
+                'ptr': Pages.str_to_ptr(page['type']),
+                'args': page['args'],
+                'refresh': 1
+            })
+        Pages.set_show_icons('no')
+        Pages.init_device(sh1106(serial))
+        Pages.set_partial_update('yes' if partial else 'no', 60)
+        device = pages.device
+        now = 0
+        results = {}
+        loop = asyncio.new_event_loop()
+        for page in BENCH_PAGES:
+            ptr = Pages.str_to_ptr(page['type'])
+            render = 0.0
+            display = device.get_display_time()
+            bytes_sent = serial.bytes
+            frames_sent = device.get_frames_sent()
+            for i in range(frames):
+                # New fake values for every frame
+                now += 10
+                loop.run_until_complete(Sampler.sample_due_async(now))
+                Pages.set_last_loop(0)
+                start = perf_counter()
+                ptr(page['args'])
+                render += perf_counter() - start
+            display = device.get_display_time() - display
+            results[page['type']] = {
+                'render': render / frames,
+                'draw': (render - display) / frames,
+                'display': display / frames,
+                'bytes': (serial.bytes - bytes_sent) / frames,
+                'frames_sent': device.get_frames_sent() - frames_sent
+            }
+        loop.close()
+    return results
+
+
+def main():
+    """Run benchmarks and print the results as JSON, times in seconds"""
+    frames = list(cpumem_frames(FRAMES))
+    full = bench_bytes(frames)
+    partial = bench_bytes(frames, partial=True, full_refresh=60)
+    results = {
+        'frames': FRAMES,
+        'bus': {
+            'full': full,
+            'partial': partial,
+            'saved_percent': 100 - 100 * partial['bytes'] / full['bytes']
+        },
+        'faults': bench_faults(frames),
+        'text': bench_text(),
+        'pages': bench_pages(),
+        'startup': bench_startup()
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import logging
+import os
+
+# Additional pip modules
+from PIL import Image, ImageDraw
+
+# Additional project modules
+
+
+# Path
+REAL_PATH = os.path.dirname(os.path.realpath(__file__))
+ICON_PATH = REAL_PATH + '/icons/'
+
+
+class Assets:
+    """Class Assets
+
+    Loads icons on first use and converts them once to 1-bit bitmaps.
+    Full display frames with a single icon are cached as well, so
+    showing an icon page is a straight copy to the device.
+    """
+
+    __bitmaps = {}
+    __frames = {}
+
+    @staticmethod
+    def bitmap(name):
+        """Get icon as 1-bit bitmap"""
+        if name not in Assets.__bitmaps:
+            with Image.open(ICON_PATH + name + '.png') as icon:
+                # Drawing the icon the same way the pages draw it keeps
+                # the converted bitmap pixel identical
+                bitmap = Image.new('1', icon.size)
+                ImageDraw.Draw(bitmap).bitmap((0, 0), icon, fill=1)
+            Assets.__bitmaps[name] = bitmap
+        return Assets.__bitmaps[name]
+
+    @staticmethod
+    def frame(name, size, xy):
+        """Get display frame of given size with icon at xy"""
+        key = (name, size, xy)
+        if key not in Assets.__frames:
+            frame = Image.new('1', size)
+            ImageDraw.Draw(frame).bitmap(xy, Assets.bitmap(name), fill=1)
+            Assets.__frames[key] = frame
+        return Assets.__frames[key]
+
+    @staticmethod
+    def preload(names):
+        """Load icons ahead of the first frame"""
+        for name in names:
+            try:
+                Assets.bitmap(name)
+            except OSError as e:
+                logging.exception(e)
+
+    @staticmethod
+    def total():
+        """Return number of loaded icons"""
+        return len(Assets.__bitmaps)
@@ -5,15 +5,28 @@ This Python file uses the following encoding: utf-8
 
 
 # Standard librarys
-from time import time
 
 # Additional pip librarys
-import RPi.GPIO as GPIO
+
+# Additional project modules
+from modules.clock import monotonic
+from modules.gpio import POLL_INTERVAL
 
 
 class Buttons:
     """Class Button"""
     __buttons = []
+    __backend = None
+
+    @staticmethod
+    def set_backend(backend):
+        """Set GPIO backend, needs to be set before buttons are added"""
+        Buttons.__backend = backend
+
+    @staticmethod
+    def get_backend():
+        """Get GPIO backend"""
+        return Buttons.__backend
 
     @staticmethod
     def total():
@@ -22,13 +35,13 @@ class Buttons:
 
     @staticmethod
     def pull_up():
-        """Return GPIO.PUD_UP"""
-        return GPIO.PUD_UP
+        """Return PUD_UP of the GPIO backend"""
+        return Buttons.__backend.PUD_UP
 
     @staticmethod
     def pull_down():
-        """Return GPIO.PUD_DOWN"""
-        return GPIO.PUD_DOWN
+        """Return PUD_DOWN of the GPIO backend"""
+        return Buttons.__backend.PUD_DOWN
 
     @staticmethod
     def add(button):
@@ -41,6 +54,14 @@ class Buttons:
         for b in Buttons.__buttons:
             b.check()
 
+    @staticmethod
+    async def wait_async():
+        """Wait on the running loop for a pin change, keep checking while a button is down"""
+        if any(b.is_down() for b in Buttons.__buttons):
+            await Buttons.__backend.wait_async(POLL_INTERVAL)
+        else:
+            await Buttons.__backend.wait_async()
+
     class NewPressed:
         """Class NewPressed"""
 
@@ -53,20 +74,23 @@ class Buttons:
             self.__last_reading = 1
             self.__first_time = 0
 
-            GPIO.setmode(GPIO.BCM)
-            GPIO.setup(self.__pin, GPIO.IN, pull_up_down=self.__pull_up_down)
+            Buttons.get_backend().setup(self.__pin, self.__pull_up_down)
+
+        def is_down(self):
+            """Button is down since last check"""
+            return self.__last_reading == 0
 
         def check(self):
             """Check button for state etc."""
             # Button read gpio
-            self.__reading = GPIO.input(self.__pin)
+            self.__reading = Buttons.get_backend().input(self.__pin)
             # Button first down
             if self.__reading == 0 and self.__last_reading == 1:
-                self.__first_time = time()
+                self.__first_time = monotonic()
             # Button released
             if self.__reading == 1 and self.__last_reading == 0:
                 # Button pressed and debounced
-                if time() - self.__first_time > self.__debounce_time:
+                if monotonic() - self.__first_time > self.__debounce_time:
                     # If function pressed has set
                     if self.__func_pressed:
                         self.__func_pressed()
@@ -87,27 +111,30 @@ class Buttons:
             self.__last_reading = 1
             self.__first_time = 0
 
-            GPIO.setmode(GPIO.BCM)
-            GPIO.setup(self.__pin, GPIO.IN, pull_up_down=self.__pull_up_down)
+            Buttons.get_backend().setup(self.__pin, self.__pull_up_down)
+
+        def is_down(self):
+            """Button is down since last check"""
+            return self.__last_reading == 0
 
         def check(self):
             """Check button for state etc."""
             # Button read gpio
-            self.__reading = GPIO.input(self.__pin)
+            self.__reading = Buttons.get_backend().input(self.__pin)
             # Button first down
             if self.__reading == 0 and self.__last_reading == 1:
-                self.__first_time = time()
+                self.__first_time = monotonic()
             # Button down
             if self.__reading == 0 and self.__last_reading == 0:
                 # Button for pressed
-                if time() - self.__first_time > self.__debounce_time:
+                if monotonic() - self.__first_time > self.__debounce_time:
                     # If function for pressed has set
                     if self.__func_for_pressed:
                         self.__func_for_pressed()
             # Button released
             if self.__reading == 1 and self.__last_reading == 0:
                 # Button pressed and debounced
-                if time() - self.__first_time > self.__debounce_time:
+                if monotonic() - self.__first_time > self.__debounce_time:
                     # If function released has set
                     if self.__func_released:
                         self.__func_released()
@@ -131,25 +158,28 @@ class Buttons:
             self.__last_reading = 1
             self.__first_time = 0
 
-            GPIO.setmode(GPIO.BCM)
-            GPIO.setup(self.__pin, GPIO.IN, pull_up_down=self.__pull_up_down)
+            Buttons.get_backend().setup(self.__pin, self.__pull_up_down)
+
+        def is_down(self):
+            """Button is down since last check"""
+            return self.__last_reading == 0
 
         def check(self):
             """Check button for state etc."""
             # Button read gpio
-            self.__reading = GPIO.input(self.__pin)
+            self.__reading = Buttons.get_backend().input(self.__pin)
             # Button first down
             if self.__reading == 0 and self.__last_reading == 1:
-                self.__first_time = time()
+                self.__first_time = monotonic()
             # Button released
             if self.__reading == 1 and self.__last_reading == 0:
                 # Button held
-                if time() - self.__first_time > self.__hold_time:
+                if monotonic() - self.__first_time > self.__hold_time:
                     # If function held has set
                     if self.__func_held:
                         self.__func_held()
                 # Button pressed and debounced
-                elif time() - self.__first_time > self.__debounce_time:
+                elif monotonic() - self.__first_time > self.__debounce_time:
                     # If function pressed has set
                     if self.__func_pressed:
                         self.__func_pressed()
@@ -173,32 +203,35 @@ class Buttons:
             self.__last_reading = 1
             self.__first_time = 0
 
-            GPIO.setmode(GPIO.BCM)
-            GPIO.setup(self.__pin, GPIO.IN, pull_up_down=self.__pull_up_down)
+            Buttons.get_backend().setup(self.__pin, self.__pull_up_down)
+
+        def is_down(self):
+            """Button is down since last check"""
+            return self.__last_reading == 0
 
         def check(self):
             """Check button for state etc."""
             # Button read gpio
-            self.__reading = GPIO.input(self.__pin)
+            self.__reading = Buttons.get_backend().input(self.__pin)
             # Button first down
             if self.__reading == 0 and self.__last_reading == 1:
-                self.__first_time = time()
+                self.__first_time = monotonic()
             # Button down
             if self.__reading == 0 and self.__last_reading == 0:
                 # Button for held
-                if time() - self.__first_time > self.__hold_time:
+                if monotonic() - self.__first_time > self.__hold_time:
                     # If function for held has set
                     if self.__func_for_held:
                         self.__func_for_held()
                 # Button for pressed
-                elif time() - self.__first_time > self.__debounce_time:
+                elif monotonic() - self.__first_time > self.__debounce_time:
                     # If function for pressed has set
                     if self.__func_for_pressed:
                         self.__func_for_pressed()
             # Button released
             if self.__reading == 1 and self.__last_reading == 0:
                 # Button held
-                if time() - self.__first_time > self.__hold_time:
+                if monotonic() - self.__first_time > self.__hold_time:
                     # If function released has set
                     if self.__func_released:
                         self.__func_released()
@@ -206,7 +239,7 @@ class Buttons:
                     if self.__func_held:
                         self.__func_held()
                 # Button pressed and debounced
-                elif time() - self.__first_time > self.__debounce_time:
+                elif monotonic() - self.__first_time > self.__debounce_time:
                     # If function released has set
                     if self.__func_released:
                         self.__func_released()
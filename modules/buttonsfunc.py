@@ -5,6 +5,7 @@ This Python file uses the following encoding: utf-8
 
 
 # Standard modules
+import asyncio
 import logging
 import subprocess
 
@@ -12,55 +13,67 @@ import subprocess
 
 # Additional project modules
 from modules.pages import Pages
+from modules.probe import run_command
+from modules.runtime import Runtime
 
 
 class ButtonsFunc:
     """Class ButtonFunc"""
 
     @staticmethod
-    def next_pressed_func():
+    def execute(*args):
+        """Run command, as a task if it is called on the runtime loop"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            subprocess.run(args, check=True)
+            return
+        Runtime.spawn(run_command(*args))
+
+    @staticmethod
+    def next_pressed_func(screen=None):
         """When button was pressed go to next page"""
-        Pages.next()
+        Pages.next(screen)
 
     @staticmethod
-    def for_poweroff_held_func():
+    def for_poweroff_held_func(screen=None):
         """When button is held show poweroff image"""
         try:
-            Pages.set_show_pages(False)
-            Pages.poweroff()
+            Pages.set_show_pages(False, screen)
+            Pages.poweroff(screen)
         except Exception as e:
             logging.error(e)
 
     @staticmethod
-    def poweroff_held_func():
+    def poweroff_held_func(screen=None):
         """When button was held execute poweroff"""
         try:
-            Pages.set_show_pages(False)
-            Pages.poweroff()
-            subprocess.run('sudo poweroff', shell=True, check=True)
+            Pages.set_show_pages(False, screen)
+            Pages.poweroff(screen)
+            ButtonsFunc.execute('sudo', 'poweroff')
         except Exception as e:
             logging.exception(e)
 
     @staticmethod
-    def previous_pressed_func():
+    def previous_pressed_func(screen=None):
         """When button was pressed go to previous page"""
-        Pages.previous()
+        Pages.previous(screen)
 
     @staticmethod
-    def for_reboot_held_func():
+    def for_reboot_held_func(screen=None):
         """When button is held show reboot image"""
         try:
-            Pages.set_show_pages(False)
-            Pages.reboot()
+            Pages.set_show_pages(False, screen)
+            Pages.reboot(screen)
         except Exception as e:
             logging.exception(e)
 
     @staticmethod
-    def reboot_held_func():
+    def reboot_held_func(screen=None):
         """When button was held execute reboot"""
         try:
-            Pages.set_show_pages(False)
-            Pages.reboot()
-            subprocess.run('sudo reboot', shell=True, check=True)
+            Pages.set_show_pages(False, screen)
+            Pages.reboot(screen)
+            ButtonsFunc.execute('sudo', 'reboot')
         except Exception as e:
             logging.exception(e)
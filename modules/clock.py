@@ -0,0 +1,119 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import asyncio
+import selectors
+import time
+
+# Additional pip modules
+
+# Additional project modules
+
+
+class Clock:
+    """Class Clock
+
+    Source of monotonic() for pages, sampler, probes and buttons. The
+    runtime sets it to the time of its event loop, which is the real
+    monotonic clock or a VirtualClock.
+    """
+
+    __time = time.monotonic
+
+    @staticmethod
+    def set(func):
+        """Set time function, None for the real monotonic clock"""
+        Clock.__time = time.monotonic if func is None else func
+
+    @staticmethod
+    def time():
+        """Get time in seconds"""
+        return Clock.__time()
+
+
+def monotonic():
+    """Get monotonic time in seconds of the app clock"""
+    return Clock.time()
+
+
+class VirtualClock:
+    """Class VirtualClock - Time which only moves when it is advanced
+
+    Starts at the real monotonic time by default, so times taken before
+    the clock was set, e.g. when the pages were set up, stay valid.
+    """
+
+    def __init__(self, start=None):
+        self.__now = time.monotonic() if start is None else start
+
+    def time(self):
+        """Get virtual time in seconds"""
+        return self.__now
+
+    def advance(self, seconds):
+        """Move virtual time forward"""
+        self.__now += max(seconds, 0)
+
+
+class VirtualSelector(selectors.BaseSelector):
+    """Class VirtualSelector
+
+    Wraps a real selector. Ready file descriptors are returned at once,
+    otherwise the virtual clock jumps to the end of the timeout instead
+    of sleeping. Without a timeout it waits for real, e.g. for a probe
+    worker or a child process.
+    """
+
+    def __init__(self, clock):
+        self.__selector = selectors.DefaultSelector()
+        self.__clock = clock
+
+    def register(self, fileobj, events, data=None):
+        """Register file object"""
+        return self.__selector.register(fileobj, events, data)
+
+    def unregister(self, fileobj):
+        """Unregister file object"""
+        return self.__selector.unregister(fileobj)
+
+    def modify(self, fileobj, events, data=None):
+        """Modify registered file object"""
+        return self.__selector.modify(fileobj, events, data)
+
+    def select(self, timeout=None):
+        """Get ready file objects, advance the clock if there are none"""
+        if timeout is None:
+            return self.__selector.select()
+        ready = self.__selector.select(0)
+        if not ready:
+            self.__clock.advance(timeout)
+        return ready
+
+    def close(self):
+        """Close real selector"""
+        self.__selector.close()
+
+    def get_map(self):
+        """Get map of registered file objects"""
+        return self.__selector.get_map()
+
+
+class VirtualEventLoop(asyncio.SelectorEventLoop):
+    """Class VirtualEventLoop
+
+    Event loop on a VirtualClock. Sleeps and timeouts finish at once in
+    real time but in order of their virtual time, so a test of minutes
+    of runtime is deterministic and takes milliseconds.
+    """
+
+    def __init__(self, clock=None):
+        self.clock = VirtualClock() if clock is None else clock
+        super().__init__(VirtualSelector(self.clock))
+
+    def time(self):
+        """Get virtual time of the loop"""
+        return self.clock.time()
@@ -0,0 +1,491 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import asyncio
+from collections import namedtuple
+from functools import partial
+import hashlib
+import logging
+import os
+from types import MappingProxyType
+
+# Additional pip modules
+import yaml
+
+# Additional project modules
+from modules.assets import Assets
+from modules.buttons import Buttons
+from modules.buttonsfunc import ButtonsFunc
+from modules.devices import DisplaySettings
+from modules import gpio
+from modules.logs import Logs, LogSettings
+from modules.metrics import Metrics
+from modules.pages import Docker, Pages
+from modules.sampler import Sampler
+from modules.watch import FileWatch
+
+
+RELOAD_DELAY = 0.2  # Seconds to wait for more changes before a reload
+RELOAD_POLL = 2     # Seconds between two checks without inotify
+
+# Validated config, only built by Config.compile()
+Plan = namedtuple('Plan', 'dockerstatusttl probebudget gpiobackend port socket logging screens')
+ScreenPlan = namedtuple('ScreenPlan', 'name showicons mode autodelay screensaver '
+                                      'partialupdate fullrefresh display pages buttons')
+PagePlan = namedtuple('PagePlan', 'type args refresh')
+ButtonPlan = namedtuple('ButtonPlan', 'type gpio func holdfunc holdtime')
+
+
+class ConfigError(Exception):
+    """Config is missing or not setup correctly"""
+
+
+class Config:
+    """Class Config
+
+    Compiles config.yml into an immutable Plan first and applies it
+    only if all of it is valid. reload() applies a changed file while
+    the pages are running: pages, mode and timings of every display
+    are swapped at once. Changes of the display hardware, the buttons,
+    the number of displays and the metrics endpoint need a restart.
+    """
+
+    __path = None
+    __plan = None
+    __digest = None
+
+    @staticmethod
+    def read(path):
+        """Read config file, get (config, digest of its content)"""
+        if not os.path.exists(path):
+            raise ConfigError('No config found!')
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+            config = yaml.safe_load(data.decode('utf-8'))
+        except Exception as e:
+            raise ConfigError(e) from e
+        if not isinstance(config, dict):
+            raise ConfigError('Config is not a yaml file!')
+        return (config, hashlib.sha256(data).hexdigest())
+
+    @staticmethod
+    def load(path):
+        """Read and compile config file, get its plan"""
+        config, digest = Config.read(path)
+        plan = Config.compile(config)
+        Config.__path = path
+        Config.__plan = plan
+        Config.__digest = digest
+        return plan
+
+    @staticmethod
+    def get_plan():
+        """Get plan which is applied"""
+        return Config.__plan
+
+    @staticmethod
+    def compile(config):
+        """Validate config and convert it to a plan"""
+        config_global = Config.paragraph(config, 'main')
+        dockerstatusttl = None
+        if 'dockerstatusttl' in config_global:
+            dockerstatusttl = Config.to_int(config_global['dockerstatusttl'])
+            if dockerstatusttl is None:
+                raise ConfigError('Config paragraph \'main\' key \'dockerstatusttl\' is not a number!')
+        probebudget = None
+        if 'probebudget' in config_global:
+            try:
+                probebudget = abs(float(config_global['probebudget']))
+            except (TypeError, ValueError):
+                raise ConfigError('Config paragraph \'main\' key \'probebudget\' is not a number!')
+        gpiobackend = str(config_global.get('gpiobackend', 'edge'))
+
+        # Metrics endpoint
+        port = None
+        socket = None
+        config_metrics = Config.paragraph(config, 'metrics')
+        if 'port' in config_metrics:
+            port = Config.to_int(config_metrics['port'])
+            if port is None or not 0 < port < 65536:
+                raise ConfigError('Config paragraph \'metrics\' key \'port\' is not a port number!')
+        if 'socket' in config_metrics:
+            socket = config_metrics['socket']
+            if not isinstance(socket, str) or not socket.startswith('/'):
+                raise ConfigError('Config paragraph \'metrics\' key \'socket\' is not an absolute path!')
+
+        # Logging
+        logs = LogSettings()
+        for key, value in Config.paragraph(config, 'logging').items():
+            if not logs.set(key, value):
+                raise ConfigError(f'Config paragraph \'logging\' key \'{key}\' is not setup correctly!')
+
+        # Displays, without a 'displays' paragraph the config describes one display
+        if 'displays' in config:
+            if not isinstance(config['displays'], list) or not config['displays']:
+                raise ConfigError('Config paragraph \'displays\' is not setup correctly!')
+            screens = []
+            for i, config_display in enumerate(config['displays']):
+                if not isinstance(config_display, dict):
+                    raise ConfigError('Config paragraph \'displays\' is not setup correctly!')
+                name = str(config_display.get('name', f'display{i}'))
+                if name in [s.name for s in screens]:
+                    raise ConfigError(f'Config paragraph \'displays\' name \'{name}\' is used twice!')
+                screens.append(Config.compile_screen(name, config_display))
+        else:
+            screens = [Config.compile_screen('display', config)]
+
+        if any(s.buttons for s in screens) and gpiobackend not in gpio.BACKENDS:
+            raise ConfigError('Config paragraph \'main\' key \'gpiobackend\' is not setup correctly!')
+        return Plan(dockerstatusttl, probebudget, gpiobackend, port, socket, logs, tuple(screens))
+
+    @staticmethod
+    def compile_screen(name, config):
+        """Validate main, display, pages and buttons paragraph of one display"""
+        # Main configuration
+        if not 'main' in config:
+            raise ConfigError('Config does not contain a \'main\' paragraph!')
+        config_main = Config.paragraph(config, 'main')
+        if not 'mode' in config_main:
+            raise ConfigError('Config paragraph \'main\' does not contain a \'mode\' key!')
+        if not 'showicons' in config_main:
+            raise ConfigError('Config paragraph \'main\' does not contain a \'showicons\' key!')
+        showicons = Config.to_bool(config_main['showicons'])
+        if showicons is None:
+            raise ConfigError('Config paragraph \'main\' key \'showicons\' is not setup correctly!')
+        partialupdate = None
+        fullrefresh = Config.to_int(config_main.get('fullrefresh', 60))
+        if 'partialupdate' in config_main:
+            partialupdate = Config.to_bool(config_main['partialupdate'])
+            if partialupdate is None or fullrefresh is None:
+                raise ConfigError('Config paragraph \'main\' key \'partialupdate\' or \'fullrefresh\' is not setup correctly!')
+        autodelay = None
+        screensaver = None
+        mode = str(config_main['mode'])
+        if 'auto' in mode:
+            mode = 'auto'
+            if not 'autodelay' in config_main:
+                raise ConfigError('Config paragraph \'main\' does not contain a \'autodelay\' key!')
+            autodelay = Config.to_int(config_main['autodelay'])
+            if autodelay is None:
+                raise ConfigError('Config paragraph \'main\' key \'autodelay\' is not a number!')
+        elif 'manual' in mode:
+            mode = 'manual'
+            if not 'screensaver' in config_main:
+                raise ConfigError('Config paragraph \'main\' does not contain a \'screensaver\' key!')
+            screensaver = Config.to_int(config_main['screensaver'])
+            if screensaver is None:
+                raise ConfigError('Config paragraph \'main\' key \'screensaver\' is not a number!')
+        else:
+            raise ConfigError('Config paragraph \'main\' key \'mode\' is not setup correctly!')
+
+        # Display configuration, the page layout depends on it
+        display = DisplaySettings()
+        for key, value in Config.paragraph(config, 'display').items():
+            if not display.set(key, value):
+                raise ConfigError(f'Config paragraph \'display\' key \'{key}\' is not setup correctly!')
+
+        # Pages configuration
+        if not 'pages' in config or not isinstance(config['pages'], list):
+            raise ConfigError('Config does not contain a \'pages\' paragraph!')
+        pages = tuple(Config.compile_page(p) for p in config['pages'])
+
+        # Buttons configuration
+        buttons = ()
+        if mode == 'manual':
+            if not 'buttons' in config:
+                raise ConfigError('Config does not contain a \'buttons\' paragraph!')
+            if config['buttons'] is None:
+                raise ConfigError('You need to setup at least one push button!')
+            if not isinstance(config['buttons'], list):
+                raise ConfigError('Config paragraph \'buttons\' is not setup correctly!')
+            buttons = tuple(Config.compile_button(b) for b in config['buttons'])
+        return ScreenPlan(name, showicons, mode, autodelay, screensaver,
+                          partialupdate, fullrefresh, display, pages, buttons)
+
+    @staticmethod
+    def compile_page(config_page):
+        """Validate one page"""
+        if not isinstance(config_page, dict) or not 'type' in config_page:
+            raise ConfigError('Config paragraph \'pages\' is not setup correctly!')
+        key = str(config_page['type']).lower()
+        requirements = Pages.requirements().get(key)
+        if requirements is None:
+            raise ConfigError('Config paragraph \'pages\' is not setup correctly!')
+        refresh = requirements['refresh']
+        if 'refresh' in config_page:
+            try:
+                refresh = abs(float(config_page['refresh']))
+            except (TypeError, ValueError):
+                refresh = 0
+            if refresh == 0:
+                raise ConfigError(f'Config paragraph \'pages\' key \'{key}\' refresh is not a number greater 0!')
+        if requirements['pointer'] == 'simple':
+            if 'icon' in config_page or 'value' in config_page:
+                raise ConfigError(f'Config paragraph \'pages\' key \'{key}\' is not setup correctly!')
+            args = None
+            if 'sensor' in config_page:
+                if not 'sensor' in requirements['options']:
+                    raise ConfigError(f'Config paragraph \'pages\' key \'{key}\' does not support a sensor!')
+                # The sensor is looked up when the page is applied, compiling does not touch the hardware
+                if not isinstance(config_page['sensor'], str) or not config_page['sensor'].strip():
+                    raise ConfigError(f'Config paragraph \'pages\' key \'{key}\' sensor is not a name!')
+                args = MappingProxyType({'sensor': str(config_page['sensor'])})
+        else:
+            if not 'icon' in config_page or not 'value' in config_page:
+                raise ConfigError(f'Config paragraph \'pages\' key \'{key}\' is not setup correctly!')
+            if not config_page['icon'] in requirements['icons']:
+                raise ConfigError(f'Config paragraph \'pages\' key \'{key}\' is not setup correctly!')
+            if not requirements['values'].match(str(config_page['value'])):
+                raise ConfigError(f'Config paragraph \'pages\' key \'{key}\' is not setup correctly!')
+            args = MappingProxyType({'icon': config_page['icon'], 'value': str(config_page['value'])})
+        return PagePlan(key, args, refresh)
+
+    @staticmethod
+    def compile_button(config_buttons):
+        """Validate one button"""
+        if not isinstance(config_buttons, dict) or not all(k in config_buttons for k in ('type', 'gpio', 'func')):
+            raise ConfigError('Config paragraph \'buttons\' is not setup correctly!')
+        pin = Config.to_int(config_buttons['gpio'])
+        if pin is None:
+            raise ConfigError('Config paragraph \'buttons\' key \'gpio\' is not a number!')
+        func = str(config_buttons['func'])
+        if 'next' in func:
+            func = 'next'
+        elif 'previous' in func:
+            func = 'previous'
+        else:
+            raise ConfigError('Config paragraph \'buttons\' key \'func\' is not setup correctly!')
+        kind = str(config_buttons['type'])
+        if 'pressed' in kind:
+            return ButtonPlan('pressed', pin, func, None, None)
+        if not 'hold' in kind:
+            raise ConfigError('Config paragraph \'buttons\' key \'type\' is not setup correctly!')
+        if not 'holdfunc' in config_buttons or not 'holdtime' in config_buttons:
+            raise ConfigError('Config paragraph \'buttons\' is not setup correctly!')
+        holdfunc = str(config_buttons['holdfunc'])
+        if 'poweroff' in holdfunc:
+            holdfunc = 'poweroff'
+        elif 'reboot' in holdfunc:
+            holdfunc = 'reboot'
+        else:
+            raise ConfigError('Config paragraph \'buttons\' key \'holdfunc\' is not setup correctly!')
+        holdtime = Config.to_int(config_buttons['holdtime'])
+        if holdtime is None:
+            raise ConfigError('Config paragraph \'buttons\' key \'holdtime\' is not a number!')
+        return ButtonPlan('hold', pin, func, holdfunc, holdtime)
+
+    @staticmethod
+    def paragraph(config, key):
+        """Get paragraph of config, an empty one if it is missing or empty"""
+        value = config.get(key)
+        if value is None:
+            return {}
+        if not isinstance(value, dict):
+            raise ConfigError(f'Config paragraph \'{key}\' is not setup correctly!')
+        return value
+
+    @staticmethod
+    def to_int(value):
+        """Convert to a positive int, None if it is not a number"""
+        try:
+            return abs(int(value))
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def to_bool(value):
+        """Convert 'yes' and 'no' to bool, None otherwise"""
+        if 'yes' in str(value):
+            return True
+        if 'no' in str(value):
+            return False
+        return None
+
+    @staticmethod
+    def apply(plan):
+        """Apply plan at startup, before the hardware is initialised"""
+        Logs.configure(plan.logging)
+        if plan.port is not None:
+            Metrics.set_port(plan.port)
+        if plan.socket is not None:
+            Metrics.set_socket(plan.socket)
+        icons = []
+        for i, screen_plan in enumerate(plan.screens):
+            if i == 0:
+                screen = Pages.get_screen()
+                screen.name = screen_plan.name
+            else:
+                screen = Pages.add_screen(screen_plan.name)
+            Pages.set_display(screen_plan.display)
+            icons += Config.apply_buttons(screen_plan, screen, plan.gpiobackend)
+        Config.apply_timings(plan)
+        # Load only the icons which are used
+        Assets.preload(icons + Config.apply_pages(plan))
+
+    @staticmethod
+    def apply_timings(plan):
+        """Apply settings which can change while the pages are running"""
+        if plan.dockerstatusttl is not None:
+            Docker.set_status_ttl(plan.dockerstatusttl)
+        if plan.probebudget is not None:
+            Sampler.set_budget(plan.probebudget)
+        for screen, screen_plan in zip(Pages.get_screens(), plan.screens):
+            Pages.select(screen)
+            Pages.set_show_icons('yes' if screen_plan.showicons else 'no')
+            Pages.set_mode(screen_plan.mode)
+            if screen_plan.autodelay is not None:
+                Pages.set_auto_delay(screen_plan.autodelay)
+            if screen_plan.screensaver is not None:
+                Pages.Screensaver.set(screen_plan.screensaver)
+            if screen_plan.partialupdate is not None:
+                Pages.set_partial_update('yes' if screen_plan.partialupdate else 'no',
+                                         screen_plan.fullrefresh)
+
+    @staticmethod
+    def apply_pages(plan):
+        """Swap pages of all displays, get the icons they use"""
+        icons = []
+        # Only the metrics of the new pages are sampled
+        Sampler.begin()
+        try:
+            for screen, screen_plan in zip(Pages.get_screens(), plan.screens):
+                Pages.set_pages([{
+                    'type': p.type,
+                    'ptr': Pages.str_to_ptr(p.type),
+                    'args': p.args,
+                    'refresh': p.refresh
+                } for p in screen_plan.pages], screen)
+                icons += Pages.icons(screen)
+        finally:
+            Sampler.commit()
+        return icons
+
+    @staticmethod
+    def apply_buttons(screen_plan, screen, backend_name):
+        """Set up buttons of a display, get the icons they use"""
+        icons = []
+        if not screen_plan.buttons:
+            return icons
+        if Buttons.get_backend() is None:
+            Buttons.set_backend(gpio.create(backend_name))
+        for button in screen_plan.buttons:
+            if button.func == 'next':
+                FUNC = partial(ButtonsFunc.next_pressed_func, screen)
+            else:
+                FUNC = partial(ButtonsFunc.previous_pressed_func, screen)
+            if button.type == 'pressed':
+                Buttons.add(Buttons.NewPressed(
+                    button.gpio,
+                    Buttons.pull_up(),
+                    {'pressed': FUNC}
+                ))
+                continue
+            if button.holdfunc == 'poweroff':
+                FOR_HELD_FUNC = partial(ButtonsFunc.for_poweroff_held_func, screen)
+                HELD_FUNC = partial(ButtonsFunc.poweroff_held_func, screen)
+            else:
+                FOR_HELD_FUNC = partial(ButtonsFunc.for_reboot_held_func, screen)
+                HELD_FUNC = partial(ButtonsFunc.reboot_held_func, screen)
+            icons.append(button.holdfunc)
+            Buttons.add(Buttons.NewHeldAdvanced(
+                button.gpio,
+                Buttons.pull_up(),
+                {
+                    'for_pressed': None,
+                    'for_held': FOR_HELD_FUNC,
+                    'released': None,
+                    'pressed': FUNC,
+                    'held': HELD_FUNC
+                },
+                hold_time=button.holdtime
+            ))
+        return icons
+
+    @staticmethod
+    def reload():
+        """Apply changed config file while the pages are running, False if nothing was applied"""
+        try:
+            config, digest = Config.read(Config.__path)
+            if digest == Config.__digest:
+                return False
+            plan = Config.compile(config)
+        except ConfigError as e:
+            logging.error(f'Config not reloaded: {e}')
+            return False
+        except Exception as e:
+            # A config the checks missed must not stop the watch
+            logging.exception(f'Config not reloaded: {e}')
+            return False
+        old = Config.__plan
+        if [s.name for s in plan.screens] != [s.name for s in old.screens]:
+            logging.error('Config not reloaded: Displays were added, removed or renamed, restart to apply!')
+            return False
+        # The hardware keeps its settings until the next restart
+        for new, current in zip(plan.screens, old.screens):
+            if vars(new.display) != vars(current.display) or new.buttons != current.buttons:
+                logging.warning(f'Config display \'{new.name}\' hardware or buttons changed, restart to apply!')
+        if (plan.port, plan.socket, plan.gpiobackend) != (old.port, old.socket, old.gpiobackend):
+            logging.warning('Config metrics or gpiobackend changed, restart to apply!')
+        plan = plan._replace(screens=tuple(
+            new._replace(display=current.display, buttons=current.buttons)
+            for new, current in zip(plan.screens, old.screens)))
+        Config.__plan = plan
+        Config.__digest = digest
+        # Runs on the loop of the pages, which see either the old or the new plan
+        try:
+            Logs.configure(plan.logging)
+            Config.apply_timings(plan)
+            Assets.preload(Config.apply_pages(plan))
+        except Exception as e:
+            logging.exception(f'Config reloaded with errors: {e}')
+            return True
+        logging.info('Config reloaded')
+        return True
+
+    @staticmethod
+    async def reload_async():
+        """Like reload(), the pages show a new plan once its metrics are sampled"""
+        if not Config.reload():
+            return False
+        # Starts the new metrics before the sampler task wakes up
+        await Sampler.sample_due_async()
+        Pages.wake()
+        return True
+
+    @staticmethod
+    async def watch():
+        """Reload config file whenever it changes, runs as a task of the runtime"""
+        if Config.__path is None:
+            return
+        try:
+            watch = FileWatch(Config.__path)
+        except OSError as e:
+            logging.warning(f'No inotify, check config every {RELOAD_POLL} seconds: {e}')
+            watch = None
+        if watch is None:
+            while True:
+                await asyncio.sleep(RELOAD_POLL)
+                await Config.reload_async()
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        try:
+            while True:
+                loop.add_reader(watch.fileno(), event.set)
+                await event.wait()
+                # The reader fires as long as events are unread, not while they are waited for
+                loop.remove_reader(watch.fileno())
+                event.clear()
+                if not watch.changed():
+                    continue
+                # Editors write a file in several steps
+                await asyncio.sleep(RELOAD_DELAY)
+                watch.changed()
+                await Config.reload_async()
+        finally:
+            loop.remove_reader(watch.fileno())
+            watch.close()
@@ -0,0 +1,127 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import threading
+
+# Additional pip modules
+
+# Additional project modules
+
+
+DRIVERS = ['sh1106', 'ssd1306', 'ssd1309']
+INTERFACES = ['i2c', 'spi', 'dummy']
+ROTATIONS = [0, 90, 180, 270]
+
+BUS_LOCKS = {}
+
+
+class DisplaySettings:
+    """Class DisplaySettings
+
+    Display hardware of the config paragraph 'display'. The defaults
+    are the SH1106 128x64 on I2C port 1, address 0x3C. The port
+    defaults to 1 for I2C and 0 for SPI.
+    """
+
+    def __init__(self):
+        self.driver = 'sh1106'
+        self.interface = 'i2c'
+        self.port = None
+        self.address = 0x3C
+        self.spidevice = 0
+        self.spispeed = 8000000
+        self.gpiodc = 24
+        self.gpioreset = 25
+        self.width = 128
+        self.height = 64
+        self.rotation = 0
+        self.retries = 3
+        self.reinitafter = 3
+
+    def keys(self):
+        """Get config keys"""
+        return list(vars(self))
+
+    def set(self, key, value):
+        """Set config key, False if the key or the value is not valid"""
+        if key == 'driver':
+            if str(value).lower() not in DRIVERS:
+                return False
+            self.driver = str(value).lower()
+        elif key == 'interface':
+            if str(value).lower() not in INTERFACES:
+                return False
+            self.interface = str(value).lower()
+        elif key == 'rotation':
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                return False
+            if value not in ROTATIONS:
+                return False
+            self.rotation = value
+        elif key in self.keys():
+            try:
+                # Also accepts strings like '0x3C'
+                value = int(value, 0) if isinstance(value, str) else int(value)
+            except (TypeError, ValueError):
+                return False
+            if value < 0 or (key in ('width', 'height', 'spispeed', 'reinitafter') and value == 0):
+                return False
+            setattr(self, key, value)
+        else:
+            return False
+        return True
+
+    def get_port(self):
+        """Get configured port or the default port of the interface"""
+        if self.port is not None:
+            return self.port
+        return 0 if self.interface == 'spi' else 1
+
+    def get_size(self):
+        """Get (width, height) of the pages, swapped for 90 and 270 degrees"""
+        if self.rotation in (90, 270):
+            return (self.height, self.width)
+        return (self.width, self.height)
+
+
+def bus_lock(settings):
+    """Get lock of the bus the display is connected to, shared by all its displays"""
+    key = (settings.interface, settings.get_port())
+    return BUS_LOCKS.setdefault(key, threading.RLock())
+
+
+def create_serial(settings):
+    """Create luma serial interface of display settings, None for dummy"""
+    # Imported here, loading the drivers is slow on small boards
+    if settings.interface == 'dummy':
+        return None
+    if settings.interface == 'spi':
+        from luma.core.interface.serial import spi
+        return spi(port=settings.get_port(), device=settings.spidevice,
+                   bus_speed_hz=settings.spispeed,
+                   gpio_DC=settings.gpiodc, gpio_RST=settings.gpioreset)
+    from luma.core.interface.serial import i2c
+    return i2c(port=settings.get_port(), address=settings.address)
+
+
+def create(settings, serial=None):
+    """Create luma device of display settings, on serial or a new serial interface"""
+    rotate = settings.rotation // 90
+    if settings.interface == 'dummy':
+        from luma.core.device import dummy
+        return dummy(width=settings.width, height=settings.height, rotate=rotate, mode='1')
+    if serial is None:
+        serial = create_serial(settings)
+    if settings.driver == 'ssd1306':
+        from luma.oled.device import ssd1306 as driver
+    elif settings.driver == 'ssd1309':
+        from luma.oled.device import ssd1309 as driver
+    else:
+        from luma.oled.device import sh1106 as driver
+    return driver(serial, width=settings.width, height=settings.height, rotate=rotate)
@@ -0,0 +1,218 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import asyncio
+import logging
+from time import perf_counter
+
+# Additional pip modules
+from PIL import Image
+
+# Additional project modules
+from modules.transport import Transport, TransferError
+
+
+# SH1106 commands
+SH1106_SET_PAGE_ADDRESS = 0xB0
+SH1106_SET_LOW_COLUMN = 0x00
+SH1106_SET_HIGH_COLUMN = 0x10
+
+
+class Display:
+    """Class Display
+
+    Sits between the pages and the luma device. Every finished canvas
+    is handed to display(), which only transmits the frame when its
+    content differs from the last transmitted frame.
+
+    In partial mode only the dirty column range of every dirty 8 pixel
+    page (band) is transmitted. Every full_refresh frames the whole
+    frame is sent again.
+
+    A transfer which failed on the runtime loop is sent again after the
+    backoff of the transport by a timer of the loop. Newer frames wait
+    for that timer, only the newest one is sent.
+    """
+
+    def __init__(self, device=None, *, partial=False, full_refresh=60):
+        self.__device = device
+        self.__partial_requested = False
+        self.__partial = False
+        self.__full_refresh = 0
+        self.__last_frame = None
+        self.__last_bands = None
+        self.__partial_count = 0
+        self.__frames_rendered = 0
+        self.__frames_sent = 0
+        self.__bytes_sent = 0
+        self.__display_time = 0.0
+        self.__frame_id = 0
+        self.__retry_handle = None
+        self.__retry_image = None
+        self.set_partial(partial, full_refresh)
+
+    def __getattr__(self, name):
+        """Forward everything else (show, hide, size, mode ...) to the device"""
+        return getattr(self.__device, name)
+
+    def get_device(self):
+        """Get wrapped luma device"""
+        return self.__device
+
+    def set_device(self, device):
+        """Set wrapped luma device"""
+        self.__device = device
+        self.set_partial(self.__partial_requested, self.__full_refresh)
+
+    def get_transport(self):
+        """Get instrumented transport of the device, None if it has none"""
+        serial = getattr(self.__device, '_serial_interface', None)
+        return serial if isinstance(serial, Transport) else None
+
+    def supports_partial(self):
+        """Partial updates are only implemented for page addressed SH1106"""
+        return hasattr(self.__device, '_page_address_offset')
+
+    def set_partial(self, partial, full_refresh=60):
+        """Set partial update mode and full refresh interval in frames"""
+        try:
+            self.__full_refresh = abs(int(full_refresh))
+        except ValueError:
+            return False
+        self.__partial_requested = bool(partial)
+        self.__partial = self.__partial_requested and self.supports_partial()
+        self.invalidate()
+        return True
+
+    def get_partial(self):
+        """Get partial update mode"""
+        return self.__partial
+
+    def get_frames_rendered(self):
+        """Get number of frames handed over by the pages"""
+        return self.__frames_rendered
+
+    def get_frames_sent(self):
+        """Get number of frames transmitted to the device"""
+        return self.__frames_sent
+
+    def get_bytes_sent(self):
+        """Get number of command and data bytes transmitted for frames"""
+        return self.__bytes_sent
+
+    def get_display_time(self):
+        """Get seconds spent converting and transmitting frames"""
+        return self.__display_time
+
+    def get_frame_id(self):
+        """Get id of the shown frame, changes with every sent or invalidated frame"""
+        return self.__frame_id
+
+    def invalidate(self):
+        """Forget last transmitted frame, next frame is always sent in full"""
+        self.__last_frame = None
+        self.__last_bands = None
+        self.__frame_id += 1
+
+    def clear(self):
+        """Clear device and forget last transmitted frame"""
+        self.__device.clear()
+        self.invalidate()
+
+    def display(self, image):
+        """Transmit image to device if it differs from the last frame"""
+        self.__frames_rendered += 1
+        start = perf_counter()
+        frame = image.tobytes()
+        if frame == self.__last_frame:
+            self.__display_time += perf_counter() - start
+            return False
+        if self.__retry_handle is not None:
+            # Bus is backing off, the timer sends the newest frame
+            self.__retry_image = image
+            self.__display_time += perf_counter() - start
+            return False
+        transport = self.get_transport()
+        if transport is not None:
+            transport.begin_frame()
+        try:
+            if self.__partial:
+                self.__display_partial(image)
+            else:
+                self.__device.display(image)
+                self.__bytes_sent += self.__full_frame_bytes()
+        except TransferError as e:
+            # Display may show half of the frame, send all of it again
+            self.invalidate()
+            self.__retry_image = image
+            self.__retry_handle = asyncio.get_running_loop().call_later(e.retry_after, self.__retry)
+            return False
+        finally:
+            self.__display_time += perf_counter() - start
+            if transport is not None:
+                transport.end_frame()
+        self.__last_frame = frame
+        self.__frames_sent += 1
+        self.__frame_id += 1
+        return True
+
+    def __retry(self):
+        """Send frame again which failed or waited for the backoff"""
+        image = self.__retry_image
+        self.__retry_handle = None
+        self.__retry_image = None
+        try:
+            self.display(image)
+        except Exception as e:
+            logging.error(e)
+
+    def __full_frame_bytes(self):
+        """Bytes luma transmits for a full frame (3 command bytes per page)"""
+        pages = self.__device.height // 8
+        return pages * (3 + self.__device.width)
+
+    def __get_bands(self, image):
+        """Convert image to one bytes object per page, LSB is the top row"""
+        image = self.__device.preprocess(image)
+        pages = image.height // 8
+        # After flipping and transposing every image row holds one display
+        # column, packed MSB first, so page p ends up in byte pages-1-p
+        columns = image.transpose(Image.Transpose.FLIP_TOP_BOTTOM).transpose(
+            Image.Transpose.TRANSPOSE).tobytes()
+        return [columns[pages - 1 - p::pages] for p in range(pages)]
+
+    def __display_partial(self, image):
+        """Send only the dirty column range of each dirty page"""
+        bands = self.__get_bands(image)
+        full = self.__last_bands is None or (
+            self.__full_refresh and self.__partial_count >= self.__full_refresh)
+        if full:
+            self.__partial_count = 0
+        else:
+            self.__partial_count += 1
+        for page, band in enumerate(bands):
+            if full:
+                first = 0
+                last = len(band) - 1
+            else:
+                last_band = self.__last_bands[page]
+                if band == last_band:
+                    continue
+                first = 0
+                while band[first] == last_band[first]:
+                    first += 1
+                last = len(band) - 1
+                while band[last] == last_band[last]:
+                    last -= 1
+            column = first + self.__device._page_address_offset
+            self.__device.command(
+                SH1106_SET_PAGE_ADDRESS + page,
+                SH1106_SET_LOW_COLUMN | (column & 0x0F),
+                SH1106_SET_HIGH_COLUMN | (column >> 4))
+            self.__device.data(list(band[first:last + 1]))
+            self.__bytes_sent += 3 + last + 1 - first
+        self.__last_bands = bands
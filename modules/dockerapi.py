@@ -0,0 +1,207 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import http.client
+import json
+import socket
+
+# Additional pip modules
+
+# Additional project modules
+from modules.clock import monotonic
+
+
+DOCKER_SOCKET = '/var/run/docker.sock'
+DOCKER_PID_FILE = '/var/run/docker.pid'
+TIMEOUT = 5  # Seconds
+STATUS_TTL = 30  # Seconds a daemon status check is cached
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """Class UnixHTTPConnection - HTTP/1.1 over a unix socket"""
+
+    def __init__(self, path, timeout=TIMEOUT):
+        super().__init__('localhost', timeout=timeout)
+        self.__path = path
+
+    def connect(self):
+        """Connect to unix socket instead of host and port"""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.__path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class DockerError(Exception):
+    """Docker Engine API returned an error"""
+
+
+class DockerClient:
+    """Class DockerClient
+
+    Talks to the Docker Engine API over one keep-alive connection.
+    CPU usage is calculated from the difference between two one-shot
+    stats requests, so the daemon does not have to wait for a second
+    sample.
+
+    The daemon status is cached for a TTL and checked with the pid file
+    and /proc, or with a ping if there is no readable pid file. A failed
+    request invalidates the cached status.
+    """
+
+    def __init__(self, path=DOCKER_SOCKET, timeout=TIMEOUT, *, pid_file=DOCKER_PID_FILE):
+        self.__path = path
+        self.__timeout = timeout
+        self.__pid_file = pid_file
+        self.__connection = None
+        self.__last_cpu = {}
+        self.__status = None
+        self.__status_time = 0
+
+    def close(self):
+        """Close connection"""
+        if self.__connection is not None:
+            self.__connection.close()
+            self.__connection = None
+
+    def request(self, url):
+        """GET url and return status and body, reconnects once on a stale connection"""
+        for attempt in range(2):
+            if self.__connection is None:
+                self.__connection = UnixHTTPConnection(self.__path, self.__timeout)
+            try:
+                self.__connection.request('GET', url)
+                response = self.__connection.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, OSError):
+                self.close()
+                if attempt:
+                    self.invalidate()
+                    raise
+        return None, None
+
+    def get(self, url):
+        """GET url and return decoded json"""
+        status, body = self.request(url)
+        if status != 200:
+            self.invalidate()
+            raise DockerError(f'{url}: {status} {body[:100]!r}')
+        return json.loads(body)
+
+    def ping(self):
+        """Check if the daemon answers"""
+        status, body = self.request('/_ping')
+        return status == 200
+
+    def invalidate(self):
+        """Forget cached daemon status"""
+        self.__status = None
+
+    def is_active(self, ttl=STATUS_TTL):
+        """Check if the daemon is running, the result is cached for ttl seconds"""
+        now = monotonic()
+        if self.__status is None or now - self.__status_time >= ttl:
+            self.__status = self.__check_active()
+            self.__status_time = now
+        return self.__status
+
+    def __check_active(self):
+        """Check daemon pid in /proc, fall back to a ping"""
+        try:
+            with open(self.__pid_file, 'r', encoding='utf-8') as file:
+                pid = int(file.read().strip())
+            with open(f'/proc/{pid}/comm', 'r', encoding='utf-8') as file:
+                return file.read().strip() == 'dockerd'
+        except FileNotFoundError as e:
+            # No pid file or no process
+            if e.filename == self.__pid_file:
+                return self.__check_ping()
+            return False
+        except (OSError, ValueError):
+            return self.__check_ping()
+
+    def __check_ping(self):
+        """Check daemon with a ping"""
+        try:
+            return self.ping()
+        except (http.client.HTTPException, OSError):
+            return False
+
+    def containers(self):
+        """Get list of all containers"""
+        return self.get('/containers/json?all=true')
+
+    def stats(self, container_id):
+        """Get one-shot stats of a running container"""
+        return self.get(f'/containers/{container_id}/stats?stream=false&one-shot=true')
+
+    def cpu_percent(self, container_id, stats):
+        """CPU usage in % since the last stats of the container, like 'docker stats'"""
+        cpu_stats = stats.get('cpu_stats', {})
+        total = cpu_stats.get('cpu_usage', {}).get('total_usage', 0)
+        system = cpu_stats.get('system_cpu_usage', 0)
+        online = cpu_stats.get('online_cpus') or len(
+            cpu_stats.get('cpu_usage', {}).get('percpu_usage') or [1])
+        last = self.__last_cpu.get(container_id)
+        self.__last_cpu[container_id] = (total, system)
+        if last is None:
+            # Use precpu stats if the daemon sent any
+            precpu_stats = stats.get('precpu_stats', {})
+            last = (precpu_stats.get('cpu_usage', {}).get('total_usage', 0),
+                    precpu_stats.get('system_cpu_usage', 0))
+            if not last[1]:
+                return 0.0
+        cpu_delta = total - last[0]
+        system_delta = system - last[1]
+        if cpu_delta <= 0 or system_delta <= 0:
+            return 0.0
+        return cpu_delta / system_delta * online * 100
+
+    @staticmethod
+    def memory_usage(stats):
+        """Memory usage without page cache, like 'docker stats'"""
+        memory_stats = stats.get('memory_stats', {})
+        usage = memory_stats.get('usage', 0)
+        details = memory_stats.get('stats', {})
+        # cgroup v1 reports total_inactive_file, cgroup v2 inactive_file
+        for key in ('total_inactive_file', 'inactive_file'):
+            if key in details and details[key] < usage:
+                return usage - details[key]
+        return usage
+
+    def usage(self):
+        """Get summary of all containers"""
+        containers = self.containers()
+        summary = {
+            'active': True,
+            'running': 0,
+            'total': len(containers),
+            'cpu': 0.0,
+            'mem': 0,
+            'mem_total': 0,
+            'pids': 0
+        }
+        running = set()
+        for container in containers:
+            if container.get('State') != 'running':
+                continue
+            running.add(container['Id'])
+            stats = self.stats(container['Id'])
+            summary['running'] += 1
+            summary['cpu'] += self.cpu_percent(container['Id'], stats)
+            summary['mem'] += self.memory_usage(stats)
+            summary['mem_total'] = max(summary['mem_total'],
+                                       stats.get('memory_stats', {}).get('limit', 0))
+            summary['pids'] += stats.get('pids_stats', {}).get('current', 0)
+        # Forget containers which are gone
+        for container_id in set(self.__last_cpu) - running:
+            del self.__last_cpu[container_id]
+        return summary
@@ -0,0 +1,109 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+from collections import OrderedDict
+
+# Additional pip modules
+from PIL import Image, ImageDraw, ImageFont
+
+# Additional project modules
+
+
+# Characters shown by the pages, rasterised at startup
+PRELOAD_CHARS = '0123456789.,%/:-\'°?!_ ' \
+    'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+
+
+class GlyphAtlas:
+    """Class GlyphAtlas
+
+    Renders text by drawing cached 1-bit glyph bitmaps instead of
+    letting FreeType rasterise the whole string on every call. Output
+    is pixel identical to ImageDraw.text() for fonts with whole pixel
+    advances and no kerning, like the PixelOperator bitmap font.
+    Anything else falls back to ImageDraw.text().
+
+    The font is loaded on first use.
+    """
+
+    def __init__(self, path, size, *, max_glyphs=256):
+        self.__path = path
+        self.__size = size
+        self.__font = None
+        self.__max_glyphs = max_glyphs
+        self.__glyphs = OrderedDict()
+
+    def get_font(self):
+        """Get font, load it on first use"""
+        if self.__font is None:
+            self.__font = ImageFont.truetype(self.__path, self.__size)
+        return self.__font
+
+    def preload(self, chars=PRELOAD_CHARS):
+        """Rasterise glyphs ahead of the first frame"""
+        for ch in chars:
+            self.glyph(ch)
+
+    def total(self):
+        """Return number of cached glyphs"""
+        return len(self.__glyphs)
+
+    def glyph(self, ch):
+        """Get (bitmap, left, top, advance) of a character, None if not cacheable"""
+        glyph = self.__glyphs.get(ch)
+        if glyph is not None:
+            self.__glyphs.move_to_end(ch)
+            return glyph
+        advance = self.get_font().getlength(ch)
+        if advance != int(advance):
+            return None
+        left, top, right, bottom = self.get_font().getbbox(ch, mode='1')
+        bitmap = None
+        if right > left and bottom > top:
+            bitmap = Image.new('1', (right - left, bottom - top))
+            ImageDraw.Draw(bitmap).text(
+                (-left, -top), ch, font=self.get_font(), fill=1)
+        glyph = (bitmap, left, top, int(advance))
+        self.__glyphs[ch] = glyph
+        if len(self.__glyphs) > self.__max_glyphs:
+            self.__glyphs.popitem(last=False)
+        return glyph
+
+    def __get_glyphs(self, text):
+        """Get glyphs of text, None if one of them is not cacheable"""
+        glyphs = []
+        for ch in text:
+            glyph = self.glyph(ch)
+            if glyph is None:
+                return None
+            glyphs.append(glyph)
+        return glyphs
+
+    def textlength(self, text):
+        """Get text length in pixels like ImageDraw.textlength()"""
+        glyphs = self.__get_glyphs(text)
+        if glyphs is None:
+            return self.get_font().getlength(text)
+        return sum(glyph[3] for glyph in glyphs)
+
+    def text(self, draw, xy, text, fill=None, anchor='la'):
+        """Draw text like ImageDraw.text(), supports anchors 'la' and 'ra'"""
+        x, y = xy
+        glyphs = None
+        if anchor in ('la', 'ra') and x == int(x) and y == int(y):
+            glyphs = self.__get_glyphs(text)
+        if glyphs is None:
+            draw.text(xy, text, font=self.get_font(), fill=fill, anchor=anchor)
+            return
+        x = int(x)
+        y = int(y)
+        if anchor == 'ra':
+            x -= sum(glyph[3] for glyph in glyphs)
+        for bitmap, left, top, advance in glyphs:
+            if bitmap is not None:
+                draw.bitmap((x + left, y + top), bitmap, fill=fill)
+            x += advance
@@ -0,0 +1,146 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import asyncio
+import logging
+import threading
+
+# Additional pip modules
+
+# Additional project modules
+from modules.wakeup import Wakeup
+
+
+POLL_INTERVAL = 0.01  # Seconds between two reads while polling
+BACKENDS = ['edge', 'polling', 'fake']
+
+
+class GpioBackend:
+    """Class GpioBackend
+
+    Interface between the buttons and the GPIO pins. wait_async()
+    sleeps on the running loop until a pin may have changed or the
+    timeout has passed.
+    """
+
+    PUD_UP = 'up'
+    PUD_DOWN = 'down'
+
+    def setup(self, pin, pull_up_down):
+        """Set pin as input with pull up or pull down"""
+        raise NotImplementedError
+
+    def input(self, pin):
+        """Read pin level"""
+        raise NotImplementedError
+
+    async def wait_async(self, timeout=None):
+        """Wait on the running loop for a pin change, polls by default, None waits forever"""
+        await asyncio.sleep(POLL_INTERVAL)
+
+    def cleanup(self):
+        """Release pins"""
+
+
+class PollingGpio(GpioBackend):
+    """Class PollingGpio - Reads RPi.GPIO pins every POLL_INTERVAL"""
+
+    def __init__(self):
+        import RPi.GPIO as GPIO
+        self.__gpio = GPIO
+        self.PUD_UP = GPIO.PUD_UP
+        self.PUD_DOWN = GPIO.PUD_DOWN
+        GPIO.setmode(GPIO.BCM)
+
+    def get_gpio(self):
+        """Get RPi.GPIO module"""
+        return self.__gpio
+
+    def setup(self, pin, pull_up_down):
+        """Set pin as input with pull up or pull down"""
+        self.__gpio.setup(pin, self.__gpio.IN, pull_up_down=pull_up_down)
+
+    def input(self, pin):
+        """Read pin level"""
+        return self.__gpio.input(pin)
+
+    def cleanup(self):
+        """Release pins"""
+        self.__gpio.cleanup()
+
+
+class EdgeGpio(PollingGpio):
+    """Class EdgeGpio - Sleeps until RPi.GPIO reports an edge
+
+    Falls back to polling if edge detection can not be added to a pin.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.__event = Wakeup()
+        self.__polling = False
+
+    def setup(self, pin, pull_up_down):
+        """Set pin as input and add edge detection"""
+        super().setup(pin, pull_up_down)
+        gpio = self.get_gpio()
+        try:
+            gpio.add_event_detect(pin, gpio.BOTH,
+                                  callback=lambda channel: self.__event.set())
+        except RuntimeError as e:
+            e = f'No edge detection on GPIO {pin}, fall back to polling: {e}'
+            logging.error(e)
+            self.__polling = True
+
+    async def wait_async(self, timeout=None):
+        """Wait on the running loop for an edge"""
+        if self.__polling:
+            await super().wait_async(timeout)
+            return
+        await self.__event.wait_async(timeout)
+        self.__event.clear()
+
+
+class FakeGpio(GpioBackend):
+    """Class FakeGpio - In memory pins, set_input() simulates an edge"""
+
+    def __init__(self):
+        self.__levels = {}
+        self.__lock = threading.Lock()
+        self.__event = Wakeup()
+
+    def setup(self, pin, pull_up_down):
+        """Set pin to its idle level"""
+        with self.__lock:
+            self.__levels[pin] = 1 if pull_up_down == self.PUD_UP else 0
+
+    def input(self, pin):
+        """Read pin level"""
+        with self.__lock:
+            return self.__levels[pin]
+
+    def set_input(self, pin, level):
+        """Change pin level and wake up wait_async()"""
+        with self.__lock:
+            self.__levels[pin] = level
+        self.__event.set()
+
+    async def wait_async(self, timeout=None):
+        """Wait on the running loop for set_input()"""
+        await self.__event.wait_async(timeout)
+        self.__event.clear()
+
+
+def create(name):
+    """Create GPIO backend by name"""
+    if name == 'edge':
+        return EdgeGpio()
+    if name == 'polling':
+        return PollingGpio()
+    if name == 'fake':
+        return FakeGpio()
+    return None
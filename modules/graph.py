@@ -0,0 +1,46 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+
+# Additional pip modules
+from PIL import Image, ImageChops
+
+# Additional project modules
+
+
+class Graph:
+    """Class Graph
+
+    Draws a column graph of float values into a 1-bit image without a
+    Python loop over the columns: the values are scaled to column
+    heights as a one row image, stretched to full height and compared
+    against a precomputed ramp (row y is lit where height > ramp).
+    The newest value is the rightmost column.
+    """
+
+    def __init__(self, width, height):
+        self.__width = width
+        self.__height = height
+        self.__ramp = Image.frombytes('L', (width, height), bytes(
+            height - 1 - y for y in range(height) for x in range(width)))
+        self.__lit = [0] + [255] * 255
+
+    def get_size(self):
+        """Get size of the graph image"""
+        return (self.__width, self.__height)
+
+    def render(self, values, top, bottom=0.0):
+        """Get graph image of values (array('f')) scaled from bottom to top"""
+        values = values[-self.__width:]
+        heights = Image.new('L', (self.__width, 1))
+        if len(values) > 0 and top > bottom:
+            scale = self.__height / (top - bottom)
+            row = Image.frombytes('F', (len(values), 1), values.tobytes())
+            row = row.point(lambda v: v * scale - bottom * scale).convert('L')
+            heights.paste(row, (self.__width - len(values), 0))
+        columns = heights.resize((self.__width, self.__height), Image.Resampling.NEAREST)
+        return ImageChops.subtract(columns, self.__ramp).point(self.__lit, '1')
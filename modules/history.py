@@ -0,0 +1,52 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+from array import array
+
+# Additional pip modules
+
+# Additional project modules
+
+
+class History:
+    """Class History - Ring buffer of the last size float values
+
+    The buffer is allocated once, append() only overwrites one slot.
+    """
+
+    def __init__(self, size):
+        self.__data = array('f', bytes(4 * size))
+        self.__size = size
+        self.__index = 0
+        self.__count = 0
+
+    def get_size(self):
+        """Get capacity"""
+        return self.__size
+
+    def total(self):
+        """Return number of stored values"""
+        return self.__count
+
+    def append(self, value):
+        """Overwrite the oldest value"""
+        self.__data[self.__index] = value
+        self.__index = (self.__index + 1) % self.__size
+        if self.__count < self.__size:
+            self.__count += 1
+
+    def last(self):
+        """Get newest value, None if empty"""
+        if self.__count == 0:
+            return None
+        return self.__data[self.__index - 1]
+
+    def values(self):
+        """Get stored values as array, oldest first"""
+        if self.__count < self.__size:
+            return self.__data[:self.__count]
+        return self.__data[self.__index:] + self.__data[:self.__index]
@@ -0,0 +1,262 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+from collections import deque
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+
+# Additional pip modules
+
+# Additional project modules
+from modules.clock import monotonic
+
+
+LOG_FORMAT = '%(asctime)s %(levelname)-8s %(message)s'
+LOG_DATEFMT = '%Y-%m-%d %H:%M:%S'
+LOG_FILE = 'oledadvstats.log'
+LEVELS = {'debug': logging.DEBUG, 'info': logging.INFO,
+          'warning': logging.WARNING, 'error': logging.ERROR}
+MODES = ['file', 'ram']
+QUEUE_SIZE = 1000     # Records waiting for the writer, more are dropped
+RAM_LINES = 500       # Lines kept in memory
+FILE_BUFFER = 50      # Records collected before they are written, warnings are written at once
+RATE_INTERVAL = 60    # Seconds of one rate limit window
+MAX_KEYS = 1000       # Messages the rate limit remembers
+
+
+class LogSettings:
+    """Class LogSettings
+
+    Logging of the config paragraph 'logging'. The defaults write
+    info and above to log/oledadvstats.log, rotated at 1024 KB with
+    3 old files kept. Every message is written at most ratelimit times
+    per minute, 0 turns the rate limit off.
+    """
+
+    def __init__(self):
+        self.level = 'info'
+        self.mode = 'file'
+        self.maxsize = 1024
+        self.backups = 3
+        self.ratelimit = 5
+
+    def keys(self):
+        """Get config keys"""
+        return list(vars(self))
+
+    def set(self, key, value):
+        """Set config key, False if the key or the value is not valid"""
+        if key == 'level':
+            if str(value).lower() not in LEVELS:
+                return False
+            self.level = str(value).lower()
+        elif key == 'mode':
+            if str(value).lower() not in MODES:
+                return False
+            self.mode = str(value).lower()
+        elif key in self.keys():
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                return False
+            if value < 0 or (key in ('maxsize', 'backups') and value == 0):
+                return False
+            setattr(self, key, value)
+        else:
+            return False
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Class RateLimitFilter
+
+    Passes the same message (level, source line and text) at most burst
+    times per interval. Repeats are counted, the next message which
+    passes again tells how many were suppressed. Records are dropped
+    before they are formatted, a flood costs almost nothing.
+    """
+
+    def __init__(self, burst, interval=RATE_INTERVAL):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.suppressed = 0
+        self.__windows = {}
+        self.__lock = threading.Lock()
+
+    def filter(self, record):
+        """Check if record passes"""
+        if not self.burst:
+            return True
+        key = (record.levelno, record.pathname, record.lineno, str(record.msg))
+        now = monotonic()
+        with self.__lock:
+            window = self.__windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                repeats = window[2] if window is not None else 0
+                if len(self.__windows) >= MAX_KEYS:
+                    self.__windows.clear()
+                window = self.__windows[key] = [now, 0, 0]
+                if repeats:
+                    record.msg = f'{record.msg} (suppressed {repeats} times)'
+            window[1] += 1
+            if window[1] > self.burst:
+                window[2] += 1
+                self.suppressed += 1
+                return False
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Class NonBlockingQueueHandler - Drops records if the writer falls behind"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        """Put record into queue without waiting"""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RamHandler(logging.Handler):
+    """Class RamHandler - Keeps the last records in memory, formats them on request"""
+
+    def __init__(self, size=RAM_LINES):
+        super().__init__()
+        self.__records = deque(maxlen=size)
+
+    def emit(self, record):
+        """Keep record"""
+        self.__records.append(record)
+
+    def records(self):
+        """Get kept records, oldest first"""
+        return list(self.__records)
+
+    def lines(self):
+        """Get kept records as lines, oldest first"""
+        return [self.format(r) for r in self.records()]
+
+
+class Logs:
+    """Class Logs
+
+    Callers only put records into a queue, a writer thread formats and
+    writes them. Until configure() is called records are kept in RAM
+    only, so the 'logging' paragraph decides if anything is written to
+    the SD card. In RAM mode nothing is ever written, the last lines
+    are served at /log by the metrics endpoint.
+    """
+
+    __directory = None
+    __settings = None
+    __queue = None
+    __handler = None
+    __listener = None
+    __filter = RateLimitFilter(LogSettings().ratelimit)
+    __ram = RamHandler()
+    __file = None
+    __lock = threading.Lock()
+
+    @staticmethod
+    def start(directory):
+        """Route root logger through the queue, before anything is logged"""
+        Logs.__directory = directory
+        Logs.__queue = queue.Queue(QUEUE_SIZE)
+        Logs.__handler = NonBlockingQueueHandler(Logs.__queue)
+        Logs.__handler.addFilter(Logs.__filter)
+        Logs.__ram.setFormatter(logging.Formatter(LOG_FORMAT, LOG_DATEFMT))
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(Logs.__handler)
+        root.setLevel(LEVELS[LogSettings().level])
+        Logs.__listener = logging.handlers.QueueListener(
+            Logs.__queue, Logs.__ram, respect_handler_level=True)
+        Logs.__listener.start()
+
+    @staticmethod
+    def configure(settings):
+        """Apply log settings, may be called again while running"""
+        with Logs.__lock:
+            old = Logs.__settings
+            Logs.__settings = settings
+            logging.getLogger().setLevel(LEVELS[settings.level])
+            Logs.__filter.burst = settings.ratelimit
+            if old is not None and (old.mode, old.maxsize, old.backups) == \
+                    (settings.mode, settings.maxsize, settings.backups):
+                return
+            file = None
+            if settings.mode == 'file' and Logs.__directory is not None:
+                os.makedirs(Logs.__directory, exist_ok=True)
+                file = logging.handlers.RotatingFileHandler(
+                    os.path.join(Logs.__directory, LOG_FILE),
+                    maxBytes=settings.maxsize * 1024, backupCount=settings.backups,
+                    encoding='utf-8', delay=True)
+                file.setFormatter(logging.Formatter(LOG_FORMAT, LOG_DATEFMT))
+                # Fewer, larger writes, warnings and errors are written at once
+                file = logging.handlers.MemoryHandler(
+                    FILE_BUFFER, flushLevel=logging.WARNING, target=file)
+            Logs.__swap(file, first=old is None)
+
+    @staticmethod
+    def __swap(file, first):
+        """Replace file handler of the writer thread"""
+        if Logs.__listener is None:
+            return
+        # Stopping the listener writes all queued records first
+        Logs.__listener.stop()
+        if first and file is not None:
+            # Records logged before the config was read
+            for record in Logs.__ram.records():
+                file.handle(record)
+        Logs.__close()
+        Logs.__file = file
+        handlers = (Logs.__ram,) if file is None else (Logs.__ram, file)
+        Logs.__listener = logging.handlers.QueueListener(
+            Logs.__queue, *handlers, respect_handler_level=True)
+        Logs.__listener.start()
+
+    @staticmethod
+    def stop():
+        """Write all queued records and stop the writer thread"""
+        if Logs.__settings is None:
+            # Startup failed before the config was read, keep the reason
+            Logs.configure(LogSettings())
+        if Logs.__listener is not None:
+            Logs.__listener.stop()
+            Logs.__listener = None
+        Logs.__close()
+
+    @staticmethod
+    def __close():
+        """Write buffered records and close log file"""
+        if Logs.__file is not None:
+            target = Logs.__file.target
+            Logs.__file.close()
+            target.close()
+            Logs.__file = None
+
+    @staticmethod
+    def lines():
+        """Get last log lines kept in RAM"""
+        return Logs.__ram.lines()
+
+    @staticmethod
+    def stats():
+        """Get counters of dropped records"""
+        return {
+            'suppressed': Logs.__filter.suppressed,
+            'dropped': Logs.__handler.dropped if Logs.__handler is not None else 0
+        }
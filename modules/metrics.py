@@ -0,0 +1,281 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import os
+import socketserver
+import threading
+
+# Additional pip modules
+
+# Additional project modules
+from modules.logs import Logs
+from modules.pages import Pages
+from modules.probe import Probes
+from modules.sampler import Sampler
+
+
+HOST = '127.0.0.1'  # The endpoint is never reachable from the network
+PREFIX = 'oled_'
+
+
+def escape(value):
+    """Escape Prometheus label value"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def to_json(value):
+    """Convert sampled values (named tuples ...) to JSON types"""
+    if hasattr(value, '_asdict'):
+        return {k: to_json(v) for k, v in value._asdict().items()}
+    if isinstance(value, dict):
+        return {str(k): to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json(v) for v in value]
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+class Metrics:
+    """Class Metrics
+
+    Serves the values the pages already sampled, from the latest
+    Sampler snapshot and the counters of the display. A scrape never
+    samples or probes anything itself.
+
+    GET /metrics       Prometheus text format
+    GET /metrics.json  JSON
+    GET /log           Last log lines kept in RAM
+    """
+
+    __port = None
+    __socket = None
+    __server = None
+    __thread = None
+
+    @staticmethod
+    def set_port(p):
+        """Set TCP port on localhost"""
+        try:
+            p = int(p)
+        except ValueError:
+            return False
+        if not 0 < p < 65536:
+            return False
+        Metrics.__port = p
+        return True
+
+    @staticmethod
+    def set_socket(path):
+        """Set path of unix socket"""
+        if not isinstance(path, str) or not path.startswith('/'):
+            return False
+        Metrics.__socket = path
+        return True
+
+    @staticmethod
+    def enabled():
+        """Check if a port or socket is set"""
+        return Metrics.__port is not None or Metrics.__socket is not None
+
+    @staticmethod
+    def samples():
+        """Get (name, type, labels, value) of all Prometheus samples"""
+        snapshot = Sampler.snapshot()
+        result = []
+
+        def add(name, value, labels=None, kind='gauge'):
+            if isinstance(value, bool):
+                value = int(value)
+            if isinstance(value, (int, float)):
+                result.append((PREFIX + name, kind, labels or {}, value))
+
+        for key, value in snapshot.values().items():
+            name, _, arg = key.partition(':')
+            if name == 'cpu_percent':
+                add('cpu_percent', value)
+            elif name == 'cpu_freq':
+                add('cpu_frequency_mhz', value)
+            elif name == 'cpu_load':
+                for period, load in zip(('1m', '5m', '15m'), value):
+                    add('cpu_load_percent', load, {'period': period})
+            elif name == 'cpu_temperature':
+                add('cpu_temperature_celsius', value, {'sensor': arg})
+            elif name == 'virtual_memory':
+                add('memory_used_bytes', value.used)
+                add('memory_total_bytes', value.total)
+            elif name == 'ismount':
+                add('disk_mounted', value, {'mount': arg})
+            elif name == 'disk_usage':
+                add('disk_used_bytes', value.used, {'mount': arg})
+                add('disk_free_bytes', value.free, {'mount': arg})
+                add('disk_total_bytes', value.total, {'mount': arg})
+            elif name == 'net_usage':
+                add('network_transmit_bytes_per_second', value[0], {'interface': arg})
+                add('network_receive_bytes_per_second', value[1], {'interface': arg})
+            elif name == 'hostname' or name == 'ipv4':
+                continue
+            elif name == 'docker':
+                add('docker_up', value.get('active', False))
+                add('docker_containers_running', value.get('running'))
+                add('docker_containers', value.get('total'))
+                add('docker_cpu_percent', value.get('cpu'))
+                add('docker_memory_used_bytes', value.get('mem'))
+                add('docker_memory_total_bytes', value.get('mem_total'))
+                add('docker_pids', value.get('pids'))
+            add('sample_age_seconds', snapshot.age(key), {'metric': key})
+
+        for key, stats in Sampler.stats().items():
+            add('sample_duration_seconds_total', stats['total_duration'], {'metric': key}, 'counter')
+            add('sample_errors_total', stats['errors'], {'metric': key}, 'counter')
+        for key, stats in Probes.stats().items():
+            add('probe_latency_seconds_total', stats['total_latency'], {'probe': key}, 'counter')
+            add('probe_latency_seconds_max', stats['max_latency'], {'probe': key})
+            add('probe_calls_total', stats['count'], {'probe': key}, 'counter')
+            add('probe_timeouts_total', stats['timeouts'], {'probe': key}, 'counter')
+            add('probe_errors_total', stats['errors'], {'probe': key}, 'counter')
+
+        for key, value in Logs.stats().items():
+            add(f'log_{key}_total', value, kind='counter')
+
+        for name, display in Metrics.displays().items():
+            counters = [('display', k, v) for k, v in display.items() if k != 'transport']
+            counters += [('bus', k, v) for k, v in display.get('transport', {}).items()]
+            for group, key, value in counters:
+                # render_time -> render_seconds, latency -> seconds
+                key = key.replace('_time', '_seconds').replace('latency', 'seconds')
+                if key.startswith(('last_', 'max_')):
+                    add(f'{group}_{key}', value, {'display': name})
+                else:
+                    add(f'{group}_{key}_total', value, {'display': name}, 'counter')
+        return result
+
+    @staticmethod
+    def displays():
+        """Get {name: counters} of all displays"""
+        return {screen.name: Metrics.display(screen) for screen in Pages.get_screens()}
+
+    @staticmethod
+    def display(screen):
+        """Get render and bus counters of the display of a screen"""
+        device = screen.device
+        stats = Pages.stats(screen)
+        stats.update({
+            'frames_rendered': device.get_frames_rendered(),
+            'frames_sent': device.get_frames_sent(),
+            'bytes_sent': device.get_bytes_sent(),
+            'display_time': device.get_display_time()
+        })
+        transport = device.get_transport() if device.get_device() is not None else None
+        if transport is not None:
+            stats['transport'] = transport.stats()
+        return stats
+
+    @staticmethod
+    def prometheus():
+        """Get all samples in Prometheus text format"""
+        # Samples of one metric have to be in one group
+        families = {}
+        for name, kind, labels, value in Metrics.samples():
+            families.setdefault((name, kind), []).append((labels, value))
+        lines = []
+        for (name, kind), samples in families.items():
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in samples:
+                lines.append(Metrics.line(name, labels, value))
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def line(name, labels, value):
+        """Get one sample line"""
+        if labels:
+            label = ','.join(f'{k}="{escape(v)}"' for k, v in labels.items())
+            return f'{name}{{{label}}} {value}'
+        return f'{name} {value}'
+
+    @staticmethod
+    def json_text():
+        """Get snapshot values and counters as JSON"""
+        snapshot = Sampler.snapshot()
+        return json.dumps({
+            'values': to_json(dict(snapshot.values())),
+            'ages': {k: snapshot.age(k) for k in snapshot.values()},
+            'sampler': Sampler.stats(),
+            'probes': Probes.stats(),
+            'displays': Metrics.displays()
+        })
+
+    @staticmethod
+    def start():
+        """Serve metrics on localhost or the unix socket in a thread"""
+        if Metrics.__socket is not None:
+            if os.path.exists(Metrics.__socket):
+                os.unlink(Metrics.__socket)
+            Metrics.__server = UnixHTTPServer(Metrics.__socket, MetricsHandler)
+        else:
+            Metrics.__server = ThreadingHTTPServer((HOST, Metrics.__port), MetricsHandler)
+        Metrics.__thread = threading.Thread(target=Metrics.__server.serve_forever)
+        Metrics.__thread.daemon = True
+        Metrics.__thread.start()
+
+    @staticmethod
+    def stop():
+        """Stop serving metrics"""
+        if Metrics.__server is not None:
+            Metrics.__server.shutdown()
+            Metrics.__server.server_close()
+            Metrics.__server = None
+            Metrics.__thread = None
+
+
+class UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    """Class UnixHTTPServer - HTTP server on a unix socket"""
+
+    daemon_threads = True
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Class MetricsHandler"""
+
+    def address_string(self):
+        """Unix socket clients have no address"""
+        if isinstance(self.client_address, tuple) and self.client_address:
+            return str(self.client_address[0])
+        return 'unix'
+
+    def log_message(self, format, *args):
+        """Log requests only in debug level"""
+        logging.debug('metrics: ' + format, *args)
+
+    def do_GET(self):
+        """Serve /metrics and /metrics.json"""
+        try:
+            if self.path == '/metrics':
+                body = Metrics.prometheus()
+                content_type = 'text/plain; version=0.0.4; charset=utf-8'
+            elif self.path == '/metrics.json':
+                body = Metrics.json_text()
+                content_type = 'application/json'
+            elif self.path == '/log':
+                body = '\n'.join(Logs.lines()) + '\n'
+                content_type = 'text/plain; charset=utf-8'
+            else:
+                self.send_error(404)
+                return
+        except Exception as e:
+            logging.exception(e)
+            self.send_error(500)
+            return
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
@@ -0,0 +1,63 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import os
+import re
+import select
+
+# Additional pip modules
+
+# Additional project modules
+
+
+MOUNTINFO_PATH = '/proc/self/mountinfo'
+
+
+class Mounts:
+    """Class Mounts
+
+    Mount points parsed from /proc/self/mountinfo. The file is only
+    parsed again after the kernel signals a change with POLLPRI, so
+    checking a mount point never touches the (maybe hung) file system.
+    """
+
+    __file = None
+    __poll = None
+    __mount_points = frozenset()
+
+    @staticmethod
+    def unescape(path):
+        """Decode octal escapes of mountinfo ('\\040' is a space)"""
+        return re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), path)
+
+    @staticmethod
+    def parse(text):
+        """Get set of mount points of mountinfo text"""
+        mount_points = set()
+        for line in text.splitlines():
+            fields = line.split(' ')
+            if len(fields) > 4:
+                mount_points.add(Mounts.unescape(fields[4]))
+        return frozenset(mount_points)
+
+    @staticmethod
+    def mount_points():
+        """Get set of mount points, parse mountinfo again only if it changed"""
+        if Mounts.__file is None:
+            Mounts.__file = open(MOUNTINFO_PATH, 'r', encoding='utf-8')
+            Mounts.__poll = select.poll()
+            Mounts.__poll.register(Mounts.__file, select.POLLPRI | select.POLLERR)
+        elif not Mounts.__poll.poll(0):
+            return Mounts.__mount_points
+        Mounts.__file.seek(0)
+        Mounts.__mount_points = Mounts.parse(Mounts.__file.read())
+        return Mounts.__mount_points
+
+    @staticmethod
+    def ismount(path):
+        """Check if path is a mount point like os.path.ismount()"""
+        return os.path.normpath(path) in Mounts.mount_points()
@@ -5,32 +5,44 @@ This Python file uses the following encoding: utf-8
 
 
 # Standard modules
-import json
+from array import array
 import logging
 import os
+import re
 import socket
-import subprocess
-from time import time
-import threading
+from time import perf_counter
 
 # Additional pip modules
-from luma.core.interface.serial import i2c
 from luma.core.render import canvas
-from luma.oled.device import sh1106
-from PIL import Image, ImageFont
-import psutil
+from PIL import Image
 
 # Additional project modules
-
-
-# Display
-PORT = 1
-ADDRESS = 0x3C
+from modules.assets import Assets
+from modules.clock import monotonic
+from modules import devices
+from modules.devices import DisplaySettings
+from modules.display import Display
+from modules.dockerapi import DockerClient, TIMEOUT as DOCKER_TIMEOUT
+from modules.glyphs import GlyphAtlas
+from modules.graph import Graph
+from modules.lazy import lazy_import
+from modules.mounts import Mounts
+from modules.probe import Probes
+from modules.sampler import Sampler
+from modules.sensors import Sensors
+from modules.sysfs import SysfsFile
+from modules.template import Template
+from modules.transport import Transport
+from modules.wakeup import Wakeup
+
+# psutil is only loaded if a page samples with it
+psutil = lazy_import('psutil')
+
+# Display, the geometry is changed by Pages.set_display()
 WIDTH = 128
 HEIGHT = 64
-# Initialize device
-serial = i2c(port=PORT, address=ADDRESS)
-device = sh1106(serial, width=128, height=64)
+# Device is created by Pages.init_device() after the config is loaded
+device = Display()
 
 # Definitions
 KB = 1024
@@ -39,6 +51,9 @@ GB = MB * 1024
 NET_KB = 1000
 NET_MB = NET_KB * 1000
 NET_GB = NET_MB * 1000
+STORAGE_TIMEOUT = 2     # Seconds until a mount which does not answer is stale
+NET_SAMPLE_INTERVAL = 1  # Seconds between two samples of every interface
+NET_EWMA_ALPHA = 0.5     # Weight of the newest sample in the shown rate
 FONTSIZE = 16
 
 # Display positions
@@ -55,70 +70,158 @@ LINE4 = TOP + 3 * FONTSIZE  # Y position line 3
 REAL_PATH = os.path.dirname(os.path.realpath(__file__))
 
 # Icons
-IMG_CPU_MEM = Image.open(REAL_PATH + '/icons/cpu_mem.png')
-IMG_EMMC = Image.open(REAL_PATH + '/icons/emmc.png')
-IMG_HDD = Image.open(REAL_PATH + '/icons/hdd.png')
-IMG_SD = Image.open(REAL_PATH + '/icons/sd.png')
-IMG_SSD = Image.open(REAL_PATH + '/icons/ssd.png')
-IMG_LAN = Image.open(REAL_PATH + '/icons/lan.png')
-IMG_WIFI = Image.open(REAL_PATH + '/icons/wifi.png')
-IMG_DOCKER = Image.open(REAL_PATH + '/icons/docker.png')
-IMG_POWEROFF = Image.open(REAL_PATH + '/icons/poweroff.png')
-IMG_REBOOT = Image.open(REAL_PATH + '/icons/reboot.png')
-IMG_NETDOWN = Image.open(REAL_PATH + '/icons/netdown.png')
-IMG_NETUP = Image.open(REAL_PATH + '/icons/netup.png')
+ICON_SIZE = 64
+ICON_XY = ((WIDTH - ICON_SIZE) // 2, 0)  # Position of the page icons
 
 # Text
-FONT = ImageFont.truetype(REAL_PATH + '/font/PixelOperator.ttf', FONTSIZE)
+TEXT = GlyphAtlas(REAL_PATH + '/font/PixelOperator.ttf', FONTSIZE)
+
+# Graphs, one column per sample below the first line
+GRAPH_XY = (0, LINE2)
+GRAPH = Graph(WIDTH, HEIGHT - LINE2)
+NET_GRAPH = Graph(WIDTH, (HEIGHT - LINE2) // 2)
+
+# Page types, with the precompiled patterns of their values
+PAGES_DICT = {
+    'cpumem': {
+        'pointer': 'simple',
+        'options': ['sensor'],
+        'refresh': 1
+    },
+    'storage': {
+        'pointer': 'advanced',
+        'icons': ['emmc', 'hdd', 'sd', 'ssd'],
+        'values': re.compile(r'(^/$)|((/[a-zA-Z0-9_-]+)+$)'),
+        'options': [],
+        'refresh': 1
+    },
+    'network': {
+        'pointer': 'advanced',
+        'icons': ['wifi', 'lan'],
+        'values': re.compile(r'^(wlan|eth)[0-9]{1}$'),
+        'options': [],
+        'refresh': 1
+    },
+    'docker': {
+        'pointer': 'simple',
+        'options': [],
+        'refresh': 5
+    },
+    'cpugraph': {
+        'pointer': 'simple',
+        'options': [],
+        'refresh': 1
+    },
+    'tempgraph': {
+        'pointer': 'simple',
+        'options': ['sensor'],
+        'refresh': 1
+    },
+    'netgraph': {
+        'pointer': 'advanced',
+        'icons': ['wifi', 'lan'],
+        'values': re.compile(r'^(wlan|eth)[0-9]{1}$'),
+        'options': [],
+        'refresh': 1
+    }
+}
 
 PAGES_MODE_AUTO = 1
 PAGES_MODE_MANUAL = 2
 
+# Scheduling
+ICON_TIME = 1       # Seconds an icon is shown before the text
+MIN_WAIT = 0.01     # Minimum seconds between two main loop iterations
+
+
+class Screen:
+    """Class Screen - Pages, mode and device of one display"""
+
+    def __init__(self, name, device=None):
+        self.name = name
+        self.device = Display() if device is None else device
+        self.display = DisplaySettings()
+        self.print_icon = True
+        self.print_text = False
+        self.last_loop = 0
+        self.mode = PAGES_MODE_AUTO
+        self.func_ptr = []
+        self.current_page = 0
+        self.auto_delay = 10
+        self.last_auto_delay = monotonic()
+        self.show_icons = True
+        self.show_pages = True
+        self.screensaver_delay = 5  # Value in minutes
+        self.screensaver_last = monotonic()
+        self.screensaver_status = False
+        self.renders = 0
+        self.render_time = 0.0
+        self.last_render_time = 0.0
+        self.max_render_time = 0.0
+
 
 class Pages:
-    """Class Pages"""
+    """Class Pages
+
+    All static methods work on the selected screen. show() and wait_async()
+    handle every screen, one after another, so frames of displays on
+    the same bus are never sent at the same time.
+    """
+
+    __screen = Screen('display', device)
+    __screens = [__screen]
+    __layouts = {}
+    __wake_event = Wakeup()
+
+    @staticmethod
+    def get_screen():
+        """Get selected screen"""
+        return Pages.__screen
+
+    @staticmethod
+    def get_screens():
+        """Get all screens"""
+        return list(Pages.__screens)
 
-    __print_icon = True
-    __print_text = False
-    __last_loop = 0
-    __mode = PAGES_MODE_AUTO
-    __func_ptr = []
-    __current_page = 0
-    __auto_delay = 10
-    __last_auto_delay = time()
-    __show_icons = True
+    @staticmethod
+    def add_screen(name):
+        """Add screen for another display and select it"""
+        screen = Screen(name)
+        Pages.__screens.append(screen)
+        Pages.select(screen)
+        return screen
+
+    @staticmethod
+    def select(screen):
+        """Select screen, the module device and layout follow it"""
+        global device, WIDTH, HEIGHT, RIGHT, BOTTOM, ICON_XY, GRAPH, NET_GRAPH
+        Pages.__screen = screen
+        device = screen.device
+        size = screen.display.get_size()
+        if size not in Pages.__layouts:
+            width, height = size
+            Pages.__layouts[size] = (
+                ((width - ICON_SIZE) // 2, max((height - ICON_SIZE) // 2, 0)),
+                Graph(width, height - LINE2),
+                Graph(width, (height - LINE2) // 2))
+        WIDTH, HEIGHT = size
+        RIGHT = WIDTH - 1
+        BOTTOM = HEIGHT
+        ICON_XY, GRAPH, NET_GRAPH = Pages.__layouts[size]
 
     @staticmethod
     def requirements():
         """Get PAGES_DICT"""
-        PAGES_DICT = {
-            'cpumem': {
-                'pointer': 'simple'
-            },
-            'storage': {
-                'pointer': 'advanced',
-                'icons': ['emmc', 'hdd', 'sd', 'ssd'],
-                'values': r'(^/$)|((/[a-zA-Z0-9_-]+)+$)'
-            },
-            'network': {
-                'pointer': 'advanced',
-                'icons': ['wifi', 'lan'],
-                'values': r'^(wlan|eth)[0-9]{1}$'
-            },
-            'docker': {
-                'pointer': 'simple'
-            }
-        }
         return PAGES_DICT
 
     @staticmethod
     def set_mode(m):
         """Set __mode"""
         if 'auto' in m:
-            Pages.__mode = PAGES_MODE_AUTO
+            Pages.__screen.mode = PAGES_MODE_AUTO
             return True
         if 'manual' in m:
-            Pages.__mode = PAGES_MODE_MANUAL
+            Pages.__screen.mode = PAGES_MODE_MANUAL
             return True
         return False
 
@@ -126,7 +229,7 @@ class Pages:
     def set_auto_delay(i):
         """Set __auto_delay"""
         try:
-            Pages.__auto_delay = abs(int(i))
+            Pages.__screen.auto_delay = abs(int(i))
             return True
         except ValueError:
             return False
@@ -135,57 +238,132 @@ class Pages:
     def set_show_icons(m):
         """Set __show_icons"""
         if 'yes' in m:
-            Pages.__show_icons = True
+            Pages.__screen.show_icons = True
             return True
         if 'no' in m:
-            Pages.__show_icons = False
+            Pages.__screen.show_icons = False
             return True
         return False
 
+    @staticmethod
+    def set_display(settings):
+        """Set display settings, layout follows their geometry, call before add()"""
+        Pages.__screen.display = settings
+        Pages.select(Pages.__screen)
+
+    @staticmethod
+    def get_display():
+        """Get display settings"""
+        return Pages.__screen.display
+
+    @staticmethod
+    def init_device(luma_device=None):
+        """Create display devices and rasterise font, call after load_config()
+
+        A given luma device is used for the selected screen only.
+        """
+        if luma_device is not None:
+            Pages.__screen.device.set_device(luma_device)
+        else:
+            for screen in Pages.__screens:
+                Pages.create_device(screen)
+        TEXT.preload()
+
+    @staticmethod
+    def create_device(screen):
+        """Create luma device of a screen"""
+        settings = screen.display
+        serial = devices.create_serial(settings)
+        if serial is not None:
+            # Retries failed transfers and initialises the display again
+            serial = Transport(serial, retries=settings.retries,
+                               reinit_after=settings.reinitafter,
+                               lock=devices.bus_lock(settings))
+            serial.set_on_reinit(
+                lambda: screen.device.set_device(devices.create(settings, serial)))
+        screen.device.set_device(devices.create(settings, serial))
+
+    @staticmethod
+    def set_partial_update(m, full_refresh):
+        """Set partial display updates and full refresh interval"""
+        if 'yes' in m:
+            return device.set_partial(True, full_refresh)
+        if 'no' in m:
+            return device.set_partial(False, full_refresh)
+        return False
+
+    @staticmethod
+    def set_show_pages(b, screen=None):
+        """Set if pages are drawn, off while a poweroff or reboot icon is shown"""
+        (screen or Pages.__screen).show_pages = b
+
     @staticmethod
     def get_show_icons():
         """Get __show_icons"""
-        return Pages.__show_icons
+        return Pages.__screen.show_icons
 
     @staticmethod
     def get_print_icon():
         """Get __print_icon"""
-        return Pages.__print_icon
+        return Pages.__screen.print_icon
 
     @staticmethod
     def set_print_icon(b):
         """Set __print_icon"""
-        Pages.__print_icon = b
+        Pages.__screen.print_icon = b
 
     @staticmethod
     def get_print_text():
         """Get __print_text"""
-        return Pages.__print_text
+        return Pages.__screen.print_text
 
     @staticmethod
     def set_print_text(b):
         """Set __print_text"""
-        Pages.__print_text = b
+        Pages.__screen.print_text = b
 
     @staticmethod
     def get_last_loop():
         """Get __last_loop"""
-        return Pages.__last_loop
+        return Pages.__screen.last_loop
 
     @staticmethod
     def set_last_loop(i):
         """Set __last_loop"""
-        Pages.__last_loop = i
+        Pages.__screen.last_loop = i
 
     @staticmethod
     def total():
         """Return __func_ptr length"""
-        return len(Pages.__func_ptr)
+        return len(Pages.__screen.func_ptr)
 
     @staticmethod
     def add(page_dict):
-        """Add page to funtion pointer list"""
-        Pages.__func_ptr.append(page_dict)
+        """Add page to funtion pointer list and register its metrics"""
+        Pages.__screen.func_ptr.append(page_dict)
+        sample = Pages.str_to_sample(page_dict['type'])
+        if sample:
+            sample(page_dict['args'], page_dict['refresh'])
+
+    @staticmethod
+    def set_pages(pages, screen=None):
+        """Replace all pages of a screen at once and register their metrics"""
+        screen = screen or Pages.__screen
+        Pages.select(screen)
+        for page in pages:
+            sample = Pages.str_to_sample(page['type'])
+            if sample:
+                sample(page['args'], page['refresh'])
+        screen.func_ptr = list(pages)
+        if screen.current_page >= len(screen.func_ptr):
+            screen.current_page = 0
+        # The caller wakes the pages, once the new metrics are sampled
+        Pages.reset(screen)
+
+    @staticmethod
+    def get_refresh():
+        """Get refresh interval in seconds of the current page"""
+        return Pages.__screen.func_ptr[Pages.__screen.current_page]['refresh']
 
     @staticmethod
     def str_to_ptr(s):
@@ -198,6 +376,32 @@ class Pages:
             return Network.page
         elif 'docker' in s:
             return Docker.page
+        elif 'cpugraph' in s:
+            return CpuGraph.page
+        elif 'tempgraph' in s:
+            return TempGraph.page
+        elif 'netgraph' in s:
+            return NetGraph.page
+        else:
+            return None
+
+    @staticmethod
+    def str_to_sample(s):
+        """Convert page type string to metric registration function"""
+        if 'cpumem' in s:
+            return CpuMem.sample
+        elif 'storage' in s:
+            return Storage.sample
+        elif 'network' in s:
+            return Network.sample
+        elif 'docker' in s:
+            return Docker.sample
+        elif 'cpugraph' in s:
+            return CpuGraph.sample
+        elif 'tempgraph' in s:
+            return TempGraph.sample
+        elif 'netgraph' in s:
+            return NetGraph.sample
         else:
             return None
 
@@ -207,79 +411,185 @@ class Pages:
         return 7 * (digits - len(str(int(value))))
 
     @staticmethod
-    def next():
+    def next(screen=None):
         """Go to next page"""
-        if not Pages.Screensaver.display_status():
-            Pages.__current_page += 1
-            if Pages.__current_page >= Pages.total():
-                Pages.__current_page = 0
-        Pages.Screensaver.turn_display_on()
-        Pages.reset()
+        screen = screen or Pages.__screen
+        if not Pages.Screensaver.display_status(screen):
+            screen.current_page += 1
+            if screen.current_page >= len(screen.func_ptr):
+                screen.current_page = 0
+        Pages.Screensaver.turn_display_on(screen)
+        Pages.reset(screen)
+        Pages.wake()
 
     @staticmethod
-    def previous():
+    def previous(screen=None):
         """Go to previous page"""
-        if not Pages.Screensaver.display_status():
-            Pages.__current_page -= 1
-            if Pages.__current_page < 0:
-                Pages.__current_page = Pages.total() - 1
-        Pages.Screensaver.turn_display_on()
-        Pages.reset()
+        screen = screen or Pages.__screen
+        if not Pages.Screensaver.display_status(screen):
+            screen.current_page -= 1
+            if screen.current_page < 0:
+                screen.current_page = len(screen.func_ptr) - 1
+        Pages.Screensaver.turn_display_on(screen)
+        Pages.reset(screen)
+        Pages.wake()
 
     @staticmethod
-    def reset():
+    def reset(screen=None):
         """Perform reset all pages"""
-        Pages.set_print_icon(True)
-        Pages.set_print_text(False)
-        Pages.set_last_loop(0)
+        screen = screen or Pages.__screen
+        screen.print_icon = True
+        screen.print_text = False
+        screen.last_loop = 0
         CpuMem.reset()
         Storage.reset()
         Network.reset()
         Docker.reset()
+        CpuGraph.reset()
+        TempGraph.reset()
+        NetGraph.reset()
 
     @staticmethod
     def show():
-        """Show pages in auto or manual mode"""
-        if Pages.__mode is PAGES_MODE_AUTO:
+        """Show pages of all screens"""
+        for screen in Pages.__screens:
+            Pages.select(screen)
+            if screen.show_pages:
+                Pages.show_screen()
+
+    @staticmethod
+    def show_screen():
+        """Show pages of the selected screen in auto or manual mode"""
+        if Pages.__screen.mode is PAGES_MODE_AUTO:
             """Auto mode - Cycle thru pages"""
-            if time() - Pages.__last_auto_delay >= Pages.__auto_delay:
-                Pages.__last_auto_delay = time()
+            if monotonic() - Pages.__screen.last_auto_delay >= Pages.__screen.auto_delay:
+                Pages.__screen.last_auto_delay = monotonic()
                 Pages.next()
-            Pages.__func_ptr[Pages.__current_page]['ptr'](
-                Pages.__func_ptr[Pages.__current_page]['args'])
-        elif Pages.__mode is PAGES_MODE_MANUAL:
+            Pages.render()
+        elif Pages.__screen.mode is PAGES_MODE_MANUAL:
             """Manual mode - Show current selected page"""
             Pages.Screensaver.logic()
             if not Pages.Screensaver.display_status():
-                Pages.__func_ptr[Pages.__current_page]['ptr'](
-                    Pages.__func_ptr[Pages.__current_page]['args'])
+                Pages.render()
 
     @staticmethod
-    def poweroff():
+    def render():
+        """Call current page and measure how long it takes"""
+        page = Pages.__screen.func_ptr[Pages.__screen.current_page]
+        start = perf_counter()
+        page['ptr'](page['args'])
+        duration = perf_counter() - start
+        Pages.__screen.renders += 1
+        Pages.__screen.render_time += duration
+        Pages.__screen.last_render_time = duration
+        Pages.__screen.max_render_time = max(Pages.__screen.max_render_time, duration)
+
+    @staticmethod
+    def stats(screen=None):
+        """Get number and duration of page calls"""
+        screen = screen or Pages.__screen
+        return {
+            'renders': screen.renders,
+            'render_time': screen.render_time,
+            'last_render_time': screen.last_render_time,
+            'max_render_time': screen.max_render_time
+        }
+
+    @staticmethod
+    def next_deadline():
+        """Get monotonic time of the next event show() has to handle"""
+        deadlines = []
+        for screen in Pages.__screens:
+            Pages.select(screen)
+            deadline = Pages.next_screen_deadline()
+            if deadline is not None and screen.show_pages:
+                deadlines.append(deadline)
+        return min(deadlines) if deadlines else None
+
+    @staticmethod
+    def next_screen_deadline():
+        """Get monotonic time of the next event of the selected screen"""
+        deadlines = []
+        if Pages.__screen.mode is PAGES_MODE_AUTO:
+            deadlines.append(Pages.__screen.last_auto_delay + Pages.__screen.auto_delay)
+        elif Pages.__screen.mode is PAGES_MODE_MANUAL:
+            if Pages.Screensaver.display_status():
+                # Display is off, only a button can wake it up
+                return None
+            if Pages.Screensaver.enabled():
+                deadlines.append(Pages.Screensaver.get_deadline())
+        if Pages.get_show_icons() and Pages.get_print_icon():
+            deadlines.append(Pages.get_last_loop())
+        elif not Pages.get_print_text():
+            deadlines.append(Pages.get_last_loop() + ICON_TIME)
+        else:
+            deadlines.append(Pages.get_last_loop() + Pages.get_refresh())
+        return min(deadlines)
+
+    @staticmethod
+    def wake():
+        """Wake up wait_async() because of an input event"""
+        Pages.__wake_event.set()
+
+    @staticmethod
+    async def wait_async():
+        """Sleep on the running loop until the next deadline or until wake() is called"""
+        Pages.__wake_event.clear()
+        await Pages.__wake_event.wait_async(Pages.get_timeout())
+
+    @staticmethod
+    def get_timeout():
+        """Get seconds until the next deadline, None if there is none"""
+        deadline = Pages.next_deadline()
+        if deadline is None:
+            return None
+        return max(deadline - monotonic(), MIN_WAIT)
+
+    @staticmethod
+    def icons(screen=None):
+        """Get names of the icons used by the configured pages"""
+        screen = screen or Pages.__screen
+        names = []
+        for page in screen.func_ptr:
+            if screen.show_icons:
+                if page['type'] in ('cpumem', 'cpugraph', 'tempgraph'):
+                    names.append('cpu_mem')
+                elif page['type'] == 'docker':
+                    names.append('docker')
+                else:
+                    names.append(page['args']['icon'])
+            if page['type'] in ('network', 'netgraph'):
+                names += ['netup', 'netdown']
+        return names
+
+    @staticmethod
+    def show_icon(name, screen=None):
+        """Show a full screen icon"""
+        if screen is None:
+            device.display(Assets.frame(name, device.size, ICON_XY))
+            return
+        width, height = screen.device.size
+        xy = ((width - ICON_SIZE) // 2, max((height - ICON_SIZE) // 2, 0))
+        screen.device.display(Assets.frame(name, screen.device.size, xy))
+
+    @staticmethod
+    def poweroff(screen=None):
         """Show ipoweroff image"""
-        with canvas(device) as DRAW:
-            # Draw bitmap
-            DRAW.bitmap((32, 0), IMG_POWEROFF, fill=1)
+        Pages.show_icon('poweroff', screen)
 
     @staticmethod
-    def reboot():
+    def reboot(screen=None):
         """Show reboot image"""
-        with canvas(device) as DRAW:
-            # Draw bitmap
-            DRAW.bitmap((32, 0), IMG_REBOOT, fill=1)
+        Pages.show_icon('reboot', screen)
 
     class Screensaver:
         """Class Screensaver"""
 
-        __time_delay = 5  # Value in minutes
-        __last_delay = time()
-        __status = False
-
         @staticmethod
         def set(t):
             """set"""
             try:
-                Pages.Screensaver.__time_delay = abs(int(t))
+                Pages.get_screen().screensaver_delay = abs(int(t))
                 return True
             except ValueError:
                 return False
@@ -287,43 +597,49 @@ class Pages:
         @staticmethod
         def enabled():
             """enabled"""
-            if Pages.Screensaver.__time_delay == 0:
+            if Pages.get_screen().screensaver_delay == 0:
                 return False
             else:
                 return True
 
         @staticmethod
-        def display_status():
+        def get_deadline():
+            """Get monotonic time the display is turned off"""
+            return Pages.get_screen().screensaver_last + Pages.get_screen().screensaver_delay * 60
+
+        @staticmethod
+        def display_status(screen=None):
             """display_status"""
-            return Pages.Screensaver.__status
+            return (screen or Pages.get_screen()).screensaver_status
 
         @staticmethod
-        def turn_display_on():
+        def turn_display_on(screen=None):
             """Turn display on"""
-            device.show()
-            Pages.Screensaver.__status = False
-            Pages.Screensaver.__last_delay = time()
+            screen = screen or Pages.get_screen()
+            screen.device.show()
+            screen.screensaver_status = False
+            screen.screensaver_last = monotonic()
 
         @staticmethod
         def turn_display_off():
             """Turn display off"""
-            device.hide()
+            Pages.get_screen().device.hide()
 
         @staticmethod
         def logic():
             """logic"""
-            if Pages.Screensaver.__time_delay == 0:
+            if Pages.get_screen().screensaver_delay == 0:
                 return
-            if time() - Pages.Screensaver.__last_delay >= Pages.Screensaver.__time_delay * 60:
-                if not Pages.Screensaver.__status:
+            if monotonic() - Pages.get_screen().screensaver_last >= Pages.get_screen().screensaver_delay * 60:
+                if not Pages.get_screen().screensaver_status:
                     Pages.Screensaver.turn_display_off()
-                Pages.Screensaver.__status = True
+                Pages.get_screen().screensaver_status = True
 
 
 class CpuMem:
     """Class CpuMem"""
 
-    __sleep = 1
+    __templates = {}
     __error_printed = False
 
     @staticmethod
@@ -331,61 +647,114 @@ class CpuMem:
         """reset"""
         CpuMem.__error_printed = False
 
+    @staticmethod
+    def template():
+        """Get static layer of cpumem page"""
+        return Template.cached(CpuMem.__templates, device, None, lambda: Template(device.size, TEXT)
+            .add_text((LEFT, LINE2), 'LOAD')
+            .add_text((LEFT, LINE3), 'TEMP')
+            .add_text((LEFT, LINE4), 'MEM')
+            .add_field('cpu', (LEFT, LINE1))
+            .add_field('freq', (RIGHT, LINE1), 'ra')
+            .add_field('load', (RIGHT, LINE2), 'ra')
+            .add_field('temp', (RIGHT, LINE3), 'ra')
+            .add_field('mem', (RIGHT, LINE4), 'ra'))
+
+    @staticmethod
+    def get_cpu_freq():
+        """Get current CPU frequency in MHz"""
+        sensor = Sensors.cpu_freq()
+        if sensor is None:
+            return psutil.cpu_freq().current
+        return sensor.read()
+
+    @staticmethod
+    def get_load():
+        """Get average system load in % of all CPUs"""
+        return [l / psutil.cpu_count() * 100 for l in psutil.getloadavg()]
+
+    @staticmethod
+    def get_sensor(args):
+        """Get configured or discovered CPU temperature sensor"""
+        return Sensors.temperature(args['sensor'] if args else None)
+
+    @staticmethod
+    def log_no_sensor(args):
+        """Log that the configured or any CPU temperature sensor is missing"""
+        if args:
+            logging.error(f'CPU temperature sensor \'{args["sensor"]}\' not found!')
+        else:
+            logging.error('No CPU temperature sensor found!')
+
+    @staticmethod
+    def sample(args, refresh):
+        """Register metrics of cpumem page"""
+        Sampler.add('cpu_percent', psutil.cpu_percent, refresh)
+        Sampler.add('cpu_freq', CpuMem.get_cpu_freq, refresh)
+        Sampler.add('cpu_load', CpuMem.get_load, refresh)
+        sensor = CpuMem.get_sensor(args)
+        if sensor is None:
+            CpuMem.log_no_sensor(args)
+        else:
+            logging.info(f'CPU temperature sensor \'{sensor.name}\': {sensor.get_path()}')
+            Sampler.add(f'cpu_temperature:{sensor.name}', sensor.read, refresh)
+        Sampler.add('virtual_memory', psutil.virtual_memory, refresh)
+
     @staticmethod
     def page(args):
         """Content of cpumem page"""
         try:
-            this_loop = time()
+            this_loop = monotonic()
             # Draw icon
             if Pages.get_show_icons() and Pages.get_print_icon():
-                with canvas(device) as DRAW:
-                    Pages.set_last_loop(this_loop)
-                    Pages.set_print_icon(False)
-                    # Draw bitmap
-                    DRAW.bitmap((32, 0), IMG_CPU_MEM, fill="white")
+                Pages.set_last_loop(this_loop)
+                Pages.set_print_icon(False)
+                Pages.show_icon('cpu_mem')
             # Draw text
-            elif (this_loop - Pages.get_last_loop() >= 1 and not Pages.get_print_text()) or (this_loop - Pages.get_last_loop() >= CpuMem.__sleep and Pages.get_print_text()):
-                with canvas(device) as DRAW:
-                    Pages.set_last_loop(this_loop)
-                    Pages.set_print_text(True)
-                    # Line 1
-                    # CPU utilization in %
-                    cpu = psutil.cpu_percent()
-                    buffer = f'CPU {round(cpu, 1):.1f}%' if cpu < 10 else f'CPU {round(cpu, 0):.0f}%'
-                    DRAW.text((LEFT, LINE1), buffer, font=FONT, fill="white")
-                    # CPU frequency in MHz
-                    freq = psutil.cpu_freq().current
-                    buffer = f'{round(freq, 0):.0f} MHz'
-                    DRAW.text((RIGHT, LINE1), buffer,
-                              font=FONT, fill=255, anchor="ra")
-                    # Line 2 - Average system load in %
-                    DRAW.text((LEFT, LINE2), 'LOAD', font=FONT, fill=255)
-                    load = [l / psutil.cpu_count() *
-                            100 for l in psutil.getloadavg()]
+            elif (this_loop - Pages.get_last_loop() >= ICON_TIME and not Pages.get_print_text()) or (this_loop - Pages.get_last_loop() >= Pages.get_refresh() and Pages.get_print_text()):
+                Pages.set_last_loop(this_loop)
+                Pages.set_print_text(True)
+                snapshot = Sampler.snapshot()
+                # Line 1 - CPU utilization in % and CPU frequency in MHz
+                # Metrics of a reloaded config may not be sampled yet
+                cpu = snapshot.get('cpu_percent')
+                if cpu is None:
+                    cpu = 'CPU ?'
+                else:
+                    cpu = f'CPU {round(cpu, 1):.1f}%' if cpu < 10 else f'CPU {round(cpu, 0):.0f}%'
+                freq = snapshot.get('cpu_freq')
+                freq = '? MHz' if freq is None else f'{round(freq, 0):.0f} MHz'
+                # Line 2 - Average system load in %
+                load = snapshot.get('cpu_load')
+                if load is None:
+                    load = '?'
+                else:
                     buffer = f'{round(load[0], 1):.1f}% ' if load[0] < 10 else f'{round(load[0], 0):.0f}% '
                     buffer += f'{round(load[1], 1):.1f}% ' if load[1] < 10 else f'{round(load[1], 0):.0f}% '
                     buffer += f'{round(load[2], 1):.1f}%' if load[2] < 10 else f'{round(load[2], 0):.0f}%'
-                    DRAW.text((RIGHT, LINE2), buffer,
-                              font=FONT, fill=255, anchor="ra")
-                    # Line 3 - CPU temperature in °C
-                    DRAW.text((LEFT, LINE3), 'TEMP', font=FONT, fill=255)
-                    temperature = psutil.sensors_temperatures()
-                    cpu_thermal_current = round(
-                        temperature['cpu_thermal'][0].current, 1)
-                    buffer = f'{cpu_thermal_current:.1f} °C'
-                    DRAW.text((RIGHT, LINE3), buffer,
-                              font=FONT, fill=255, anchor="ra")
-                    # Line 4 - Used Memory in MB
-                    DRAW.text((LEFT, LINE4), 'MEM', font=FONT, fill=255)
-                    memory = psutil.virtual_memory()
-                    if memory.total / GB < 1:
-                        buffer = f'{round(memory.used / MB):3d} MB / {round(memory.total / MB):3d} MB'
-                    else:
-                        buffer = f'{round(memory.used / MB):4d} MB / {round(memory.total / GB):1d} GB'
-                    DRAW.text((RIGHT, LINE4), buffer,
-                              font=FONT, fill=255, anchor="ra")
+                    load = buffer
+                # Line 3 - CPU temperature in °C
+                sensor = CpuMem.get_sensor(args)
+                if sensor is None or f'cpu_temperature:{sensor.name}' not in snapshot:
+                    temp = '? °C'
+                else:
+                    temp = f'{round(snapshot[f"cpu_temperature:{sensor.name}"], 1):.1f} °C'
+                # Line 4 - Used Memory in MB
+                memory = snapshot.get('virtual_memory')
+                if memory is None:
+                    mem = '? MB'
+                elif memory.total / GB < 1:
+                    mem = f'{round(memory.used / MB):3d} MB / {round(memory.total / MB):3d} MB'
+                else:
+                    mem = f'{round(memory.used / MB):4d} MB / {round(memory.total / GB):1d} GB'
+                CpuMem.template().render(device, {
+                    'cpu': cpu,
+                    'freq': freq,
+                    'load': load,
+                    'temp': temp,
+                    'mem': mem
+                })
         except Exception as e:
-            print(e)
             if not CpuMem.__error_printed:
                 logging.exception(e)
                 CpuMem.__error_printed = True
@@ -394,7 +763,7 @@ class CpuMem:
 class Storage:
     """Class Storage"""
 
-    __sleep = 1
+    __templates = {}
     __error_printed = False
 
     @staticmethod
@@ -402,85 +771,99 @@ class Storage:
         """reset"""
         Storage.__error_printed = False
 
+    @staticmethod
+    def template(mount_point):
+        """Get static layer of storage page"""
+        def build():
+            template = Template(device.size, TEXT)
+            # Line 1 - Mount point
+            # The label is replaced by STALE while the mount does not answer
+            template.add_field('label', (LEFT, LINE1))
+            if TEXT.textlength('MOUNT  ' + mount_point) <= WIDTH:
+                template.add_text((RIGHT, LINE1), mount_point, 'ra')
+            # Line 2 to 4 - Used, free and total space
+            template.add_text((LEFT, LINE2), 'USED')
+            template.add_text((LEFT, LINE3), 'FREE')
+            template.add_text((LEFT, LINE4), 'TOTAL')
+            template.add_field('used', (RIGHT, LINE2), 'ra')
+            template.add_field('free', (RIGHT, LINE3), 'ra')
+            template.add_field('total', (RIGHT, LINE4), 'ra')
+            return template
+        return Template.cached(Storage.__templates, device, mount_point, build)
+
+    @staticmethod
+    def size_to_str(size):
+        """Convert size in bytes to MB or GB string"""
+        if size / GB < 1:
+            return f'{round(size / MB, 3):.3f} MB'
+        return f'{round(size / GB, 3):.3f} GB'
+
+    @staticmethod
+    def get_label(mount_point, stale):
+        """Get text of line 1"""
+        if stale:
+            return 'STALE'
+        if TEXT.textlength('MOUNT  ' + mount_point) <= WIDTH:
+            return 'MOUNT'
+        return mount_point
+
+    @staticmethod
+    def sample(args, refresh):
+        """Register metrics of storage page"""
+        mount_point = args['value']
+        Sampler.add(f'ismount:{mount_point}',
+                    lambda: Mounts.ismount(mount_point), refresh)
+        Sampler.add_probe(f'disk_usage:{mount_point}', Probes.add(
+            f'disk_usage:{mount_point}',
+            lambda: psutil.disk_usage(mount_point), STORAGE_TIMEOUT, own_worker=True), refresh)
+
     @staticmethod
     def page(args):
         """Content of storage page"""
         try:
-            this_loop = time()
+            this_loop = monotonic()
             # Draw icon
             if Pages.get_show_icons() and Pages.get_print_icon():
-                with canvas(device) as DRAW:
-                    Pages.set_last_loop(this_loop)
-                    Pages.set_print_icon(False)
-                    # Draw bitmap
-                    if args['icon'] == 'emmc':
-                        DRAW.bitmap((32, 0), IMG_EMMC, fill=1)
-                    elif args['icon'] == 'hdd':
-                        DRAW.bitmap((32, 0), IMG_HDD, fill=1)
-                    elif args['icon'] == 'sd':
-                        DRAW.bitmap((32, 0), IMG_SD, fill=1)
-                    elif args['icon'] == 'ssd':
-                        DRAW.bitmap((32, 0), IMG_SSD, fill=1)
+                Pages.set_last_loop(this_loop)
+                Pages.set_print_icon(False)
+                Pages.show_icon(args['icon'])
             # Draw text
-            elif (this_loop - Pages.get_last_loop() >= 1 and not Pages.get_print_text()) or (this_loop - Pages.get_last_loop() >= Storage.__sleep and Pages.get_print_text()):
-                with canvas(device) as DRAW:
-                    Pages.set_last_loop(this_loop)
-                    Pages.set_print_text(True)
-                    mount_point = args['value']
-                    if not os.path.ismount(mount_point):
-                        if not Storage.__error_printed:
-                            e = f'Path \'{mount_point}\' is not a mount point!'
-                            logging.error(e)
-                            Storage.__error_printed = True
+            elif (this_loop - Pages.get_last_loop() >= ICON_TIME and not Pages.get_print_text()) or (this_loop - Pages.get_last_loop() >= Pages.get_refresh() and Pages.get_print_text()):
+                Pages.set_last_loop(this_loop)
+                Pages.set_print_text(True)
+                mount_point = args['value']
+                snapshot = Sampler.snapshot()
+                # Unknown until the first sample, e.g. after a config reload
+                if snapshot.get(f'ismount:{mount_point}') is False:
+                    if not Storage.__error_printed:
+                        e = f'Path \'{mount_point}\' is not a mount point!'
+                        logging.error(e)
+                        Storage.__error_printed = True
+                    with canvas(device) as DRAW:
                         buffer = 'Path'
-                        DRAW.text((LEFT, LINE1), buffer, font=FONT, fill=255)
+                        TEXT.text(DRAW, (LEFT, LINE1), buffer, fill=255)
                         buffer = f'\'{mount_point}\''
-                        DRAW.text((LEFT, LINE2), buffer, font=FONT, fill=255)
+                        TEXT.text(DRAW, (LEFT, LINE2), buffer, fill=255)
                         buffer = 'is not a'
-                        DRAW.text((LEFT, LINE3), buffer, font=FONT, fill=255)
+                        TEXT.text(DRAW, (LEFT, LINE3), buffer, fill=255)
                         buffer = 'mount point!'
-                        DRAW.text((LEFT, LINE4), buffer, font=FONT, fill=255)
-
+                        TEXT.text(DRAW, (LEFT, LINE4), buffer, fill=255)
+                else:
+                    # Last good result of the probe
+                    disk_usage = snapshot.get(f'disk_usage:{mount_point}')
+                    stale = disk_usage is None or snapshot.age(
+                        f'disk_usage:{mount_point}') > 2 * Pages.get_refresh() + STORAGE_TIMEOUT
+                    values = {'label': Storage.get_label(mount_point, stale)}
+                    if disk_usage is None:
+                        values.update({'used': '?', 'free': '?', 'total': '?'})
                     else:
-                        # Get data
-                        disk_usage = psutil.disk_usage(mount_point)
-                        # Line 1 - Mount point
-                        buffer = 'MOUNT  ' + mount_point
-                        if DRAW.textlength(buffer, font=FONT) <= WIDTH:
-                            DRAW.text((LEFT, LINE1), 'MOUNT',
-                                      font=FONT, fill=255)
-                            buffer = mount_point
-                            DRAW.text((RIGHT, LINE1), buffer,
-                                      font=FONT, fill=255, anchor="ra")
-                        else:
-                            DRAW.text((LEFT, LINE1), mount_point,
-                                      font=FONT, fill=255)
-                        # Line 2 - Used space
-                        DRAW.text((LEFT, LINE2), 'USED', font=FONT, fill=255)
-                        if disk_usage.used / GB < 1:
-                            buffer = f'{round(disk_usage.used / MB, 3):.3f} MB'
-                        else:
-                            buffer = f'{round(disk_usage.used / GB, 3):.3f} GB'
-                        DRAW.text((RIGHT, LINE2), buffer,
-                                  font=FONT, fill=255, anchor="ra")
-                        # Line 3 - Free space
-                        DRAW.text((LEFT, LINE3), 'FREE', font=FONT, fill=255)
-                        if disk_usage.free / GB < 1:
-                            buffer = f'{round(disk_usage.free / MB, 3):.3f} MB'
-                        else:
-                            buffer = f'{round(disk_usage.free / GB, 3):.3f} GB'
-                        DRAW.text((RIGHT, LINE3), buffer,
-                                  font=FONT, fill=255, anchor="ra")
-                        # Line 4 - Total space
-                        DRAW.text((LEFT, LINE4), 'TOTAL', font=FONT, fill=255)
-                        if disk_usage.total / GB < 1:
-                            buffer = f'{round(disk_usage.total / MB, 3):.3f} MB'
-                        else:
-                            buffer = f'{round(disk_usage.total / GB, 3):.3f} GB'
-                        DRAW.text((RIGHT, LINE4), buffer,
-                                  font=FONT, fill=255, anchor="ra")
+                        values.update({
+                            'used': Storage.size_to_str(disk_usage.used),
+                            'free': Storage.size_to_str(disk_usage.free),
+                            'total': Storage.size_to_str(disk_usage.total)
+                        })
+                    Storage.template(mount_point).render(device, values)
         except Exception as e:
-            print(e)
             if not Storage.__error_printed:
                 logging.exception(e)
                 Storage.__error_printed = True
@@ -489,33 +872,73 @@ class Storage:
 class Network:
     """Class Network"""
 
-    __sleep = 1
-    __last_in = -1.0
-    __last_out = -1.0
+    __templates = {}
+    __counters = {}
     __error_printed = False
 
     @staticmethod
-    def get_usage_in(interface):
-        """Get incomming network treffic"""
-        stat = psutil.net_io_counters(pernic=True, nowrap=True)[interface]
-        this_in = stat.bytes_recv
-        if Network.__last_in >= 0:
-            usage_in = this_in - Network.__last_in
-        else:
-            usage_in = 0.0
-        Network.__last_in = this_in
-        return usage_in
+    def template(interface):
+        """Get static layer of network page"""
+        return Template.cached(Network.__templates, device, interface, lambda: Template(device.size, TEXT)
+            .add_bitmap((1, LINE3), Assets.bitmap('netup'))
+            .add_bitmap((1, LINE4), Assets.bitmap('netdown'))
+            .add_text((RIGHT, LINE4), interface, 'ra')
+            .add_field('hostname', (LEFT, LINE1))
+            .add_field('ip', (LEFT, LINE2))
+            .add_field('out', (LEFT + 11, LINE3))
+            .add_field('in', (LEFT + 11, LINE4)))
+
+    @staticmethod
+    def usage_to_str(usage):
+        """Convert bytes per second to KB/s or MB/s string"""
+        # Byte
+        if usage < NET_KB:
+            return f'{round(usage / NET_KB, 3):.3f} KB/s'
+        # Kilo Byte
+        if round(usage / NET_KB, 3) < 10:
+            return f'{round(usage / NET_KB, 3):.3f} KB/s'
+        if round(usage / NET_KB, 2) < 100:
+            return f'{round(usage / NET_KB, 2):.2f} KB/s'
+        if round(usage / NET_KB, 1) < 1000:
+            return f'{round(usage / NET_KB, 1):.1f} KB/s'
+        # Mega Byte
+        if round(usage / NET_MB, 3) < 10:
+            return f'{round(usage / NET_MB, 3):.3f} MB/s'
+        if round(usage / NET_MB, 2) < 100:
+            return f'{round(usage / NET_MB, 2):.2f} MB/s'
+        return f'{round(usage / NET_MB, 1):.1f} MB/s'
 
     @staticmethod
-    def get_usage_out(interface):
-        """Get outgoing network treffic"""
-        stat = psutil.net_io_counters(pernic=True, nowrap=True)[interface]
-        this_out = stat.bytes_sent
-        usage_in = 0.0
-        if Network.__last_out >= 0:
-            usage_in = this_out - Network.__last_out
-        Network.__last_out = this_out
-        return usage_in
+    def get_counters(interface):
+        """Get sent and received bytes of interface from sysfs"""
+        if interface not in Network.__counters:
+            path = f'/sys/class/net/{interface}/statistics/'
+            Network.__counters[interface] = (
+                SysfsFile(path + 'tx_bytes'),
+                SysfsFile(path + 'rx_bytes'))
+        tx_bytes, rx_bytes = Network.__counters[interface]
+        return (tx_bytes.read_int(), rx_bytes.read_int())
+
+    @staticmethod
+    def sample_usage(interface, refresh):
+        """Register byte rates of interface and their history"""
+        Sampler.add_rate(f'net_usage:{interface}',
+                         lambda: Network.get_counters(interface),
+                         min(refresh, NET_SAMPLE_INTERVAL), alpha=NET_EWMA_ALPHA)
+        Sampler.add_history(f'net_out:{interface}', f'net_usage:{interface}',
+                            NET_GRAPH.get_size()[0], lambda usage: usage[0])
+        Sampler.add_history(f'net_in:{interface}', f'net_usage:{interface}',
+                            NET_GRAPH.get_size()[0], lambda usage: usage[1])
+
+    @staticmethod
+    def sample(args, refresh):
+        """Register metrics of network page"""
+        interface = args['value']
+        Network.sample_usage(interface, refresh)
+        Sampler.add_probe(f'ipv4:{interface}', Probes.add(
+            f'ipv4:{interface}', lambda: Network.get_ipv4(interface)), refresh)
+        Sampler.add_probe('hostname', Probes.add(
+            'hostname', socket.gethostname), refresh)
 
     @staticmethod
     def get_ipv4(interface):
@@ -527,106 +950,51 @@ class Network:
                 if addr.family is socket.AddressFamily.AF_INET:
                     return addr.address
         except Exception as e:
-            print(e)
             logging.exception(e)
         return res
 
     @staticmethod
     def reset():
         """Perform reset"""
-        Network.__last_in = -1.0
-        Network.__last_out = -1.0
         Network.__error_printed = False
 
     @staticmethod
     def page(args):
         """Content of network page"""
         try:
-            this_loop = time()
+            this_loop = monotonic()
             # Draw icon
             if Pages.get_show_icons() and Pages.get_print_icon():
-                with canvas(device) as DRAW:
-                    Pages.set_last_loop(this_loop)
-                    Pages.set_print_icon(False)
-                    # Draw bitmap
-                    if args['icon'] == 'lan':
-                        DRAW.bitmap((32, 0), IMG_LAN, fill=1)
-                    elif args['icon'] == 'wifi':
-                        DRAW.bitmap((32, 0), IMG_WIFI, fill=1)
+                Pages.set_last_loop(this_loop)
+                Pages.set_print_icon(False)
+                Pages.show_icon(args['icon'])
             # Draw text
-            elif (this_loop - Pages.get_last_loop() >= 1 and not Pages.get_print_text()) or (this_loop - Pages.get_last_loop() >= Network.__sleep and Pages.get_print_text()):
-                with canvas(device) as DRAW:
-                    Pages.set_last_loop(this_loop)
-                    Pages.set_print_text(True)
-                    interface = args['value']
-                    if not os.path.exists(f'/sys/class/net/{interface}'):
-                        if not Network.__error_printed:
-                            e = f'Network interface \'{interface}\' does not exist!'
-                            logging.error(e)
-                            Network.__error_printed = True
+            elif (this_loop - Pages.get_last_loop() >= ICON_TIME and not Pages.get_print_text()) or (this_loop - Pages.get_last_loop() >= Pages.get_refresh() and Pages.get_print_text()):
+                Pages.set_last_loop(this_loop)
+                Pages.set_print_text(True)
+                interface = args['value']
+                if not os.path.exists(f'/sys/class/net/{interface}'):
+                    if not Network.__error_printed:
+                        e = f'Network interface \'{interface}\' does not exist!'
+                        logging.error(e)
+                        Network.__error_printed = True
+                    with canvas(device) as DRAW:
                         buffer = 'Network interface'
-                        DRAW.text((LEFT, LINE1), buffer, font=FONT, fill=255)
+                        TEXT.text(DRAW, (LEFT, LINE1), buffer, fill=255)
                         buffer = f'\'{interface}\''
-                        DRAW.text((LEFT, LINE2), buffer, font=FONT, fill=255)
+                        TEXT.text(DRAW, (LEFT, LINE2), buffer, fill=255)
                         buffer = 'does not exist'
-                        DRAW.text((LEFT, LINE3), buffer, font=FONT, fill=255)
-                    else:
-                        # Line 1 - Hostname
-                        DRAW.text((LEFT, LINE1), socket.gethostname(),
-                                  font=FONT, fill=255)
-                        # Line 2 - IP address
-                        DRAW.text((LEFT, LINE2), Network.get_ipv4(
-                            interface), font=FONT, fill=255)
-                        # Line 3 - Usage sent
-                        DRAW.bitmap((1, LINE3), IMG_NETUP, fill=1)
-                        usage_out = Network.get_usage_out(interface)
-                        # Byte
-                        if usage_out < NET_KB:
-                            buffer = f'{round(usage_out / NET_KB, 3):.3f} KB/s'
-                        # Kilo Byte
-                        elif round(usage_out / NET_KB, 3) < 10:
-                            buffer = f'{round(usage_out / NET_KB, 3):.3f} KB/s'
-                        elif round(usage_out / NET_KB, 2) < 100:
-                            buffer = f'{round(usage_out / NET_KB, 2):.2f} KB/s'
-                        elif round(usage_out / NET_KB, 1) < 1000:
-                            buffer = f'{round(usage_out / NET_KB, 1):.1f} KB/s'
-                        # Mega Byte
-                        elif round(usage_out / NET_MB, 3) < 10:
-                            buffer = f'{round(usage_out / NET_MB, 3):.3f} MB/s'
-                        elif round(usage_out / NET_MB, 2) < 100:
-                            buffer = f'{round(usage_out / NET_MB, 2):.2f} MB/s'
-                        elif round(usage_out / NET_MB, 1) < 1000:
-                            buffer = f'{round(usage_out / NET_MB, 1):.1f} MB/s'
-                        DRAW.text((LEFT + 11, LINE3), buffer,
-                                  font=FONT, fill=255)
-                        # Line 4 - Usage received
-                        DRAW.bitmap((1, LINE4), IMG_NETDOWN, fill=1)
-                        usage_in = Network.get_usage_in(interface)
-                        # Byte
-                        if usage_in < NET_KB:
-                            buffer = f'{round(usage_in / NET_KB, 3):.3f} KB/s'
-                        # Kilo Byte
-                        elif round(usage_in / NET_KB, 3) < 10:
-                            buffer = f'{round(usage_in / NET_KB, 3):.3f} KB/s'
-                        elif round(usage_in / NET_KB, 2) < 100:
-                            buffer = f'{round(usage_in / NET_KB, 2):.2f} KB/s'
-                        elif round(usage_in / NET_KB, 1) < 1000:
-                            buffer = f'{round(usage_in / NET_KB, 1):.1f} KB/s'
-                        # Mega Byte
-                        elif round(usage_in / NET_MB, 3) < 10:
-                            buffer = f'{round(usage_in / NET_MB, 3):.3f} MB/s'
-                        elif round(usage_in / NET_MB, 2) < 100:
-                            buffer = f'{round(usage_in / NET_MB, 2):.2f} MB/s'
-                        elif round(usage_in / NET_MB, 1) < 1000:
-                            buffer = f'{round(usage_in / NET_MB, 1):.1f} MB/s'
-                        DRAW.text((LEFT + 11, LINE4), buffer,
-                                  font=FONT, fill=255)
-                        # Line 4 - Interface
-                        buffer = interface
-                        DRAW.text((RIGHT, LINE4), buffer,
-                                  font=FONT, fill=255, anchor="ra")
+                        TEXT.text(DRAW, (LEFT, LINE3), buffer, fill=255)
+                else:
+                    snapshot = Sampler.snapshot()
+                    usage = snapshot.get(f'net_usage:{interface}')
+                    Network.template(interface).render(device, {
+                        'hostname': snapshot.get('hostname', '?'),
+                        'ip': snapshot.get(f'ipv4:{interface}', '?'),
+                        'out': '?' if usage is None else Network.usage_to_str(usage[0]),
+                        'in': '?' if usage is None else Network.usage_to_str(usage[1])
+                    })
         except Exception as e:
-            print(e)
             if not Network.__error_printed:
                 logging.exception(e)
                 Network.__error_printed = True
@@ -635,165 +1003,298 @@ class Network:
 class Docker:
     """Class Docker"""
 
-    __sleep = 5
-    __state_list = None
-    __usage_json = None
-    __thread = None
+    __client = DockerClient()
+    __templates = {}
+    __status_ttl = 30
     __error_printed = False
 
     @staticmethod
-    def get_docker_status():
-        """Get docker status"""
+    def set_status_ttl(t):
+        """Set seconds the docker daemon status is cached"""
         try:
-            subprocess.check_output(
-                'systemctl is-active docker',
-                shell=True
-            ).decode('utf-8')
+            Docker.__status_ttl = abs(int(t))
             return True
-        except subprocess.CalledProcessError:
+        except ValueError:
             return False
 
     @staticmethod
-    def get_running_list():
-        """Get docker running list"""
-        try:
-            output_str = subprocess.check_output(
-                'docker ps --all --format "{{.State}},"',
-                shell=True,
-                stderr=subprocess.STDOUT
-            ).decode('utf-8')[:-2]
-            Docker.__state_list = output_str.split(',\n')
-        except Exception as e:
-            print(e)
-            logging.exception(e)
-            return False
+    def template():
+        """Get static layer of docker page"""
+        return Template.cached(Docker.__templates, device, None, lambda: Template(device.size, TEXT)
+            .add_text((LEFT, LINE1), 'RUNNING')
+            .add_text((LEFT, LINE2), 'CPU LOAD')
+            .add_text((LEFT, LINE3), 'MEM')
+            .add_text((LEFT, LINE4), 'PIDS')
+            .add_field('running', (RIGHT, LINE1), 'ra')
+            .add_field('cpu', (RIGHT, LINE2), 'ra')
+            .add_field('mem', (RIGHT, LINE3), 'ra')
+            .add_field('pids', (RIGHT, LINE4), 'ra'))
 
     @staticmethod
-    def get_usage_json():
-        """Get docker usage json"""
-        try:
-            output_str = '[' + subprocess.check_output('docker stats --no-stream --format \'{\"CPUPerc\":{{ .CPUPerc }}, \"MemUsage\":{{ json .MemUsage }}, "PIDs":{{ .PIDs }}},\'',
-                                                       shell=True, stderr=subprocess.STDOUT).decode('utf-8').replace('%', '')[:-2] + ']'
-            Docker.__usage_json = json.loads(output_str)
-        except Exception as e:
-            print(e)
-            logging.exception(e)
+    def get_usage():
+        """Get docker usage summary from the Docker Engine API"""
+        if not Docker.__client.is_active(Docker.__status_ttl):
+            return {'active': False}
+        return Docker.__client.usage()
 
     @staticmethod
-    def memory_str_to_float(s):
-        """Convert memory string to float"""
-        if 'KiB' in s:
-            return float(s.replace('KiB', '')) * KB
-        if 'MiB' in s:
-            return float(s.replace('MiB', '')) * MB
-        if 'GiB' in s:
-            return float(s.replace('GiB', '')) * GB
-        return float(s.replace('B', ''))
+    def sample(args, refresh):
+        """Register metrics of docker page"""
+        Sampler.add_probe('docker', Probes.add(
+            'docker', Docker.get_usage, DOCKER_TIMEOUT), refresh)
 
     @staticmethod
     def reset():
         """Perform reset"""
-        try:
-            Docker.__state_list = None
-            Docker.__usage_json = None
-            Docker.__error_printed = False
-            if Docker.__thread is not None:
-                if Docker.__thread.is_alive():
-                    Docker.__thread = None
-        except Exception as e:
-            print(e)
-            logging.exception(e)
+        Docker.__error_printed = False
 
     @staticmethod
     def page(args):
         """Content of docker page"""
         try:
-            this_loop = time()
+            this_loop = monotonic()
             # Draw icon
             if Pages.get_show_icons() and Pages.get_print_icon():
-                with canvas(device) as DRAW:
-                    Pages.set_last_loop(this_loop)
-                    Pages.set_print_icon(False)
-                    # Draw bitmap
-                    DRAW.bitmap((32, 0), IMG_DOCKER, fill=1)
+                Pages.set_last_loop(this_loop)
+                Pages.set_print_icon(False)
+                Pages.show_icon('docker')
             # Draw text
-            elif (this_loop - Pages.get_last_loop() >= 1 and not Pages.get_print_text()) or (this_loop - Pages.get_last_loop() >= Docker.__sleep and Pages.get_print_text()):
-                with canvas(device) as DRAW:
-                    Pages.set_last_loop(this_loop)
-                    Pages.set_print_text(True)
-                    if not Docker.get_docker_status():
-                        if not Docker.__error_printed:
-                            e = 'Docker service is not active or not installed!'
-                            logging.error(e)
-                            Docker.__error_printed = True
+            elif (this_loop - Pages.get_last_loop() >= ICON_TIME and not Pages.get_print_text()) or (this_loop - Pages.get_last_loop() >= Pages.get_refresh() and Pages.get_print_text()):
+                Pages.set_last_loop(this_loop)
+                Pages.set_print_text(True)
+                usage = Sampler.snapshot().get('docker')
+                if usage is not None and not usage['active']:
+                    if not Docker.__error_printed:
+                        e = 'Docker service is not active or not installed!'
+                        logging.error(e)
+                        Docker.__error_printed = True
+                    with canvas(device) as DRAW:
                         buffer = 'Docker service'
-                        DRAW.text((LEFT, LINE1), buffer, font=FONT, fill=255)
+                        TEXT.text(DRAW, (LEFT, LINE1), buffer, fill=255)
                         buffer = 'is not active'
-                        DRAW.text((LEFT, LINE2), buffer, font=FONT, fill=255)
+                        TEXT.text(DRAW, (LEFT, LINE2), buffer, fill=255)
                         buffer = 'or not installed!'
-                        DRAW.text((LEFT, LINE3), buffer, font=FONT, fill=255)
-                        # buffer = ''
-                        # DRAW.text((LEFT, LINE4), buffer, font=FONT, fill=255)
+                        TEXT.text(DRAW, (LEFT, LINE3), buffer, fill=255)
+                elif usage is None:
+                    Docker.template().render(device, {
+                        'running': 'get data',
+                        'cpu': 'get data',
+                        'mem': 'get data',
+                        'pids': 'get data'
+                    })
+                else:
+                    # Memory usage total
+                    mem = usage['mem']
+                    total = usage['mem_total']
+                    if total / GB < 1:
+                        mem = f'{round(mem / MB):4d} MB / {round(total / MB):1d} MB'
                     else:
-                        Docker.get_running_list()
-                        if Docker.__thread is None or not Docker.__thread.is_alive():
-                            Docker.__thread = threading.Thread(
-                                target=Docker.get_usage_json)
-                            Docker.__thread.daemon = True
-                            Docker.__thread.start()
-                        Pages.set_last_loop(this_loop)
-                        # Draw a black filled box to clear the image
-                        DRAW.rectangle((0, 0, WIDTH, HEIGHT),
-                                       outline=0, fill=0)
-                        # Line 1 - running containers / total containers
-                        DRAW.text((LEFT, LINE1), 'RUNNING',
-                                  font=FONT, fill=255)
-                        if Docker.__state_list is not None:
-                            running = Docker.__state_list.count('running')
-                            total = len(Docker.__state_list)
-                            buffer = f'{running:d} / {total:d}'
-                        else:
-                            buffer = 'get data'
-                        DRAW.text((RIGHT, LINE1), buffer,
-                                  font=FONT, fill=255, anchor="ra")
-                        # Line 2 - CPU usage total
-                        DRAW.text((LEFT, LINE2), 'CPU LOAD',
-                                  font=FONT, fill=255)
-                        if Docker.__usage_json is not None:
-                            load = round(sum(float(i['CPUPerc'])
-                                             for i in Docker.__usage_json), 2)
-                            buffer = f'{load:.2f} %'
-                        else:
-                            buffer = 'get data'
-                        DRAW.text((RIGHT, LINE2), buffer,
-                                  font=FONT, fill=255, anchor="ra")
-                        # Line 3 - Memory usage total
-                        DRAW.text((LEFT, LINE3), 'MEM', font=FONT, fill=255)
-                        if Docker.__usage_json is not None:
-                            mem = round(sum([Docker.memory_str_to_float(
-                                x) for x in i['MemUsage'].split(' / ')][0] for i in Docker.__usage_json))
-                            total = Docker.memory_str_to_float(
-                                Docker.__usage_json[0]['MemUsage'].split(' / ')[1])
-                            if total / GB < 1:
-                                buffer = f'{round(mem / MB):4d} MB / {round(total / MB):1d} MB'
-                            else:
-                                buffer = f'{round(mem / MB):4d} MB / {round(total / GB):1d} GB'
-                        else:
-                            buffer = 'get data'
-                        DRAW.text((RIGHT, LINE3), buffer,
-                                  font=FONT, fill=255, anchor="ra")
-                        # Line 4 - PIDs total
-                        DRAW.text((LEFT, LINE4), 'PIDS', font=FONT, fill=255)
-                        if Docker.__usage_json is not None:
-                            pids = round(sum(float(i['PIDs'])
-                                             for i in Docker.__usage_json))
-                            buffer = f'{pids:6d}'
-                        else:
-                            buffer = 'get data'
-                        DRAW.text((RIGHT, LINE4), buffer,
-                                  font=FONT, fill=255, anchor="ra")
+                        mem = f'{round(mem / MB):4d} MB / {round(total / GB):1d} GB'
+                    Docker.template().render(device, {
+                        'running': f'{usage["running"]:d} / {usage["total"]:d}',
+                        'cpu': f'{round(usage["cpu"], 2):.2f} %',
+                        'mem': mem,
+                        'pids': f'{usage["pids"]:6d}'
+                    })
         except Exception as e:
-            print(e)
             if not Docker.__error_printed:
                 logging.exception(e)
                 Docker.__error_printed = True
+
+
+class CpuGraph:
+    """Class CpuGraph"""
+
+    __templates = {}
+    __error_printed = False
+
+    @staticmethod
+    def reset():
+        """reset"""
+        CpuGraph.__error_printed = False
+
+    @staticmethod
+    def template():
+        """Get static layer of cpugraph page"""
+        return Template.cached(CpuGraph.__templates, device, None, lambda: Template(device.size, TEXT)
+            .add_text((LEFT, LINE1), 'CPU')
+            .add_field('cpu', (RIGHT, LINE1), 'ra')
+            .add_field('graph', GRAPH_XY))
+
+    @staticmethod
+    def sample(args, refresh):
+        """Register metrics of cpugraph page"""
+        Sampler.add('cpu_percent', psutil.cpu_percent, refresh)
+        Sampler.add_history('cpu_percent', 'cpu_percent', GRAPH.get_size()[0])
+
+    @staticmethod
+    def page(args):
+        """Content of cpugraph page"""
+        try:
+            this_loop = monotonic()
+            # Draw icon
+            if Pages.get_show_icons() and Pages.get_print_icon():
+                Pages.set_last_loop(this_loop)
+                Pages.set_print_icon(False)
+                Pages.show_icon('cpu_mem')
+            # Draw text
+            elif (this_loop - Pages.get_last_loop() >= ICON_TIME and not Pages.get_print_text()) or (this_loop - Pages.get_last_loop() >= Pages.get_refresh() and Pages.get_print_text()):
+                Pages.set_last_loop(this_loop)
+                Pages.set_print_text(True)
+                history = Sampler.history('cpu_percent')
+                cpu = history.last()
+                CpuGraph.template().render(device, {
+                    'cpu': '?' if cpu is None else f'{round(cpu, 0):.0f}%',
+                    'graph': GRAPH.render(history.values(), 100)
+                })
+        except Exception as e:
+            if not CpuGraph.__error_printed:
+                logging.exception(e)
+                CpuGraph.__error_printed = True
+
+
+class TempGraph:
+    """Class TempGraph"""
+
+    __templates = {}
+    __error_printed = False
+
+    @staticmethod
+    def reset():
+        """reset"""
+        TempGraph.__error_printed = False
+
+    @staticmethod
+    def template():
+        """Get static layer of tempgraph page"""
+        return Template.cached(TempGraph.__templates, device, None, lambda: Template(device.size, TEXT)
+            .add_text((LEFT, LINE1), 'TEMP')
+            .add_field('temp', (RIGHT, LINE1), 'ra')
+            .add_field('graph', GRAPH_XY))
+
+    @staticmethod
+    def get_range(values):
+        """Get graph range in steps of 10 °C"""
+        bottom = (min(values) // 10) * 10
+        top = max((max(values) // 10 + 1) * 10, bottom + 10)
+        return (bottom, top)
+
+    @staticmethod
+    def sample(args, refresh):
+        """Register metrics of tempgraph page"""
+        sensor = CpuMem.get_sensor(args)
+        if sensor is None:
+            CpuMem.log_no_sensor(args)
+            return
+        Sampler.add(f'cpu_temperature:{sensor.name}', sensor.read, refresh)
+        Sampler.add_history(f'cpu_temperature:{sensor.name}',
+                            f'cpu_temperature:{sensor.name}', GRAPH.get_size()[0])
+
+    @staticmethod
+    def page(args):
+        """Content of tempgraph page"""
+        try:
+            this_loop = monotonic()
+            # Draw icon
+            if Pages.get_show_icons() and Pages.get_print_icon():
+                Pages.set_last_loop(this_loop)
+                Pages.set_print_icon(False)
+                Pages.show_icon('cpu_mem')
+            # Draw text
+            elif (this_loop - Pages.get_last_loop() >= ICON_TIME and not Pages.get_print_text()) or (this_loop - Pages.get_last_loop() >= Pages.get_refresh() and Pages.get_print_text()):
+                Pages.set_last_loop(this_loop)
+                Pages.set_print_text(True)
+                sensor = CpuMem.get_sensor(args)
+                history = None if sensor is None else Sampler.history(f'cpu_temperature:{sensor.name}')
+                if history is None or history.total() == 0:
+                    TempGraph.template().render(device, {
+                        'temp': '? °C',
+                        'graph': GRAPH.render(array('f'), 0)
+                    })
+                else:
+                    values = history.values()
+                    bottom, top = TempGraph.get_range(values)
+                    TempGraph.template().render(device, {
+                        'temp': f'{round(history.last(), 1):.1f} °C',
+                        'graph': GRAPH.render(values, top, bottom)
+                    })
+        except Exception as e:
+            if not TempGraph.__error_printed:
+                logging.exception(e)
+                TempGraph.__error_printed = True
+
+
+class NetGraph:
+    """Class NetGraph
+
+    Received bytes are drawn upwards in the upper half of the graph,
+    sent bytes downwards in the lower half, both on the same scale.
+    Rates are shown in KB/s (K) and MB/s (M).
+    """
+
+    __templates = {}
+    __error_printed = False
+
+    @staticmethod
+    def reset():
+        """reset"""
+        NetGraph.__error_printed = False
+
+    @staticmethod
+    def template(interface):
+        """Get static layer of netgraph page"""
+        return Template.cached(NetGraph.__templates, device, interface, lambda: Template(device.size, TEXT)
+            .add_bitmap((1, LINE1), Assets.bitmap('netdown'))
+            .add_bitmap((WIDTH - 6, LINE1), Assets.bitmap('netup'))
+            .add_field('in', (LEFT + 9, LINE1))
+            .add_field('out', (RIGHT - 8, LINE1), 'ra')
+            .add_field('graph_in', GRAPH_XY)
+            .add_field('graph_out', (GRAPH_XY[0], GRAPH_XY[1] + NET_GRAPH.get_size()[1])))
+
+    @staticmethod
+    def rate_to_str(usage):
+        """Convert bytes per second to a short KB/s or MB/s string"""
+        for value, unit in ((usage / NET_KB, 'K'), (usage / NET_MB, 'M')):
+            if round(value, 2) < 10:
+                return f'{value:.2f} {unit}'
+            if round(value, 1) < 100:
+                return f'{value:.1f} {unit}'
+            if round(value) < 1000:
+                return f'{value:.0f} {unit}'
+        return f'{usage / NET_MB:.0f} M'
+
+    @staticmethod
+    def sample(args, refresh):
+        """Register metrics of netgraph page"""
+        Network.sample_usage(args['value'], refresh)
+
+    @staticmethod
+    def page(args):
+        """Content of netgraph page"""
+        try:
+            this_loop = monotonic()
+            # Draw icon
+            if Pages.get_show_icons() and Pages.get_print_icon():
+                Pages.set_last_loop(this_loop)
+                Pages.set_print_icon(False)
+                Pages.show_icon(args['icon'])
+            # Draw text
+            elif (this_loop - Pages.get_last_loop() >= ICON_TIME and not Pages.get_print_text()) or (this_loop - Pages.get_last_loop() >= Pages.get_refresh() and Pages.get_print_text()):
+                Pages.set_last_loop(this_loop)
+                Pages.set_print_text(True)
+                interface = args['value']
+                values_out = Sampler.history(f'net_out:{interface}').values()
+                values_in = Sampler.history(f'net_in:{interface}').values()
+                top = max(max(values_out, default=0), max(values_in, default=0), NET_KB)
+                usage_out, usage_in = Sampler.snapshot().get(f'net_usage:{interface}', (0, 0))
+                NetGraph.template(interface).render(device, {
+                    'in': NetGraph.rate_to_str(usage_in),
+                    'out': NetGraph.rate_to_str(usage_out),
+                    'graph_in': NET_GRAPH.render(values_in, top),
+                    'graph_out': NET_GRAPH.render(values_out, top).transpose(
+                        Image.Transpose.FLIP_TOP_BOTTOM)
+                })
+        except Exception as e:
+            if not NetGraph.__error_printed:
+                logging.exception(e)
+                NetGraph.__error_printed = True
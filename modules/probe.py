@@ -0,0 +1,232 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+import subprocess
+import threading
+
+# Additional pip modules
+
+# Additional project modules
+from modules.clock import monotonic
+
+
+PROBE_WORKERS = 4  # Threads running blocking probes
+PROBE_TIMEOUT = 2  # Default seconds until a probe call counts as timed out
+
+executor = ThreadPoolExecutor(max_workers=PROBE_WORKERS, thread_name_prefix='probe')
+
+
+async def run_command(*args):
+    """Run command without a shell and get its output
+
+    The process is killed if the call is cancelled or times out.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL)
+    try:
+        stdout, _ = await process.communicate()
+    except asyncio.CancelledError:
+        process.kill()
+        await process.wait()
+        raise
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, args)
+    return stdout.decode('utf-8', 'replace')
+
+
+class Probe:
+    """Class Probe
+
+    Runs a function which may block (statvfs on a hung network mount,
+    the Docker API ...) in the shared worker pool. Callers wait for it
+    at most until its timeout or an earlier deadline. The last good
+    result is kept with its time. Only one call per probe is in flight,
+    so a hung probe never occupies more than one worker.
+
+    A probe with its own worker does not use the shared pool, e.g. for
+    statvfs of a mount: any number of hung mounts can not starve the
+    other probes.
+
+    A coroutine function (e.g. run_command()) runs as a task on the
+    running loop instead, without a worker. Such a call is cancelled
+    when it times out.
+    """
+
+    def __init__(self, name, func, timeout=PROBE_TIMEOUT, *, own_worker=False):
+        self.name = name
+        self.__func = func
+        self.__timeout = timeout
+        self.__executor = executor
+        if own_worker:
+            self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'probe-{name}')
+        self.__future = None
+        self.__started = 0
+        self.__timed_out = False
+        self.__value = None
+        self.__time = None
+        self.__lock = threading.Lock()
+        self.count = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+
+    def get(self):
+        """Get (value, monotonic time) of the last good result, (None, None) if none"""
+        return (self.__value, self.__time)
+
+    def busy(self):
+        """Check if a call is still in flight"""
+        return self.__future is not None and not self.__future.done()
+
+    def start(self):
+        """Start a call unless one is in flight"""
+        if self.__future is None:
+            self.__started = monotonic()
+            self.__timed_out = False
+            if asyncio.iscoroutinefunction(self.__func):
+                # Only on the loop of the runtime, raises RuntimeError without a running loop
+                self.__future = asyncio.get_running_loop().create_task(self.__call_async())
+            else:
+                self.__future = self.__executor.submit(self.__call)
+
+    def __call(self):
+        """Call function in a worker and record its latency"""
+        start = monotonic()
+        try:
+            return self.__func()
+        finally:
+            self.__count(monotonic() - start)
+
+    async def __call_async(self):
+        """Await coroutine function on the loop and record its latency"""
+        start = monotonic()
+        try:
+            return await self.__func()
+        finally:
+            self.__count(monotonic() - start)
+
+    def __count(self, latency):
+        """Record latency of one call"""
+        with self.__lock:
+            self.last_latency = latency
+            self.max_latency = max(self.max_latency, latency)
+            self.total_latency += latency
+            self.count += 1
+
+    def __result(self, timeout):
+        """Get result of the call in flight, a task is never waited for"""
+        if isinstance(self.__future, asyncio.Future):
+            if not self.__future.done():
+                raise TimeoutError()
+            return self.__future.result()
+        return self.__future.result(timeout)
+
+    async def wait_async(self, deadline=None):
+        """Wait on the running loop until the call is done, its timeout or the deadline"""
+        future = self.__future
+        if future is None or future.done():
+            return
+        end = self.__started + self.__timeout
+        if deadline is not None:
+            end = min(end, deadline)
+        if not isinstance(future, asyncio.Future):
+            future = asyncio.wrap_future(future)
+        await asyncio.wait([future], timeout=max(end - monotonic(), 0))
+
+    def cancel(self):
+        """Cancel the call in flight, a function running in a worker can not be stopped
+
+        Returns the cancelled task or future, None if nothing was cancelled.
+        """
+        future = self.__future
+        if future is None or not future.cancel():
+            return None
+        self.__future = None
+        return future
+
+    def collect(self, deadline=None):
+        """Wait for the call until its timeout or the deadline
+
+        Starts a call if none is in flight. Returns like get(), errors
+        of the function are raised.
+        """
+        self.start()
+        end = self.__started + self.__timeout
+        if deadline is not None:
+            end = min(end, deadline)
+        try:
+            value = self.__result(max(end - monotonic(), 0))
+        except TimeoutError:
+            if not self.__timed_out and monotonic() - self.__started >= self.__timeout:
+                self.__timed_out = True
+                self.timeouts += 1
+                if isinstance(self.__future, asyncio.Future):
+                    self.cancel()
+            return self.get()
+        except asyncio.CancelledError:
+            self.__future = None
+            return self.get()
+        except Exception:
+            self.__future = None
+            self.errors += 1
+            raise
+        self.__future = None
+        self.__value = value
+        self.__time = monotonic()
+        return self.get()
+
+    def stats(self):
+        """Get latency and timeout counters"""
+        with self.__lock:
+            return {
+                'timeout': self.__timeout,
+                'count': self.count,
+                'timeouts': self.timeouts,
+                'errors': self.errors,
+                'busy': self.busy(),
+                'last_latency': self.last_latency,
+                'max_latency': self.max_latency,
+                'total_latency': self.total_latency
+            }
+
+
+class Probes:
+    """Class Probes - Registry of all probes"""
+
+    __probes = {}
+
+    @staticmethod
+    def add(name, func, timeout=PROBE_TIMEOUT, *, own_worker=False):
+        """Add probe, an existing probe with the same name is returned"""
+        if name not in Probes.__probes:
+            Probes.__probes[name] = Probe(name, func, timeout, own_worker=own_worker)
+        return Probes.__probes[name]
+
+    @staticmethod
+    def get(name):
+        """Get probe by name"""
+        return Probes.__probes.get(name)
+
+    @staticmethod
+    def total():
+        """Return number of probes"""
+        return len(Probes.__probes)
+
+    @staticmethod
+    def cancel():
+        """Cancel calls of all probes which are in flight, get the cancelled tasks"""
+        cancelled = [p.cancel() for p in Probes.__probes.values()]
+        return [f for f in cancelled if isinstance(f, asyncio.Future)]
+
+    @staticmethod
+    def stats():
+        """Get counters of all probes"""
+        return {name: p.stats() for name, p in Probes.__probes.items()}
@@ -0,0 +1,131 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import asyncio
+import logging
+import signal
+
+# Additional pip modules
+
+# Additional project modules
+from modules.buttons import Buttons
+from modules.clock import Clock
+from modules.pages import Pages
+from modules.probe import Probes
+from modules.sampler import Sampler
+
+
+ERROR_DELAY = 0.1      # Seconds the pages pause after an error, doubled for every error in a row
+MAX_ERROR_DELAY = 10   # Maximum seconds the pages pause after errors
+
+
+class Runtime:
+    """Class Runtime
+
+    Runs sampling, rendering and the buttons as tasks on one asyncio
+    loop. Probes with a coroutine function and commands run on the loop
+    as well, only blocking probes use the probe workers.
+
+    The app clock follows the time of the loop, so with a
+    VirtualEventLoop every task runs on virtual time.
+    """
+
+    __loop = None
+    __stop_event = None
+    __tasks = []
+    __funcs = []
+
+    @staticmethod
+    def add(func):
+        """Add coroutine function which runs as a task next to the pages"""
+        Runtime.__funcs.append(func)
+
+    @staticmethod
+    async def render():
+        """Show pages and sleep until the next deadline or a button press"""
+        delay = 0
+        while True:
+            try:
+                Pages.show()
+                delay = 0
+            except Exception as e:
+                # A broken display must not turn into a busy loop
+                logging.exception(e)
+                delay = min(max(delay * 2, ERROR_DELAY), MAX_ERROR_DELAY)
+                await asyncio.sleep(delay)
+            await Pages.wait_async()
+
+    @staticmethod
+    async def buttons():
+        """Check buttons whenever a pin may have changed"""
+        while True:
+            await Buttons.wait_async()
+            Buttons.check()
+
+    @staticmethod
+    def spawn(coro):
+        """Run coroutine as a task of the runtime, errors are logged"""
+        task = asyncio.get_running_loop().create_task(coro)
+        Runtime.__tasks.append(task)
+        task.add_done_callback(Runtime.__done)
+        return task
+
+    @staticmethod
+    def __done(task):
+        """Forget finished task and log its error"""
+        if task in Runtime.__tasks:
+            Runtime.__tasks.remove(task)
+        if not task.cancelled() and task.exception() is not None:
+            logging.error(task.exception(), exc_info=task.exception())
+
+    @staticmethod
+    async def main():
+        """Run all tasks until stop() is called or main() is cancelled"""
+        Runtime.__stop_event = asyncio.Event()
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, Runtime.__stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            # Only possible in the main thread
+            pass
+        # The pages need values for their first frame
+        await Sampler.sample_due_async()
+        Runtime.spawn(Sampler.run_async())
+        Runtime.spawn(Runtime.render())
+        if Buttons.total() > 0:
+            Runtime.spawn(Runtime.buttons())
+        for func in Runtime.__funcs:
+            Runtime.spawn(func())
+        try:
+            await Runtime.__stop_event.wait()
+        finally:
+            tasks = list(Runtime.__tasks)
+            for task in tasks:
+                task.cancel()
+            # Probe tasks kill their processes when they are cancelled
+            await asyncio.gather(*tasks, *Probes.cancel(), return_exceptions=True)
+
+    @staticmethod
+    def run(loop=None, duration=None):
+        """Run all tasks on a new loop or the given loop, for duration seconds or until stop()"""
+        if loop is None:
+            loop = asyncio.new_event_loop()
+        Runtime.__loop = loop
+        Clock.set(loop.time)
+        try:
+            if duration is not None:
+                loop.call_later(duration, Runtime.stop)
+            loop.run_until_complete(Runtime.main())
+        finally:
+            Clock.set(None)
+            Runtime.__loop = None
+            loop.close()
+
+    @staticmethod
+    def stop():
+        """Stop all tasks, may be called from any thread"""
+        if Runtime.__loop is not None and Runtime.__stop_event is not None:
+            Runtime.__loop.call_soon_threadsafe(Runtime.__stop_event.set)
@@ -0,0 +1,348 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import asyncio
+import logging
+from types import MappingProxyType
+
+# Additional pip modules
+
+# Additional project modules
+from modules.clock import monotonic
+from modules.history import History
+from modules.wakeup import Wakeup
+
+
+MIN_INTERVAL = 0.1  # Minimum seconds between two samples of a metric
+PROBE_BUDGET = 0.25  # Seconds one sampling round waits for all probes
+PENDING = object()  # Returned by a metric which has no new value yet
+
+
+class Snapshot:
+    """Class Snapshot - Immutable set of metric values"""
+
+    def __init__(self, values, times):
+        self.__values = MappingProxyType(values)
+        self.__times = MappingProxyType(times)
+
+    def __getitem__(self, name):
+        return self.__values[name]
+
+    def __contains__(self, name):
+        return name in self.__values
+
+    def get(self, name, default=None):
+        """Get metric value or default"""
+        return self.__values.get(name, default)
+
+    def age(self, name):
+        """Get seconds since metric was sampled"""
+        return monotonic() - self.__times[name]
+
+    def values(self):
+        """Get read only mapping of all metric values"""
+        return self.__values
+
+    def times(self):
+        """Get read only mapping of all metric sample times"""
+        return self.__times
+
+
+class Metric:
+    """Class Metric - One value sampled on its own interval"""
+
+    def __init__(self, name, func, interval):
+        self.name = name
+        self.func = func
+        self.interval = max(float(interval), MIN_INTERVAL)
+        self.next_time = 0
+        self.count = 0
+        self.errors = 0
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+        self.total_duration = 0.0
+        self.error_printed = False
+
+    def start(self):
+        """Start sampling in the background, nothing to do for plain metrics"""
+
+    async def wait_async(self, deadline=None):
+        """Wait on the running loop until sample() does not block, plain metrics never do"""
+
+    def sample(self, deadline=None):
+        """Call metric function and record its duration"""
+        start = monotonic()
+        try:
+            return self.func()
+        finally:
+            self.last_duration = monotonic() - start
+            self.max_duration = max(self.max_duration, self.last_duration)
+            self.total_duration += self.last_duration
+            self.count += 1
+
+    def stats(self):
+        """Get sampling cost"""
+        return {
+            'interval': self.interval,
+            'count': self.count,
+            'errors': self.errors,
+            'last_duration': self.last_duration,
+            'max_duration': self.max_duration,
+            'total_duration': self.total_duration
+        }
+
+
+class RateMetric(Metric):
+    """Class RateMetric - Per second rates of a tuple of counters
+
+    The published value is an exponentially weighted moving average of
+    the rates, alpha=1 publishes the raw rates.
+    """
+
+    def __init__(self, name, func, interval, *, alpha=1.0):
+        super().__init__(name, func, interval)
+        self.alpha = min(max(float(alpha), 0.01), 1.0)
+        self.__smoothed = None
+        self.__last_counters = None
+        self.__last_time = 0
+
+    def sample(self, deadline=None):
+        """Sample counters and return their smoothed rates since the last sample"""
+        counters = super().sample(deadline)
+        now = monotonic()
+        if self.__last_counters is None or now <= self.__last_time:
+            # Nothing to compare with yet, take the next sample soon
+            self.__last_counters = counters
+            self.__last_time = now
+            self.next_time = now + MIN_INTERVAL
+            return self.__smoothed or tuple(0.0 for c in counters)
+        delta = now - self.__last_time
+        rates = tuple(max(c - l, 0) / delta for c, l in zip(counters, self.__last_counters))
+        self.__last_counters = counters
+        self.__last_time = now
+        if self.__smoothed is None or len(self.__smoothed) != len(rates):
+            self.__smoothed = rates
+        else:
+            self.__smoothed = tuple(
+                s + self.alpha * (r - s) for r, s in zip(rates, self.__smoothed))
+        return self.__smoothed
+
+
+class ProbeMetric(Metric):
+    """Class ProbeMetric - Value of a Probe, sampled in the probe worker pool
+
+    Publishes only new results, so the age of the metric in the
+    snapshot is the age of the last good result.
+    """
+
+    def __init__(self, name, probe, interval):
+        super().__init__(name, probe.collect, interval)
+        self.probe = probe
+        self.__last_time = None
+
+    def start(self):
+        """Start probe call"""
+        self.probe.start()
+
+    async def wait_async(self, deadline=None):
+        """Wait on the running loop for the probe until the deadline"""
+        await self.probe.wait_async(deadline)
+
+    def sample(self, deadline=None):
+        """Wait for the probe until the deadline"""
+        start = monotonic()
+        try:
+            value, time = self.probe.collect(deadline)
+        finally:
+            self.last_duration = monotonic() - start
+            self.max_duration = max(self.max_duration, self.last_duration)
+            self.total_duration += self.last_duration
+            self.count += 1
+        if time is None or time == self.__last_time:
+            return PENDING
+        self.__last_time = time
+        return value
+
+
+class Sampler:
+    """Class Sampler
+
+    Samples all registered metrics as a task of the runtime and
+    publishes them as an immutable Snapshot. Pages only read the latest
+    snapshot, so the render task never waits for a data source.
+
+    Probes of one round run in parallel, the round waits for them on
+    the loop at most the probe budget. Slower probes are published by a
+    later round.
+
+    Metrics added between begin() and commit() replace all metrics, so
+    a reloaded config drops metrics it does not use any more and may
+    sample less often.
+    """
+
+    __metrics = {}
+    __pending = None
+    __histories = {}
+    __feeds = {}
+    __budget = PROBE_BUDGET
+    __snapshot = Snapshot({}, {})
+    __changed = Wakeup()
+
+    @staticmethod
+    def add(name, func, interval):
+        """Add metric, an existing metric keeps the shorter interval"""
+        Sampler.__add(Metric(name, func, interval))
+
+    @staticmethod
+    def add_rate(name, func, interval, *, alpha=1.0):
+        """Add metric which turns a tuple of counters into rates per second"""
+        Sampler.__add(RateMetric(name, func, interval, alpha=alpha))
+
+    @staticmethod
+    def __add(metric):
+        """Add metric object"""
+        metrics = Sampler.__metrics if Sampler.__pending is None else Sampler.__pending
+        if metric.name in metrics:
+            existing = metrics[metric.name]
+            existing.interval = min(existing.interval, metric.interval)
+            return
+        metrics[metric.name] = metric
+        Sampler.__changed.set()
+
+    @staticmethod
+    def begin():
+        """Collect metrics added from now on in a new set, see commit()"""
+        Sampler.__pending = {}
+
+    @staticmethod
+    def commit():
+        """Replace all metrics by the ones added since begin()
+
+        Metrics which are still used keep their state and get the new
+        interval. Values of dropped metrics leave the snapshot.
+        """
+        metrics = {}
+        for name, metric in Sampler.__pending.items():
+            existing = Sampler.__metrics.get(name)
+            if existing is not None and type(existing) is type(metric):
+                existing.interval = metric.interval
+                existing.next_time = min(existing.next_time, monotonic() + metric.interval)
+                metric = existing
+            metrics[name] = metric
+        Sampler.__pending = None
+        removed = set(Sampler.__metrics) - set(metrics)
+        Sampler.__metrics = metrics
+        if removed:
+            snapshot = Sampler.__snapshot
+            Sampler.__snapshot = Snapshot(
+                {k: v for k, v in snapshot.values().items() if k not in removed},
+                {k: v for k, v in snapshot.times().items() if k not in removed})
+        Sampler.__changed.set()
+
+    @staticmethod
+    def add_probe(name, probe, interval):
+        """Add metric which is sampled by a Probe"""
+        Sampler.__add(ProbeMetric(name, probe, interval))
+
+    @staticmethod
+    def set_budget(t):
+        """Set seconds one sampling round waits for all probes"""
+        try:
+            Sampler.__budget = abs(float(t))
+            return True
+        except ValueError:
+            return False
+
+    @staticmethod
+    def total():
+        """Return number of metrics"""
+        return len(Sampler.__metrics)
+
+    @staticmethod
+    def snapshot():
+        """Get latest snapshot"""
+        return Sampler.__snapshot
+
+    @staticmethod
+    def add_history(name, metric, size, func=float):
+        """Add ring buffer which gets func(value) of every new value of a metric"""
+        if name not in Sampler.__histories:
+            Sampler.__histories[name] = History(size)
+            Sampler.__feeds.setdefault(metric, []).append((Sampler.__histories[name], func))
+        return Sampler.__histories[name]
+
+    @staticmethod
+    def history(name):
+        """Get ring buffer, None if it does not exist"""
+        return Sampler.__histories.get(name)
+
+    @staticmethod
+    def stats():
+        """Get sampling cost of all metrics"""
+        return {name: m.stats() for name, m in Sampler.__metrics.items()}
+
+    @staticmethod
+    async def sample_due_async(now=None):
+        """Sample all metrics which are due and publish a new snapshot, waits for probes on the running loop"""
+        if now is None:
+            now = monotonic()
+        due = Sampler.__start_due(now)
+        deadline = now + Sampler.__budget
+        await asyncio.gather(*(m.wait_async(deadline) for m in due))
+        # Probes are done or out of budget, nothing blocks any more
+        Sampler.__publish(due, monotonic())
+
+    @staticmethod
+    def __start_due(now):
+        """Start all metrics which are due and get them"""
+        due = [m for m in Sampler.__metrics.values() if m.next_time <= now]
+        for metric in due:
+            metric.next_time = now + metric.interval
+            metric.start()
+        return due
+
+    @staticmethod
+    def __publish(due, deadline):
+        """Sample started metrics and publish a new snapshot"""
+        values = dict(Sampler.__snapshot.values())
+        times = dict(Sampler.__snapshot.times())
+        changed = False
+        for metric in due:
+            try:
+                value = metric.sample(deadline)
+                if value is PENDING:
+                    continue
+                values[metric.name] = value
+                times[metric.name] = monotonic()
+                changed = True
+                for history, func in Sampler.__feeds.get(metric.name, ()):
+                    history.append(func(value))
+            except Exception as e:
+                metric.errors += 1
+                if not metric.error_printed:
+                    logging.exception(e)
+                    metric.error_printed = True
+        if changed:
+            Sampler.__snapshot = Snapshot(values, times)
+
+    @staticmethod
+    def next_time():
+        """Get monotonic time the next metric is due"""
+        if not Sampler.__metrics:
+            return None
+        return min(m.next_time for m in Sampler.__metrics.values())
+
+    @staticmethod
+    async def run_async():
+        """Sample metrics on the running loop until the task is cancelled"""
+        while True:
+            Sampler.__changed.clear()
+            await Sampler.sample_due_async()
+            next_time = Sampler.next_time()
+            timeout = None if next_time is None else max(next_time - monotonic(), 0)
+            # A config reload may add metrics, also if there are none yet
+            await Sampler.__changed.wait_async(timeout)
@@ -0,0 +1,107 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import glob
+import os
+
+# Additional pip modules
+
+# Additional project modules
+from modules.sysfs import SysfsFile
+
+
+THERMAL_PATH = '/sys/class/thermal'
+HWMON_PATH = '/sys/class/hwmon'
+CPUFREQ_PATH = '/sys/devices/system/cpu'
+# Sensors tried in this order when no sensor name is configured
+DEFAULT_SENSORS = ['cpu_thermal', 'soc_thermal', 'coretemp', 'k10temp', 'cpu']
+
+
+class Sensor:
+    """Class Sensor - Scaled integer value of an open sysfs file"""
+
+    def __init__(self, name, path, scale):
+        self.name = name
+        self.__file = SysfsFile(path)
+        self.__scale = scale
+
+    def get_path(self):
+        """Get path"""
+        return self.__file.get_path()
+
+    def read(self):
+        """Read scaled value"""
+        return self.__file.read_int() / self.__scale
+
+
+class Sensors:
+    """Class Sensors
+
+    Resolves sensor names to sysfs files once. Names are matched
+    against thermal zone types and hwmon names, '-' and '_' are treated
+    the same ('cpu-thermal' is found as 'cpu_thermal').
+    """
+
+    __temperatures = {}
+    __cpu_freq = None
+
+    @staticmethod
+    def normalize(name):
+        """Normalize sensor name"""
+        return str(name).strip().lower().replace('-', '_')
+
+    @staticmethod
+    def read_name(path):
+        """Read name file, empty string if missing"""
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                return Sensors.normalize(file.read())
+        except OSError:
+            return ''
+
+    @staticmethod
+    def available():
+        """Get {name: path} of all temperature inputs"""
+        result = {}
+        for zone in sorted(glob.glob(THERMAL_PATH + '/thermal_zone*')):
+            name = Sensors.read_name(zone + '/type')
+            if name and os.path.exists(zone + '/temp'):
+                result.setdefault(name, zone + '/temp')
+        for hwmon in sorted(glob.glob(HWMON_PATH + '/hwmon*')):
+            name = Sensors.read_name(hwmon + '/name')
+            inputs = sorted(glob.glob(hwmon + '/temp*_input'))
+            if name and inputs:
+                result.setdefault(name, inputs[0])
+        return result
+
+    @staticmethod
+    def temperature(name=None):
+        """Get temperature sensor in °C, None if it does not exist"""
+        key = None if name is None else Sensors.normalize(name)
+        if key not in Sensors.__temperatures:
+            available = Sensors.available()
+            names = DEFAULT_SENSORS if key is None else [key]
+            sensor = None
+            for n in names:
+                if n in available:
+                    sensor = Sensor(n, available[n], 1000)
+                    break
+            if sensor is None and key is None and available:
+                n = next(iter(available))
+                sensor = Sensor(n, available[n], 1000)
+            Sensors.__temperatures[key] = sensor
+        return Sensors.__temperatures[key]
+
+    @staticmethod
+    def cpu_freq():
+        """Get current frequency of the first CPU in MHz, None if it does not exist"""
+        if Sensors.__cpu_freq is None:
+            path = CPUFREQ_PATH + '/cpu0/cpufreq/scaling_cur_freq'
+            if not os.path.exists(path):
+                return None
+            Sensors.__cpu_freq = Sensor('cpu0', path, 1000)
+        return Sensors.__cpu_freq
@@ -0,0 +1,50 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import os
+
+# Additional pip modules
+
+# Additional project modules
+
+
+class SysfsFile:
+    """Class SysfsFile
+
+    Keeps a sysfs or procfs attribute open and re-reads it with pread,
+    so every read is a single syscall. The file is opened again after
+    an error, e.g. when a network interface has been re-created.
+    """
+
+    def __init__(self, path, size=64):
+        self.__path = path
+        self.__size = size
+        self.__fd = None
+
+    def get_path(self):
+        """Get path"""
+        return self.__path
+
+    def read(self):
+        """Read whole file as string"""
+        if self.__fd is None:
+            self.__fd = os.open(self.__path, os.O_RDONLY)
+        try:
+            return os.pread(self.__fd, self.__size, 0).decode('utf-8')
+        except OSError:
+            self.close()
+            raise
+
+    def read_int(self):
+        """Read file as integer"""
+        return int(self.read())
+
+    def close(self):
+        """Close file"""
+        if self.__fd is not None:
+            os.close(self.__fd)
+            self.__fd = None
@@ -0,0 +1,82 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+
+# Additional pip modules
+from luma.core.render import canvas
+from PIL import Image, ImageDraw
+
+# Additional project modules
+
+
+class Template:
+    """Class Template
+
+    Static layer of a page (labels and bitmaps) composited once into an
+    image, plus the positions of the value fields. render() copies the
+    static layer and only draws the field values. Nothing is drawn if
+    no value changed and the display still shows the last frame.
+    """
+
+    def __init__(self, size, text):
+        self.__image = Image.new('1', size)
+        self.__draw = ImageDraw.Draw(self.__image)
+        self.__text = text
+        self.__fields = {}
+        self.__values = None
+        self.__frame_id = None
+
+    @staticmethod
+    def cached(cache, device, key, build):
+        """Get template of a display from cache, build() creates a missing one
+
+        Templates are kept per display, because a template skips drawing
+        the values it drew last, which is only right for the display that
+        shows them.
+        """
+        key = (device, device.size, key)
+        if key not in cache:
+            cache[key] = build()
+        return cache[key]
+
+    def add_text(self, xy, text, anchor='la'):
+        """Add static text"""
+        self.__text.text(self.__draw, xy, text, fill=255, anchor=anchor)
+        return self
+
+    def add_bitmap(self, xy, bitmap):
+        """Add static bitmap"""
+        self.__draw.bitmap(xy, bitmap, fill=1)
+        return self
+
+    def add_field(self, name, xy, anchor='la'):
+        """Add value field, its value is a string or a 1-bit image"""
+        self.__fields[name] = (xy, anchor)
+        return self
+
+    def get_image(self):
+        """Get static layer"""
+        return self.__image
+
+    def changed(self, device, values):
+        """Check if values or the shown frame changed since the last render"""
+        return values != self.__values or device.get_frame_id() != self.__frame_id
+
+    def render(self, device, values):
+        """Draw field values on a copy of the static layer"""
+        if not self.changed(device, values):
+            return False
+        with canvas(device, background=self.__image) as draw:
+            for name, value in values.items():
+                xy, anchor = self.__fields[name]
+                if isinstance(value, Image.Image):
+                    draw.bitmap(xy, value, fill=255)
+                else:
+                    self.__text.text(draw, xy, value, fill=255, anchor=anchor)
+        self.__values = dict(values)
+        self.__frame_id = device.get_frame_id()
+        return True
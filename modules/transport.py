@@ -0,0 +1,230 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import asyncio
+import logging
+import random
+import threading
+from time import perf_counter, sleep
+
+# Additional pip modules
+import luma.core.error
+
+# Additional project modules
+
+
+RETRIES = 3          # Retries of a failed transaction
+BACKOFF = 0.01       # Seconds before the first retry, doubled for every retry
+MAX_BACKOFF = 0.5    # Maximum seconds between two retries
+REINIT_AFTER = 3     # Failed transactions in a row until the device is initialised again
+# luma raises DeviceNotFoundError instead of OSError if an I2C command is not acknowledged
+BUS_ERRORS = (OSError, luma.core.error.Error)
+
+
+class TransferError(OSError):
+    """Transfer failed on the runtime loop, retry it after retry_after seconds"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Transport:
+    """Class Transport
+
+    Wraps a luma serial interface (i2c, spi ...). Counts bytes,
+    transactions and errors and measures the time spent on the bus.
+    A failed transaction is retried with exponential backoff. After
+    reinit_after failed transactions in a row on_reinit is called,
+    which is expected to initialise the device again.
+
+    On the runtime loop a failed transaction is not retried in place,
+    sleeping would stall every task. TransferError tells the caller how
+    long to wait before the frame is sent again.
+
+    Transports of displays on the same bus share one reentrant lock,
+    which is held from begin_frame() to end_frame(), so frames of two
+    displays are never interleaved on the bus.
+    """
+
+    def __init__(self, serial, *, retries=RETRIES, backoff=BACKOFF,
+                 max_backoff=MAX_BACKOFF, reinit_after=REINIT_AFTER, on_reinit=None,
+                 lock=None):
+        self.__serial = serial
+        self.__retries = retries
+        self.__backoff = backoff
+        self.__max_backoff = max_backoff
+        self.__reinit_after = reinit_after
+        self.__on_reinit = on_reinit
+        self.__reiniting = False
+        self.__failures = 0
+        self.__attempts = 0
+        self.__frame_latency = 0.0
+        self.__lock = threading.Lock()
+        self.__bus_lock = threading.RLock() if lock is None else lock
+        self.bytes = 0
+        self.transactions = 0
+        self.errors = 0
+        self.retries = 0
+        self.failures = 0
+        self.reinits = 0
+        self.frames = 0
+        self.latency = 0.0
+        self.last_frame_latency = 0.0
+        self.max_frame_latency = 0.0
+
+    def get_serial(self):
+        """Get wrapped serial interface"""
+        return self.__serial
+
+    def set_on_reinit(self, func):
+        """Set function which initialises the device again"""
+        self.__on_reinit = func
+
+    def command(self, *cmd):
+        """Send command bytes"""
+        self.__transfer(self.__serial.command, cmd, len(cmd))
+
+    def data(self, data):
+        """Send data bytes"""
+        self.__transfer(self.__serial.data, (data,), len(data))
+
+    def cleanup(self):
+        """Clean up wrapped serial interface"""
+        self.__serial.cleanup()
+
+    def begin_frame(self):
+        """Reserve the bus for the current frame"""
+        self.__bus_lock.acquire()
+
+    def end_frame(self):
+        """Finish latency measurement of the current frame and release the bus"""
+        with self.__lock:
+            self.frames += 1
+            self.last_frame_latency = self.__frame_latency
+            self.max_frame_latency = max(self.max_frame_latency, self.__frame_latency)
+            self.__frame_latency = 0.0
+        self.__bus_lock.release()
+
+    def stats(self):
+        """Get counters"""
+        with self.__lock:
+            return {
+                'bytes': self.bytes,
+                'transactions': self.transactions,
+                'errors': self.errors,
+                'retries': self.retries,
+                'failures': self.failures,
+                'reinits': self.reinits,
+                'frames': self.frames,
+                'latency': self.latency,
+                'last_frame_latency': self.last_frame_latency,
+                'max_frame_latency': self.max_frame_latency
+            }
+
+    def __transfer(self, func, args, size):
+        """Call serial function on the reserved bus"""
+        with self.__bus_lock:
+            self.__retry(func, args, size)
+
+    def __retry(self, func, args, size):
+        """Call serial function, retry it with backoff on bus errors"""
+        while True:
+            start = perf_counter()
+            try:
+                func(*args)
+            except BUS_ERRORS as e:
+                self.__count(perf_counter() - start, 0, error=True)
+                error = e
+            else:
+                self.__count(perf_counter() - start, size)
+                self.__attempts = 0
+                self.__failures = 0
+                return
+            if self.__attempts >= self.__retries:
+                break
+            backoff = min(self.__backoff * 2 ** self.__attempts, self.__max_backoff)
+            self.__attempts += 1
+            self.retries += 1
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                sleep(backoff)
+                continue
+            raise TransferError(f'Display transfer failed, retry in {backoff} s: {error}', backoff) from error
+        self.__attempts = 0
+        self.failures += 1
+        self.__failures += 1
+        if self.__failures >= self.__reinit_after:
+            self.__failures = 0
+            self.__reinit()
+        raise OSError(f'Display transfer failed after {self.__retries} retries: {error}') from error
+
+    def __count(self, latency, size, error=False):
+        """Update counters of one attempt"""
+        with self.__lock:
+            self.latency += latency
+            self.__frame_latency += latency
+            self.transactions += 1
+            self.bytes += size
+            if error:
+                self.errors += 1
+
+    def __reinit(self):
+        """Initialise device again, not recursively if that fails as well"""
+        if self.__on_reinit is None or self.__reiniting:
+            return
+        self.__reiniting = True
+        self.reinits += 1
+        logging.warning('Display does not respond, initialising it again')
+        try:
+            self.__on_reinit()
+        except Exception as e:
+            logging.error(e)
+        finally:
+            self.__reiniting = False
+
+
+class FaultySerial:
+    """Class FaultySerial
+
+    Serial interface without hardware which fails transactions on
+    purpose, every transaction with fail_rate or the next fail_next
+    ones. error creates the raised exception, an I2C NAK by default.
+    Sent bytes are counted.
+    """
+
+    def __init__(self, fail_rate=0.0, seed=0, *, error=None):
+        self.fail_rate = fail_rate
+        self.fail_next = 0
+        self.error = error or (lambda: OSError(121, 'Remote I/O error'))
+        self.bytes = 0
+        self.transactions = 0
+        self.__random = random.Random(seed)
+
+    def __fail(self):
+        """Raise error if this transaction has to fail"""
+        if self.fail_next > 0:
+            self.fail_next -= 1
+            raise self.error()
+        if self.fail_rate and self.__random.random() < self.fail_rate:
+            raise self.error()
+
+    def command(self, *cmd):
+        """Count command bytes or fail"""
+        self.__fail()
+        self.bytes += len(cmd)
+        self.transactions += 1
+
+    def data(self, data):
+        """Count data bytes or fail"""
+        self.__fail()
+        self.bytes += len(data)
+        self.transactions += 1
+
+    def cleanup(self):
+        """Nothing to clean up"""
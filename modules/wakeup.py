@@ -0,0 +1,61 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import asyncio
+import threading
+
+# Additional pip modules
+
+# Additional project modules
+
+
+class Wakeup:
+    """Class Wakeup
+
+    Event which wakes up a task on an asyncio loop with wait_async().
+    set() may be called from any thread, e.g. from a GPIO edge callback.
+    """
+
+    def __init__(self):
+        self.__event = threading.Event()
+        self.__loop = None
+        self.__async_event = None
+
+    def set(self):
+        """Set event and wake up all waiters"""
+        self.__event.set()
+        loop = self.__loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self.__async_event.set)
+            except RuntimeError:
+                # Loop is closed
+                self.__loop = None
+
+    def clear(self):
+        """Clear event"""
+        self.__event.clear()
+        if self.__async_event is not None:
+            self.__async_event.clear()
+
+    def is_set(self):
+        """Check if event is set"""
+        return self.__event.is_set()
+
+    async def wait_async(self, timeout=None):
+        """Wait on the running loop until event is set or timeout"""
+        loop = asyncio.get_running_loop()
+        if self.__loop is not loop:
+            self.__async_event = asyncio.Event()
+            self.__loop = loop
+            if self.__event.is_set():
+                self.__async_event.set()
+        try:
+            await asyncio.wait_for(self.__async_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
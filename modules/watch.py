@@ -0,0 +1,74 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import ctypes
+import errno
+import os
+import struct
+
+# Additional pip modules
+
+# Additional project modules
+
+
+# inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+EVENT = struct.Struct('iIII')  # wd, mask, cookie, len, followed by the name
+
+
+class FileWatch:
+    """Class FileWatch
+
+    inotify watch of one file. The directory is watched, so a file
+    which an editor replaces (write a copy, rename it) is still seen.
+    fileno() becomes readable on changes, changed() reads the events.
+    """
+
+    def __init__(self, path):
+        self.__directory, name = os.path.split(os.path.abspath(path))
+        self.__name = os.fsencode(name)
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            init = libc.inotify_init1
+            add_watch = libc.inotify_add_watch
+        except (OSError, AttributeError) as e:
+            raise OSError(errno.ENOSYS, f'inotify is not available: {e}') from e
+        self.__fd = init(IN_NONBLOCK | IN_CLOEXEC)
+        if self.__fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        if add_watch(self.__fd, os.fsencode(self.__directory),
+                     IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE) < 0:
+            e = ctypes.get_errno()
+            os.close(self.__fd)
+            raise OSError(e, f'inotify_add_watch failed on {self.__directory}')
+
+    def fileno(self):
+        """Get file descriptor of the inotify instance"""
+        return self.__fd
+
+    def changed(self):
+        """Read all pending events, True if one was about the file"""
+        changed = False
+        while True:
+            try:
+                data = os.read(self.__fd, 4096)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset + EVENT.size <= len(data):
+                _, _, _, size = EVENT.unpack_from(data, offset)
+                name = data[offset + EVENT.size:offset + EVENT.size + size].rstrip(b'\0')
+                changed = changed or name == self.__name
+                offset += EVENT.size + size
+
+    def close(self):
+        """Close inotify instance"""
+        os.close(self.__fd)
@@ -0,0 +1,25 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import os
+import sys
+
+# Additional pip modules
+import pytest
+
+# Additional project modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from modules.clock import Clock, VirtualClock
+
+
+@pytest.fixture
+def clock():
+    """App clock which only moves when it is advanced"""
+    virtual = VirtualClock(1000.0)
+    Clock.set(virtual.time)
+    yield virtual
+    Clock.set(None)
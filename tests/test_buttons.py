@@ -0,0 +1,116 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import asyncio
+import threading
+
+# Additional pip modules
+import pytest
+
+# Additional project modules
+from modules import gpio
+from modules.buttons import Buttons
+from modules.clock import VirtualEventLoop
+
+
+PIN = 22
+
+
+@pytest.fixture
+def fake():
+    """Fake GPIO backend of the buttons"""
+    backend = gpio.create('fake')
+    Buttons.set_backend(backend)
+    yield backend
+    Buttons.set_backend(None)
+
+
+def press(fake, clock, button, seconds):
+    """Hold pin down for seconds, check the button like the runtime does"""
+    fake.set_input(PIN, 0)
+    button.check()
+    clock.advance(seconds)
+    button.check()
+    fake.set_input(PIN, 1)
+    button.check()
+
+
+def test_create_backend():
+    assert isinstance(gpio.create('fake'), gpio.FakeGpio)
+    assert gpio.create('unknown') is None
+
+
+def test_fake_gpio_idle_level(fake):
+    fake.setup(PIN, fake.PUD_UP)
+    fake.setup(PIN + 1, fake.PUD_DOWN)
+    assert fake.input(PIN) == 1
+    assert fake.input(PIN + 1) == 0
+
+
+def test_fake_gpio_wakes_up_on_edge_of_another_thread(fake):
+    fake.setup(PIN, fake.PUD_UP)
+    timer = threading.Timer(0.05, fake.set_input, (PIN, 0))
+
+    async def wait():
+        timer.start()
+        await fake.wait_async(5)
+    asyncio.run(asyncio.wait_for(wait(), 1))
+    timer.join()
+    assert fake.input(PIN) == 0
+
+
+def test_wait_async_wakes_up_on_edge(fake):
+    Buttons.NewPressed(PIN, Buttons.pull_up(), {'pressed': None})
+    loop = VirtualEventLoop()
+    start = loop.time()
+    loop.call_later(30, fake.set_input, PIN, 0)
+    try:
+        loop.run_until_complete(Buttons.wait_async())
+    finally:
+        loop.close()
+    # Slept until the edge instead of polling
+    assert loop.time() - start == pytest.approx(30)
+
+
+def test_pressed_after_debounce(fake, clock):
+    calls = []
+    button = Buttons.NewPressed(PIN, Buttons.pull_up(), {'pressed': lambda: calls.append('pressed')})
+    press(fake, clock, button, 0.2)
+    assert calls == ['pressed']
+
+
+def test_bounce_is_ignored(fake, clock):
+    calls = []
+    button = Buttons.NewPressed(PIN, Buttons.pull_up(), {'pressed': lambda: calls.append('pressed')})
+    press(fake, clock, button, 0.01)
+    assert calls == []
+
+
+def test_held_instead_of_pressed(fake, clock):
+    calls = []
+    func = {'pressed': lambda: calls.append('pressed'), 'held': lambda: calls.append('held')}
+    button = Buttons.NewHeld(PIN, Buttons.pull_up(), func, hold_time=2)
+    press(fake, clock, button, 0.5)
+    press(fake, clock, button, 3)
+    assert calls == ['pressed', 'held']
+
+
+def test_advanced_for_pressed_while_down(fake, clock):
+    calls = []
+    func = {'for_pressed': lambda: calls.append('for_pressed'),
+            'released': lambda: calls.append('released'),
+            'pressed': lambda: calls.append('pressed')}
+    button = Buttons.NewPressedAdvanced(PIN, Buttons.pull_up(), func)
+    fake.set_input(PIN, 0)
+    button.check()
+    clock.advance(0.1)
+    button.check()
+    assert button.is_down()
+    fake.set_input(PIN, 1)
+    button.check()
+    assert calls == ['for_pressed', 'released', 'pressed']
+    assert not button.is_down()
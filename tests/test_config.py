@@ -0,0 +1,108 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import asyncio
+import logging
+
+# Additional pip modules
+import pytest
+
+# Additional project modules
+from modules.config import Config, ConfigError
+from modules.pages import Pages
+from modules.sampler import Sampler
+from modules.sensors import Sensors
+from modules.watch import FileWatch
+
+
+CONFIG = {
+    'main': {'showicons': 'yes', 'mode': 'auto', 'autodelay': '10'},
+    'display': {'interface': 'dummy'},
+    'pages': [{'type': 'cpumem', 'sensor': 'no_such_sensor'}, {'type': 'tempgraph'}]
+}
+
+
+def test_compile_has_no_side_effects(monkeypatch, caplog):
+    def temperature(name=None):
+        raise AssertionError('Hardware is probed')
+    monkeypatch.setattr(Sensors, 'temperature', temperature)
+    metrics = Sampler.total()
+    pages = Pages.get_screen().func_ptr
+    with caplog.at_level(logging.DEBUG):
+        plan = Config.compile(CONFIG)
+    assert caplog.records == []
+    assert Sampler.total() == metrics
+    assert Pages.get_screen().func_ptr is pages
+    assert plan.screens[0].pages[0].args['sensor'] == 'no_such_sensor'
+
+
+def test_sensor_has_to_be_a_name():
+    config = dict(CONFIG, pages=[{'type': 'cpumem', 'sensor': 5}])
+    with pytest.raises(ConfigError):
+        Config.compile(config)
+
+
+def test_plan_is_immutable():
+    plan = Config.compile(CONFIG)
+    with pytest.raises(AttributeError):
+        plan.screens[0].mode = 'manual'
+    with pytest.raises(TypeError):
+        plan.screens[0].pages[0].args['sensor'] = 'cpu_thermal'
+
+
+@pytest.mark.parametrize('key, value', [
+    ('main', 'yes'), ('display', ['dummy']), ('logging', 5), ('metrics', 'port')
+])
+def test_paragraph_has_to_be_a_dict(key, value):
+    with pytest.raises(ConfigError):
+        Config.compile(dict(CONFIG, **{key: value}))
+
+
+def test_display_value_has_to_be_a_number():
+    config = dict(CONFIG, display={'interface': 'dummy', 'width': None})
+    with pytest.raises(ConfigError):
+        Config.compile(config)
+
+
+def test_reload_survives_any_error(tmp_path, monkeypatch):
+    path = tmp_path / 'config.yml'
+    path.write_text('main: {showicons: no}\n')
+    monkeypatch.setattr(Config, '_Config__path', str(path))
+    monkeypatch.setattr(Config, '_Config__digest', None)
+
+    def compile(config):
+        raise RuntimeError('Unexpected')
+    monkeypatch.setattr(Config, 'compile', compile)
+    assert not Config.reload()
+
+
+def test_watch_does_not_spin_while_it_waits(tmp_path, monkeypatch):
+    path = tmp_path / 'config.yml'
+    path.write_text('main: {}\n')
+    try:
+        FileWatch(str(path)).close()
+    except OSError:
+        pytest.skip('No inotify')
+    monkeypatch.setattr(Config, '_Config__path', str(path))
+    monkeypatch.setattr(Config, '_Config__digest', None)
+    calls = []
+
+    async def watch():
+        loop = asyncio.get_running_loop()
+        add_reader = loop.add_reader
+        loop.add_reader = lambda fd, func: add_reader(fd, lambda: calls.append(fd) or func())
+        task = loop.create_task(Config.watch())
+        await asyncio.sleep(0.1)
+        path.write_text('main: {}\npages: []\n')
+        await asyncio.sleep(0.05)
+        # More events while the watch waits for the editor to finish
+        path.write_text('main: {}\npages: []\n')
+        await asyncio.sleep(0.5)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    asyncio.run(watch())
+    assert 0 < len(calls) < 5
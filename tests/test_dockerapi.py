@@ -0,0 +1,169 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+from http.server import BaseHTTPRequestHandler
+import json
+import socketserver
+import threading
+
+# Additional pip modules
+import pytest
+
+# Additional project modules
+from modules.dockerapi import DockerClient, DockerError
+
+
+CONTAINERS = [
+    {'Id': 'web', 'State': 'running'},
+    {'Id': 'db', 'State': 'running'},
+    {'Id': 'old', 'State': 'exited'}
+]
+
+
+def stats(total, system, precpu=(0, 0)):
+    """Stats of one container like the Engine API sends them"""
+    return {
+        'cpu_stats': {'cpu_usage': {'total_usage': total}, 'system_cpu_usage': system, 'online_cpus': 4},
+        'precpu_stats': {'cpu_usage': {'total_usage': precpu[0]}, 'system_cpu_usage': precpu[1]},
+        'memory_stats': {'usage': 300, 'limit': 1000, 'stats': {'inactive_file': 100}},
+        'pids_stats': {'current': 3}
+    }
+
+
+class FakeDocker(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Class FakeDocker - Engine API on a unix socket, counts connections and requests"""
+
+    daemon_threads = True
+
+    def __init__(self, path):
+        self.connections = 0
+        self.requests = []
+        self.routes = {
+            '/_ping': (200, 'OK'),
+            '/containers/json?all=true': (200, CONTAINERS),
+            '/containers/web/stats?stream=false&one-shot=true': (200, stats(200, 2000, (100, 1000))),
+            '/containers/db/stats?stream=false&one-shot=true': (200, stats(50, 2000))
+        }
+        super().__init__(path, Handler)
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Class Handler - Answers with the routes of the server, keeps connections alive"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        status, body = self.server.routes.get(self.path, (404, {'message': 'not found'}))
+        body = (body if isinstance(body, str) else json.dumps(body)).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def docker(tmp_path):
+    """Fake daemon and a client connected to it"""
+    server = FakeDocker(str(tmp_path / 'docker.sock'))
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    client = DockerClient(str(tmp_path / 'docker.sock'), pid_file=str(tmp_path / 'docker.pid'))
+    yield server, client
+    client.close()
+    server.shutdown()
+    server.server_close()
+
+
+def test_usage_of_running_containers(docker):
+    server, client = docker
+    usage = client.usage()
+    assert usage['active']
+    assert (usage['running'], usage['total']) == (2, 3)
+    # web has precpu stats: 100 of 1000 on 4 cpus, db has none yet
+    assert usage['cpu'] == pytest.approx(40.0)
+    # Page cache is not counted
+    assert usage['mem'] == 400
+    assert usage['mem_total'] == 1000
+    assert usage['pids'] == 6
+
+
+def test_cpu_percent_since_last_stats(docker):
+    server, client = docker
+    client.usage()
+    server.routes['/containers/db/stats?stream=false&one-shot=true'] = (200, stats(150, 3000))
+    server.routes['/containers/web/stats?stream=false&one-shot=true'] = (200, stats(200, 3000))
+    usage = client.usage()
+    # db: 100 of 1000 on 4 cpus, web did not use any cpu
+    assert usage['cpu'] == pytest.approx(40.0)
+
+
+def test_one_keep_alive_connection(docker):
+    server, client = docker
+    for _ in range(3):
+        client.usage()
+    assert len(server.requests) == 9
+    assert server.connections == 1
+
+
+def test_reconnect_after_the_daemon_closed_the_connection(docker):
+    server, client = docker
+    assert client.ping()
+    client.close()
+    assert client.ping()
+    assert server.connections == 2
+
+
+def test_error_status_raises(docker):
+    server, client = docker
+    server.routes['/containers/json?all=true'] = (500, {'message': 'daemon error'})
+    with pytest.raises(DockerError):
+        client.containers()
+
+
+def test_no_daemon(tmp_path):
+    client = DockerClient(str(tmp_path / 'missing.sock'), pid_file=str(tmp_path / 'docker.pid'))
+    with pytest.raises(OSError):
+        client.containers()
+    assert not client.is_active()
+
+
+def test_status_is_cached_for_ttl(docker, clock):
+    server, client = docker
+    assert client.is_active(ttl=30)
+    clock.advance(29)
+    assert client.is_active(ttl=30)
+    assert server.requests.count('/_ping') == 1
+    clock.advance(1)
+    assert client.is_active(ttl=30)
+    assert server.requests.count('/_ping') == 2
+
+
+def test_failed_request_invalidates_status(docker, clock):
+    server, client = docker
+    assert client.is_active()
+    server.routes['/containers/json?all=true'] = (500, {'message': 'daemon error'})
+    with pytest.raises(DockerError):
+        client.containers()
+    server.routes['/_ping'] = (500, 'down')
+    assert not client.is_active()
+
+
+def test_status_from_pid_file(docker, clock, tmp_path):
+    server, client = docker
+    # Pid of a process which is not dockerd
+    (tmp_path / 'docker.pid').write_text('1\n')
+    assert not client.is_active()
+    assert '/_ping' not in server.requests
@@ -0,0 +1,79 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import os
+import random
+
+# Additional pip modules
+from PIL import Image, ImageDraw, ImageFont
+import pytest
+
+# Additional project modules
+from modules.glyphs import GlyphAtlas, PRELOAD_CHARS
+
+
+FONT_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__))) + '/modules/font'
+FONTS = sorted(f for f in os.listdir(FONT_DIR) if f.endswith('.ttf'))
+SIZE = 16
+CHARS = PRELOAD_CHARS + 'CMHzKBG°'
+PAGE_LINES = ['CPU 12%', '1500 MHz', 'LOAD', '12% 9.5% 8.1%', 'TEMP', '47.2 °C',
+              'MEM', '412 MB / 1 GB', '↑ 1.2 MB/s', 'Mount: /mnt/usb']
+
+
+def render(font, atlas, xy, text, anchor):
+    """Get (ImageDraw.text image, atlas image) of text"""
+    expected = Image.new('1', (128, 64))
+    ImageDraw.Draw(expected).text(xy, text, font=font, fill=255, anchor=anchor)
+    image = Image.new('1', (128, 64))
+    atlas.text(ImageDraw.Draw(image), xy, text, fill=255, anchor=anchor)
+    return expected, image
+
+
+@pytest.fixture(params=FONTS)
+def fonts(request):
+    """(font, atlas) of a shipped font"""
+    path = os.path.join(FONT_DIR, request.param)
+    return ImageFont.truetype(path, SIZE), GlyphAtlas(path, SIZE)
+
+
+@pytest.mark.parametrize('anchor', ['la', 'ra'])
+def test_page_lines_are_pixel_identical(fonts, anchor):
+    font, atlas = fonts
+    for text in PAGE_LINES:
+        xy = (127, 16) if anchor == 'ra' else (-1, 16)
+        expected, image = render(font, atlas, xy, text, anchor)
+        assert image.tobytes() == expected.tobytes(), text
+
+
+def test_random_text_is_pixel_identical(fonts):
+    font, atlas = fonts
+    atlas.preload()
+    rng = random.Random(0)
+    for _ in range(2000):
+        text = ''.join(rng.choice(CHARS) for _ in range(rng.randint(1, 16)))
+        anchor = rng.choice(['la', 'ra'])
+        xy = (rng.randint(-1, 127), rng.randint(0, 48))
+        expected, image = render(font, atlas, xy, text, anchor)
+        assert image.tobytes() == expected.tobytes(), (text, anchor, xy)
+
+
+def test_textlength(fonts):
+    font, atlas = fonts
+    for text in PAGE_LINES:
+        assert atlas.textlength(text) == font.getlength(text)
+
+
+def test_other_anchor_falls_back(fonts):
+    font, atlas = fonts
+    expected, image = render(font, atlas, (64, 32), '47.2 °C', 'mm')
+    assert image.tobytes() == expected.tobytes()
+
+
+def test_cache_is_bounded():
+    atlas = GlyphAtlas(os.path.join(FONT_DIR, FONTS[0]), SIZE, max_glyphs=10)
+    atlas.preload()
+    assert atlas.total() == 10
@@ -0,0 +1,53 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+
+# Additional pip modules
+from luma.core.device import dummy
+import pytest
+
+# Additional project modules
+from modules.display import Display
+from modules import pages
+from modules.pages import CpuGraph, CpuMem, Docker, NetGraph, Network, Pages, Screen, Storage, TempGraph
+
+
+VALUES = {'cpu': 'CPU 12%', 'freq': '1500 MHz', 'load': '1.0% 1.0% 1.0%',
+          'temp': '47.2 °C', 'mem': '412 MB / 1 GB'}
+
+
+@pytest.fixture
+def screens():
+    """Two displays of the same size"""
+    selected = Pages.get_screen()
+    yield [Screen(name, Display(dummy(width=128, height=64, mode='1'))) for name in ('a', 'b')]
+    Pages.select(selected)
+
+
+@pytest.mark.parametrize('template', [
+    CpuMem.template, Docker.template, CpuGraph.template, TempGraph.template,
+    lambda: Storage.template('/'), lambda: Network.template('eth0'), lambda: NetGraph.template('eth0')
+])
+def test_template_per_display(screens, template):
+    templates = []
+    for screen in screens:
+        Pages.select(screen)
+        templates.append(template())
+    assert templates[0] is not templates[1]
+    Pages.select(screens[0])
+    assert template() is templates[0]
+
+
+def test_same_values_are_drawn_on_both_displays(screens):
+    for screen in screens:
+        Pages.select(screen)
+        assert CpuMem.template().render(pages.device, VALUES)
+    for screen in screens:
+        assert screen.device.get_frames_sent() == 1
+        # Nothing changed on this display
+        Pages.select(screen)
+        assert not CpuMem.template().render(pages.device, VALUES)
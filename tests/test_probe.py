@@ -0,0 +1,53 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import threading
+
+# Additional pip modules
+import pytest
+
+# Additional project modules
+from modules.probe import PROBE_WORKERS, Probe
+
+
+@pytest.fixture
+def hung():
+    """Event a hung probe waits for, released after the test"""
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def test_hung_mounts_do_not_starve_other_probes(hung):
+    mounts = [Probe(f'disk_usage:/mnt/{i}', hung.wait, 0.05, own_worker=True)
+              for i in range(PROBE_WORKERS + 1)]
+    for probe in mounts:
+        probe.start()
+    for probe in mounts:
+        assert probe.collect() == (None, None)
+        assert probe.busy()
+    hostname = Probe('hostname', lambda: 'raspberrypi', 1)
+    value, _ = hostname.collect()
+    assert value == 'raspberrypi'
+
+
+def test_hung_probe_keeps_its_last_value(hung):
+    calls = []
+
+    def statvfs():
+        calls.append(1)
+        if len(calls) > 1:
+            hung.wait()
+        return len(calls)
+
+    probe = Probe('disk_usage:/', statvfs, 0.05, own_worker=True)
+    assert probe.collect()[0] == 1
+    assert probe.collect()[0] == 1
+    assert probe.stats()['timeouts'] == 1
+    # Only one call is in flight
+    assert probe.collect()[0] == 1
+    assert len(calls) == 2
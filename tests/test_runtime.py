@@ -0,0 +1,124 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import logging
+from time import perf_counter
+
+# Additional pip modules
+import pytest
+import yaml
+
+# Additional project modules
+from modules.buttons import Buttons
+from modules.clock import VirtualEventLoop, monotonic
+from modules.config import Config
+from modules.pages import Pages
+from modules.runtime import Runtime
+from modules.sampler import Sampler
+
+
+PIN = 22
+CONFIG = {
+    'main': {'showicons': 'no', 'mode': 'manual', 'screensaver': '0', 'gpiobackend': 'fake'},
+    'display': {'interface': 'dummy'},
+    'pages': [{'type': 'cpumem'}, {'type': 'storage', 'icon': 'sd', 'value': '/'}],
+    'buttons': [{'type': 'pressed', 'gpio': str(PIN), 'func': 'next'}]
+}
+
+
+@pytest.fixture(scope='module')
+def screen():
+    """Manual mode display without hardware and a button on the fake GPIO backend"""
+    Config.apply(Config.compile(CONFIG))
+    Pages.init_device()
+    return Pages.get_screen()
+
+
+@pytest.fixture
+def loop(screen):
+    """Virtual loop, the pages start on their first page"""
+    Pages.select(screen)
+    Pages.set_mode('manual')
+    screen.current_page = 0
+    Pages.reset()
+    return VirtualEventLoop()
+
+
+def at(loop, seconds, func, *args):
+    """Call func after seconds of virtual time"""
+    loop.call_at(loop.time() + seconds, func, *args)
+
+
+def test_first_frame_has_values(screen, loop, caplog):
+    sent = screen.device.get_frames_sent()
+    with caplog.at_level(logging.ERROR):
+        Runtime.run(loop, duration=0.5)
+    assert screen.device.get_frames_sent() > sent
+    assert not [r for r in caplog.records if r.exc_info is not None]
+
+
+def test_runs_on_virtual_time(screen, loop):
+    start = loop.time()
+    renders = Pages.stats(screen)['renders']
+    real = perf_counter()
+    Runtime.run(loop, duration=600)
+    assert loop.time() - start == pytest.approx(600, abs=0.5)
+    assert perf_counter() - real < 5
+    # One render per refresh of the page, no busy loop in between
+    assert Pages.stats(screen)['renders'] - renders == pytest.approx(600 / screen.func_ptr[0]['refresh'], abs=2)
+
+
+def test_button_press_wakes_up_render(screen, loop):
+    pages = []
+    at(loop, 5, Buttons.get_backend().set_input, PIN, 0)
+    at(loop, 5.2, Buttons.get_backend().set_input, PIN, 1)
+    for t in (4.9, 5.21):
+        at(loop, t, lambda: pages.append((screen.current_page, screen.device.get_frame_id())))
+    Runtime.run(loop, duration=10)
+    # The render task draws the new page at once, not at the next refresh
+    assert pages[0][0] == 0
+    assert pages[1][0] == 1
+    assert pages[1][1] != pages[0][1]
+
+
+def test_auto_mode_flips_pages(screen, loop):
+    Pages.set_mode('auto')
+    Pages.set_auto_delay(10)
+    screen.last_auto_delay = loop.time()
+    pages = []
+    for t in (5, 15, 25, 35):
+        at(loop, t, lambda: pages.append(screen.current_page))
+    Runtime.run(loop, duration=40)
+    assert pages == [0, 1, 0, 1]
+
+
+def test_stop_from_a_task(screen, loop):
+    at(loop, 3, Runtime.stop)
+    start = loop.time()
+    Runtime.run(loop)
+    assert loop.time() - start == pytest.approx(3, abs=0.1)
+    # The app clock is the real clock again
+    assert monotonic() != loop.time()
+
+
+def test_reload_samples_new_pages_first(screen, loop, tmp_path, monkeypatch):
+    path = tmp_path / 'config.yml'
+    path.write_text(yaml.safe_dump(CONFIG))
+    plan = Config.load(str(path))
+    pages = CONFIG['pages'] + [{'type': 'storage', 'icon': 'hdd', 'value': '/srv'}]
+    woken = []
+    wake = Pages.wake
+    monkeypatch.setattr(Pages, 'wake', lambda: woken.append('ismount:/srv' in Sampler.snapshot()) or wake())
+    at(loop, 2, path.write_text, yaml.safe_dump(dict(CONFIG, pages=pages)))
+    at(loop, 3, lambda: loop.create_task(Config.reload_async()))
+    try:
+        Runtime.run(loop, duration=5)
+        assert len(screen.func_ptr) == 3
+        # The new page has its values before it is woken up
+        assert woken == [True]
+    finally:
+        Config.apply_pages(plan)
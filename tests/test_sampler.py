@@ -0,0 +1,76 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import asyncio
+import itertools
+
+# Additional pip modules
+
+# Additional project modules
+from modules.clock import Clock, VirtualEventLoop
+from modules.sampler import Sampler
+
+
+def sample_due():
+    """Take one sampling round on a new loop"""
+    asyncio.run(Sampler.sample_due_async())
+
+
+def test_metrics_added_while_running_are_sampled():
+    loop = VirtualEventLoop()
+    counter = itertools.count()
+
+    async def run():
+        task = asyncio.get_running_loop().create_task(Sampler.run_async())
+        await asyncio.sleep(5)
+        # Not stopped if there was nothing to sample
+        assert not task.done()
+        Sampler.add('test_added', lambda: next(counter), 1)
+        await asyncio.sleep(3.5)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    Clock.set(loop.time)
+    try:
+        loop.run_until_complete(run())
+    finally:
+        Clock.set(None)
+        loop.close()
+    assert Sampler.snapshot()['test_added'] == 3
+
+
+def test_commit_replaces_metrics(clock):
+    Sampler.begin()
+    Sampler.add('test_kept', lambda: 1, 1)
+    Sampler.add('test_dropped', lambda: 2, 1)
+    Sampler.commit()
+    sample_due()
+    assert 'test_dropped' in Sampler.snapshot()
+    Sampler.begin()
+    Sampler.add('test_kept', lambda: 3, 10)
+    Sampler.commit()
+    stats = Sampler.stats()
+    # Interval may grow, the metric keeps its state
+    assert stats['test_kept']['interval'] == 10
+    assert stats['test_kept']['count'] == 1
+    assert 'test_dropped' not in stats
+    assert 'test_dropped' not in Sampler.snapshot()
+    # Sampled once more on the old schedule, then every 10 s
+    counts = []
+    for _ in range(12):
+        clock.advance(1)
+        sample_due()
+        counts.append(Sampler.stats()['test_kept']['count'])
+    assert counts == [2] * 10 + [3] * 2
+
+
+def test_shortest_interval_of_one_plan(clock):
+    Sampler.begin()
+    Sampler.add('test_shared', lambda: 1, 5)
+    Sampler.add('test_shared', lambda: 1, 2)
+    Sampler.commit()
+    assert Sampler.stats()['test_shared']['interval'] == 2
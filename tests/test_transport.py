@@ -0,0 +1,134 @@
+"""
+!/usr/bin/env python3
+This Python file uses the following encoding: utf-8
+"""
+
+
+# Standard modules
+import asyncio
+
+# Additional pip modules
+from luma.core.error import DeviceNotFoundError
+from luma.oled.device import sh1106
+from PIL import Image, ImageDraw
+import pytest
+
+# Additional project modules
+from modules.clock import VirtualEventLoop
+from modules.display import Display
+from modules import transport as transport_module
+from modules.transport import FaultySerial, Transport, TransferError
+
+
+ERRORS = {
+    'oserror': lambda: OSError(121, 'Remote I/O error'),
+    'nak': lambda: DeviceNotFoundError('I2C device not found on address: 0x3C')
+}
+
+
+@pytest.fixture(params=list(ERRORS))
+def serial(request):
+    """Serial interface which fails with an OSError or a luma error"""
+    return FaultySerial(error=ERRORS[request.param])
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Seconds the transport slept"""
+    sleeps = []
+    monkeypatch.setattr(transport_module, 'sleep', sleeps.append)
+    return sleeps
+
+
+def frame(text):
+    """Image of a 128x64 display"""
+    image = Image.new('1', (128, 64))
+    ImageDraw.Draw(image).text((0, 0), text, fill=255)
+    return image
+
+
+def test_retry_with_backoff(serial, sleeps):
+    transport = Transport(serial, retries=3, backoff=0.01)
+    serial.fail_next = 3
+    transport.command(0xAE)
+    assert sleeps == [0.01, 0.02, 0.04]
+    stats = transport.stats()
+    assert (stats['errors'], stats['retries'], stats['failures']) == (3, 3, 0)
+    assert (stats['transactions'], stats['bytes']) == (4, 1)
+
+
+def test_backoff_is_limited(serial, sleeps):
+    transport = Transport(serial, retries=4, backoff=0.2, max_backoff=0.5)
+    serial.fail_next = 4
+    transport.data([0] * 8)
+    assert sleeps == [0.2, 0.4, 0.5, 0.5]
+
+
+def test_failure_after_retries(serial, sleeps):
+    transport = Transport(serial, retries=2)
+    serial.fail_next = 3
+    with pytest.raises(OSError):
+        transport.command(0xAE)
+    assert transport.stats()['failures'] == 1
+    # Next transaction starts with the shortest backoff again
+    serial.fail_next = 1
+    transport.command(0xAE)
+    assert sleeps[-1] == sleeps[0]
+
+
+def test_reinit_after_failures(serial, sleeps):
+    reinits = []
+    transport = Transport(serial, retries=1, reinit_after=2, on_reinit=lambda: reinits.append(1))
+    for _ in range(4):
+        serial.fail_next = 2
+        with pytest.raises(OSError):
+            transport.command(0xAE)
+    assert len(reinits) == 2
+    assert transport.stats()['reinits'] == 2
+
+
+def test_reinit_which_fails_is_not_recursive(serial, sleeps):
+    transport = Transport(serial, retries=0, reinit_after=1)
+    transport.set_on_reinit(lambda: transport.command(0xAE))
+    serial.fail_next = 2
+    with pytest.raises(OSError):
+        transport.command(0xAE)
+    assert transport.stats()['reinits'] == 1
+
+
+def test_loop_is_not_blocked(serial, sleeps):
+    transport = Transport(serial, retries=3, backoff=0.01)
+    display = Display(sh1106(transport))
+    loop = VirtualEventLoop()
+    sent = []
+
+    async def run():
+        serial.fail_next = 2
+        sent.append(display.display(frame('a')))
+        # A newer frame waits for the backoff
+        sent.append(display.display(frame('b')))
+        await asyncio.sleep(1)
+
+    try:
+        loop.run_until_complete(run())
+    finally:
+        loop.close()
+    assert sleeps == []
+    assert sent == [False, False]
+    assert display.get_frames_sent() == 1
+    assert transport.stats()['retries'] == 2
+    # Only the newest frame is sent, then it is the shown frame
+    assert display.display(frame('b')) is False
+
+
+def test_transfer_error_on_loop(serial, sleeps):
+    transport = Transport(serial, retries=1, backoff=0.25)
+
+    async def run():
+        serial.fail_next = 1
+        with pytest.raises(TransferError) as e:
+            transport.command(0xAE)
+        return e.value.retry_after
+
+    assert asyncio.run(run()) == 0.25
+    assert sleeps == []